@@ -1,7 +1,38 @@
-from cubesat_configurator.mission import Mission
-from cubesat_configurator.subsystems import Payload, OBC, EPS, ADCS, COMM, Thermal
-from cubesat_configurator.structure import Structure
-from cubesat_configurator.cubesat import CubeSat
-from cubesat_configurator.groundstation import GroundStation
-from cubesat_configurator.orbit import Orbit
-from cubesat_configurator.constants import *
\ No newline at end of file
+import importlib
+
+# Lazy facade: the classes are imported from their modules on first access, so that importing the package (e.g. in a
+# worker process that only renders reports) does not load parapy, paseos, pykep or matplotlib.
+_exports = {
+    'Mission': 'mission',
+    'Payload': 'subsystems',
+    'OBC': 'subsystems',
+    'EPS': 'subsystems',
+    'ADCS': 'subsystems',
+    'COMM': 'subsystems',
+    'Structure': 'structure',
+    'CubeSat': 'cubesat',
+    'GroundStation': 'groundstation',
+    'Orbit': 'orbit',
+    # the constants are exported after the classes, so Thermal is the constants class as before
+    'PaseosConfig': 'constants',
+    'Thermal': 'constants',
+    'SystemConfig': 'constants',
+    'StructureConfig': 'constants',
+    'GenericConfig': 'constants',
+    'Power': 'constants',
+    'script_dir': 'constants',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{_exports[name]}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
@@ -0,0 +1,141 @@
+import inspect
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+import pandas as pd
+
+# Opt-in profiler of the lazily evaluated attributes of the model. Attributes trigger each other across Mission,
+# CubeSat, the subsystems and Structure, so the time of an attribute is split into inclusive time (with the attributes
+# it triggers) and exclusive time (without them). Usage:
+#
+#     with AttributeProfiler() as profiler:
+#         mission.cubesat.total_mass
+#     print(profiler.summary())
+#     profiler.write_folded('attributes.folded')   # input of flamegraph.pl or speedscope
+#
+# Only functions of the package that are wrapped by a descriptor (@Attribute, @Part, ...) are profiled, plain methods
+# count towards the attribute that calls them.
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class AttributeProfiler:
+    """
+    Records call counts, inclusive and exclusive wall time and memory deltas per attribute path, e.g.
+    Mission.CubeSat.Thermal.selected_coating, while it is active.
+
+    Parameters:
+    package_dir: Only functions defined below this folder are profiled.
+    memory: Also record the change of traced memory per attribute, with tracemalloc (slower).
+    """
+    def __init__(self, package_dir=PACKAGE_DIR, memory=False):
+        self.package_dir = package_dir
+        self.memory = memory
+        self.stats = {}    # path: [calls, inclusive s, exclusive s, memory delta bytes]
+        self.folded = {}   # stack of paths: exclusive s
+        self._stack = []   # [frame, path, stack, start, time in children, memory at start]
+        self._codes = {}   # code: attribute name or None
+        self._paths = {}   # id of an object: (object, path of the object)
+        self._previous = None
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._previous = sys.getprofile()
+        sys.setprofile(self._profile)
+
+    def stop(self):
+        sys.setprofile(self._previous)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _attribute_name(self, frame):
+        # name of the attribute a frame evaluates, None for any other function
+        code = frame.f_code
+        if code not in self._codes:
+            name = None
+            if os.path.abspath(code.co_filename).startswith(self.package_dir) and code.co_argcount > 0 \
+                    and code.co_varnames[0] == 'self':
+                owner = frame.f_locals.get('self')
+                try:
+                    static = inspect.getattr_static(type(owner), code.co_name)
+                except AttributeError:
+                    static = None
+                # a descriptor instead of the plain function: @Attribute, @Part and the like
+                if static is not None and not isinstance(static, (types.FunctionType, staticmethod, classmethod)):
+                    name = code.co_name
+            self._codes[code] = name
+        return self._codes[code]
+
+    def _object_path(self, obj):
+        cached = self._paths.get(id(obj))
+        if cached is not None and cached[0] is obj:
+            return cached[1]
+        names = []
+        node, depth = obj, 0
+        while node is not None and depth < 50:
+            names.append(type(node).__name__)
+            node = getattr(node, 'parent', None)
+            depth += 1
+        path = '.'.join(reversed(names))
+        self._paths[id(obj)] = (obj, path)
+        return path
+
+    def _profile(self, frame, event, arg):
+        if event == 'call':
+            name = self._attribute_name(frame)
+            if name is None:
+                return
+            path = f"{self._object_path(frame.f_locals['self'])}.{name}"
+            stack = (self._stack[-1][2] + (path,)) if self._stack else (path,)
+            memory = tracemalloc.get_traced_memory()[0] if self.memory else 0
+            self._stack.append([frame, path, stack, time.perf_counter(), 0.0, memory])
+        elif event == 'return' and self._stack and self._stack[-1][0] is frame:
+            _, path, stack, start, children, memory = self._stack.pop()
+            inclusive = time.perf_counter() - start
+            exclusive = inclusive - children
+            entry = self.stats.setdefault(path, [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            # recursive calls of the same attribute count their inclusive time once
+            if path not in stack[:-1]:
+                entry[1] += inclusive
+            entry[2] += exclusive
+            if self.memory:
+                entry[3] += tracemalloc.get_traced_memory()[0] - memory
+            self.folded[stack] = self.folded.get(stack, 0.0) + exclusive
+            if self._stack:
+                self._stack[-1][4] += inclusive
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per attribute path with Calls, Inclusive_s, Exclusive_s and Memory_kB, sorted by exclusive time.
+        """
+        rows = [{'Attribute': path, 'Calls': calls, 'Inclusive_s': inclusive, 'Exclusive_s': exclusive,
+                 'Memory_kB': memory / 1024 if self.memory else float('nan')}
+                for path, (calls, inclusive, exclusive, memory) in self.stats.items()]
+        columns = ['Attribute', 'Calls', 'Inclusive_s', 'Exclusive_s', 'Memory_kB']
+        return pd.DataFrame(rows, columns=columns).sort_values('Exclusive_s', ascending=False, ignore_index=True)
+
+    def folded_lines(self):
+        """
+        Stacks in the folded format of flamegraph.pl: attribute paths joined by ';' and the exclusive time in microseconds.
+        """
+        return [f"{';'.join(stack)} {round(seconds * 1e6)}" for stack, seconds in sorted(self.folded.items())]
+
+    def write_folded(self, path):
+        with open(path, 'w') as file:
+            file.write('\n'.join(self.folded_lines()) + '\n')
+        return path
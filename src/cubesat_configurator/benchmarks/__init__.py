@@ -0,0 +1,3 @@
+"""
+Benchmark suite of the hot functions with fixed reference missions, see __main__ for the command line.
+"""
@@ -0,0 +1,109 @@
+import argparse
+import sys
+
+import pandas as pd
+
+from cubesat_configurator.benchmarks import scaling
+from cubesat_configurator.benchmarks import suite
+from cubesat_configurator.benchmarks import validation
+
+# Command line of the benchmark suite, from the src folder:
+#     python -m cubesat_configurator.benchmarks run --out baseline.json
+#     python -m cubesat_configurator.benchmarks run --out current.json
+#     python -m cubesat_configurator.benchmarks compare baseline.json current.json --threshold 0.1
+#     python -m cubesat_configurator.benchmarks scale --out scaling.json
+#     python -m cubesat_configurator.benchmarks validate --out validation.json
+# compare exits with status 1 when a benchmark got slower than the threshold.
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m cubesat_configurator.benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmarks and store the results as JSON')
+    run.add_argument('--out', default='benchmark_results.json', help='results file')
+    run.add_argument('--only', nargs='*', help='benchmark names, e.g. component_selection simulate_first_orbit')
+    run.add_argument('--sizes', nargs='*', choices=suite.rm.SIZES, help='reference mission sizes')
+    run.add_argument('--repeat', type=int, help='samples per benchmark and size')
+    run.add_argument('--paseos', choices=['auto', 'stub', 'real'], default='auto',
+                     help="'auto' uses the local PASEOS stub when PASEOS is not installed")
+
+    commands.add_parser('list', help='list the benchmarks')
+
+    scale = commands.add_parser('scale', help='measure the stages on growing synthetic inputs and fit complexity curves')
+    scale.add_argument('--out', default='scaling_results.json', help='results file')
+    scale.add_argument('--axes', nargs='*', choices=list(scaling.AXES), help='axes to scale')
+    scale.add_argument('--time-budget', type=float, default=60.0, help='seconds a single run of a stage may take')
+    scale.add_argument('--memory-budget', type=float, default=1024.0, help='peak memory in MB a stage may use')
+    scale.add_argument('--no-memory', action='store_true', help='skip the peak memory runs')
+    scale.add_argument('--paseos', choices=['auto', 'stub', 'real'], default='auto')
+
+    validate = commands.add_parser('validate', help='compare the simulation engines with the reference on the scenario corpus')
+    validate.add_argument('--out', default='validation_results.json', help='results file')
+    validate.add_argument('--scenarios', nargs='*', choices=list(validation.SCENARIOS))
+    validate.add_argument('--engines', nargs='*', choices=list(validation.ENGINES), help='engines, including the reference')
+    validate.add_argument('--reference', choices=list(validation.ENGINES), help="reference engine, 'paseos' if installed, else 'stub'")
+    validate.add_argument('--repeat', type=int, default=1, help='runs per engine and scenario for the speedup')
+    validate.add_argument('--strict', action='store_true', help='exit with status 1 when an engine is outside a tolerance, 2 when no reference engine can run')
+
+    compare = commands.add_parser('compare', help='compare two results files')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.1, help='relative slowdown that fails, 0.1 for 10 %%')
+    compare.add_argument('--statistic', choices=['min', 'median'], default='min')
+
+    args = parser.parse_args(argv)
+    if args.command == 'list':
+        for name, bench in suite.BENCHMARKS.items():
+            notes = ['requires ' + ', '.join(bench.requires)] if bench.requires else []
+            notes += ['helper only'] if bench.helper_only else []
+            print(f"{name:60s} {', '.join(bench.sizes):25s} {'; '.join(notes)}".rstrip())
+        return 0
+    if args.command == 'scale':
+        results = scaling.run_scaling(args.axes, args.time_budget, not args.no_memory, args.paseos)
+        report = scaling.scaling_report(results, args.memory_budget)
+        results['report'] = report.to_dict(orient='records')
+        suite.save_results(results, args.out)
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(report.to_string(index=False, float_format=lambda value: f'{value:.3g}'))
+        for entry in results['skipped']:
+            print(f"skipped {entry['Axis']} {entry['Stage']}: {entry['Reason']}")
+        print(f"results written to {args.out}")
+        return 0
+    if args.command == 'validate':
+        results = validation.run_validation(args.scenarios, args.engines, args.reference, args.repeat)
+        if results['reference'] is None:
+            for name, reason in results['skipped'].items():
+                print(f"skipped engine {name}: {reason}")
+            suite.save_results(results, args.out)
+            print(f"results written to {args.out}")
+            return 2 if args.strict else 0
+        report = validation.validation_report(results)
+        results['report'] = report.to_dict(orient='records')
+        suite.save_results(results, args.out)
+        print(f"reference: {results['reference']}, error relative to the tolerance per metric:")
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(report.to_string(index=False, float_format=lambda value: f'{value:.3g}'))
+        for name, reason in results['skipped'].items():
+            print(f"skipped engine {name}: {reason}")
+        print(f"results written to {args.out}")
+        return 1 if args.strict and not report['Passed'].all() else 0
+    if args.command == 'run':
+        results = suite.run_suite(args.only, args.sizes, args.repeat, args.paseos)
+        suite.save_results(results, args.out)
+        print(f"results written to {args.out} (PASEOS: {results['meta']['paseos']})")
+        return 0
+
+    baseline, current = suite.load_results(args.baseline), suite.load_results(args.current)
+    rows = suite.compare(baseline, current, args.threshold, args.statistic)
+    for key, old, new, ratio, flag in rows:
+        print(f"{key:60s} {old * 1000:10.3f} ms -> {new * 1000:10.3f} ms  x{ratio:5.2f}  {flag}")
+    if baseline['meta'].get('paseos') != current['meta'].get('paseos'):
+        print(f"note: PASEOS {baseline['meta'].get('paseos')} in the baseline, {current['meta'].get('paseos')} now")
+    regressions = [row for row in rows if row[-1] == 'regression']
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} out of {len(rows)} compared benchmarks")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
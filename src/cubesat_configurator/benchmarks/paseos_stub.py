@@ -0,0 +1,192 @@
+import enum
+import sys
+import types
+
+import numpy as np
+
+from cubesat_configurator import constants
+from cubesat_configurator import lazy
+
+pk = lazy.lazy_import('pykep')
+
+# Offline stand-in for the part of the PASEOS API used by CubeSat.simulate_*: two-body propagation with pykep, a
+# cylindrical Earth shadow, ground stations on a rotating spherical Earth, a battery charged outside eclipse and a
+# single node thermal model. Timings with the stub measure the configurator around the simulation, not PASEOS itself.
+
+
+class PowerDeviceType(enum.Enum):
+    SolarPanel = 1
+    RTG = 2
+
+
+def gmst(mjd2000):
+    "Greenwich mean sidereal time in rad, mjd2000 counts days from 2000-01-01 00:00"
+    return np.radians(280.46061837 + 360.98564736629 * (mjd2000 - 0.5))
+
+
+def heat_balance(thermal, temperature_in_K, sunlit, power_consumption):
+    """
+    Net heat flow in W of the single node thermal model: sun and albedo when sunlit, Earth IR, dissipated power and
+    radiation to space.
+
+    Parameters:
+    thermal: dict of the thermal model as stored by ActorBuilder.set_thermal_model.
+    sunlit: 1 outside eclipse, 0 in eclipse.
+    """
+    t = thermal
+    q_in = (sunlit * t['alpha'] * constants.Thermal.S * (t['sun_area'] + constants.Thermal.earth_albedo * t['earth_area'])
+            + t['epsilon'] * constants.Thermal.boltzmann_constant * constants.Thermal.earth_avg_temp ** 4 * t['earth_area']
+            + t['heat_ratio'] * power_consumption)
+    q_out = t['epsilon'] * constants.Thermal.boltzmann_constant * t['emissive_area'] * temperature_in_K ** 4
+    return q_in - q_out
+
+
+class _Actor:
+    def __init__(self, name, epoch):
+        self.name = name
+        self.local_time = epoch
+
+    def __str__(self):
+        return self.name
+
+
+class GroundstationActor(_Actor):
+    latitude = longitude = elevation = minimum_altitude_angle = 0.0
+
+    def get_position(self, epoch):
+        latitude, longitude = np.radians(self.latitude), np.radians(self.longitude) + gmst(epoch.mjd2000)
+        radius = pk.EARTH_RADIUS + self.elevation
+        return radius * np.array([np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude), np.sin(latitude)])
+
+
+class SpacecraftActor(_Actor):
+    def __init__(self, name, epoch):
+        super().__init__(name, epoch)
+        self.position = self.velocity = None
+        self.central_body = None
+        self.mu = pk.MU_EARTH
+        self.battery_level = self.max_battery_level = None
+        self.charging_rate = 0.0
+        self.thermal = None
+        self.temperature_in_K = None
+        self.comm_devices = {}
+
+    @property
+    def state_of_charge(self):
+        return self.battery_level / self.max_battery_level
+
+    @property
+    def temperature_in_C(self):
+        return self.temperature_in_K - 273.15
+
+    def get_position(self, epoch):
+        dt = (epoch.mjd2000 - self.local_time.mjd2000) * pk.DAY2SEC
+        if dt == 0:
+            return np.array(self.position)
+        return np.array(pk.propagate_lagrangian(self.position, self.velocity, dt, self.mu)[0])
+
+    def is_in_eclipse(self, t=None):
+        epoch = t or self.local_time
+        position = self.get_position(epoch)
+        sun = -np.array(self.central_body.eph(epoch)[0])
+        sun /= np.linalg.norm(sun)
+        along = position @ sun
+        return bool(along < 0 and np.linalg.norm(position - along * sun) < pk.EARTH_RADIUS)
+
+    def is_in_line_of_sight(self, other, epoch):
+        station = other.get_position(epoch)
+        line = self.get_position(epoch) - station
+        sin_elevation = line @ station / (np.linalg.norm(line) * np.linalg.norm(station))
+        return bool(sin_elevation >= np.sin(np.radians(other.minimum_altitude_angle)))
+
+    def _advance(self, dt, power_consumption):
+        eclipse = self.is_in_eclipse()
+        if self.max_battery_level is not None:
+            charge = 0.0 if eclipse else self.charging_rate
+            self.battery_level = min(max(self.battery_level + (charge - power_consumption) * dt, 0.0), self.max_battery_level)
+        if self.thermal is not None:
+            heat = heat_balance(self.thermal, self.temperature_in_K, 0.0 if eclipse else 1.0, power_consumption)
+            self.temperature_in_K += heat * dt / (self.thermal['mass'] * self.thermal['capacity'])
+        self.position, self.velocity = pk.propagate_lagrangian(self.position, self.velocity, dt, self.mu)
+        self.local_time = pk.epoch(self.local_time.mjd2000 + dt / pk.DAY2SEC)
+
+
+class ActorBuilder:
+    @staticmethod
+    def get_actor_scaffold(name, actor_type, epoch):
+        return actor_type(name, epoch)
+
+    @staticmethod
+    def set_orbit(actor, position, velocity, epoch, central_body):
+        actor.position, actor.velocity = list(position), list(velocity)
+        actor.local_time = epoch
+        actor.central_body = central_body
+
+    @staticmethod
+    def set_thermal_model(actor, actor_mass, actor_initial_temperature_in_K, actor_sun_absorptance, actor_infrared_absorptance,
+                          actor_sun_facing_area, actor_central_body_facing_area, actor_emissive_area, actor_thermal_capacity,
+                          power_consumption_to_heat_ratio=0.5, **kwargs):
+        actor.thermal = dict(mass=actor_mass, alpha=actor_sun_absorptance, epsilon=actor_infrared_absorptance,
+                             sun_area=actor_sun_facing_area, earth_area=actor_central_body_facing_area,
+                             emissive_area=actor_emissive_area, capacity=actor_thermal_capacity,
+                             heat_ratio=power_consumption_to_heat_ratio)
+        actor.temperature_in_K = actor_initial_temperature_in_K
+
+    @staticmethod
+    def add_comm_device(actor, device_name, bandwidth_in_kbps):
+        actor.comm_devices[device_name] = bandwidth_in_kbps
+
+    @staticmethod
+    def set_power_devices(actor, battery_level_in_Ws, max_battery_level_in_Ws, charging_rate_in_W, power_device_type=PowerDeviceType.SolarPanel):
+        actor.battery_level, actor.max_battery_level = battery_level_in_Ws, max_battery_level_in_Ws
+        actor.charging_rate = charging_rate_in_W
+
+    @staticmethod
+    def set_ground_station_location(actor, latitude, longitude, elevation=0, minimum_altitude_angle=30):
+        actor.latitude, actor.longitude = latitude, longitude
+        actor.elevation, actor.minimum_altitude_angle = elevation, minimum_altitude_angle
+
+
+class _Simulation:
+    def __init__(self, local_actor):
+        self.local_actor = local_actor
+        self.known_actors = {}
+
+    @property
+    def simulation_time(self):
+        return self.local_actor.local_time.mjd2000 * pk.DAY2SEC
+
+    def add_known_actor(self, actor):
+        self.known_actors[actor.name] = actor
+
+    def advance_time(self, time_to_advance, current_power_consumption_in_W):
+        self.local_actor._advance(time_to_advance, current_power_consumption_in_W)
+
+
+def init_sim(local_actor, *args, **kwargs):
+    return _Simulation(local_actor)
+
+
+def install(force=False):
+    """
+    Register the stub as the module 'paseos', unless the real PASEOS is installed and force is False.
+
+    Returns:
+    bool: True if the stub is used.
+    """
+    if not force:
+        try:
+            import paseos  # noqa: F401
+            return getattr(paseos, '__stub__', False)
+        except ImportError:
+            pass
+    module = types.ModuleType('paseos')
+    module.__stub__ = True
+    for name in ('ActorBuilder', 'SpacecraftActor', 'GroundstationActor', 'PowerDeviceType', 'init_sim'):
+        setattr(module, name, globals()[name])
+    sys.modules['paseos'] = module
+    # modules of the package imported before keep the placeholder of lazy_import for the missing PASEOS
+    for name, loaded in list(sys.modules.items()):
+        if name.startswith('cubesat_configurator.') and isinstance(getattr(loaded, 'paseos', None), lazy._MissingModule):
+            loaded.paseos = module
+    return True
@@ -0,0 +1,111 @@
+import contextlib
+import re
+
+import pandas as pd
+
+from cubesat_configurator import catalog
+from cubesat_configurator import constants
+
+# Fixed inputs of the benchmarks per size. 'typical' is the mission of main.py, 'small' has a single ground station and
+# 'stress' a network of eight stations, more images and three simulated days.
+
+SIZES = ('small', 'typical', 'stress')
+
+MISSIONS = {
+    'small': dict(mission_lifetime=12, reqiured_GSD=100, number_of_images_per_day=1, orbit_type="SSO",
+                  custom_inclination=52, ground_station_selection=[58], req_pointing_accuracy=1),
+    'typical': dict(mission_lifetime=24, reqiured_GSD=50, number_of_images_per_day=5, orbit_type="SSO",
+                    custom_inclination=52, ground_station_selection=[58, 53], req_pointing_accuracy=1),
+    'stress': dict(mission_lifetime=60, reqiured_GSD=30, number_of_images_per_day=20, orbit_type="SSO",
+                   custom_inclination=52, ground_station_selection=[58, 53, 49, 0, 10, 20, 30, 40], req_pointing_accuracy=0.5),
+}
+
+DAYS_TO_SIMULATE = {'small': 1, 'typical': 1, 'stress': 3}
+
+# boards of the commented test data in structure.py, the payload stays at the bottom
+STACK_BOARDS = [
+    {'name': 'Payload', 'mass': 300, 'height': 70, 'CoM_Location': None},
+    {'name': 'ADCS', 'mass': 500, 'height': 60, 'CoM_Location': None},
+    {'name': 'EPS', 'mass': 100, 'height': 50, 'CoM_Location': None},
+    {'name': 'OBC', 'mass': 100, 'height': 30, 'CoM_Location': None},
+    {'name': 'COMM', 'mass': 100, 'height': 30, 'CoM_Location': None},
+]
+STACK_HEIGHT = 300  # mm, 3U
+
+# component catalogs are repeated to this many times their size
+CATALOG_REPEATS = {'small': 1, 'typical': 100, 'stress': 1000}
+
+# arguments of select_component per subsystem, as in selection_criteria of the subsystems of the typical mission
+SELECTION_CRITERIA = {
+    'ADCS': dict(file_name='ADCS.csv', filter_key='Pointing_Accuracy', filter_value=1, comparator='less'),
+    'COMM': dict(file_name='Communication_subsystem.csv', filter_key='Data_Rate', filter_value=100, comparator='greater',
+                 is_comm=True, tgs=3600),
+    'OBC': dict(file_name='OBC.csv', filter_key='Storage', filter_value=4, comparator='greater'),
+    'EPS': dict(file_name='Battery.csv', filter_key='Capacity', filter_value=20, comparator='greater', subsystem_name='eps'),
+}
+SELECTION_WEIGHTS = (0.4, 0.3, 0.3)  # mass, cost and power factor
+
+# Thermal.selected_coating of a 2U CubeSat in a 500 km orbit
+THERMAL_CASE = dict(form_factor=2.0, T_min=-10 + 273.15 + 5, T_max=40 + 273.15 - 5, Q_internal=4.0,
+                    periapsis=6878e3, apoapsis=6878e3, m=2.5, c_p=900, t_eclipse=2100)
+
+# rows of every table of the report
+REPORT_TABLE_ROWS = {'small': 1, 'typical': 10, 'stress': 1000}
+
+
+def make_mission(size):
+    """
+    New Mission of the given size, every attribute is evaluated again.
+    """
+    from cubesat_configurator.mission import Mission
+    return Mission(**MISSIONS[size])
+
+
+@contextlib.contextmanager
+def simulation_days(days):
+    """
+    Simulate the given number of days inside the block.
+    """
+    previous = constants.PaseosConfig.days_to_simulate
+    constants.PaseosConfig.days_to_simulate = days
+    try:
+        yield
+    finally:
+        constants.PaseosConfig.days_to_simulate = previous
+
+
+def component_catalog(file_name, size):
+    """
+    Catalog from the data directory, repeated CATALOG_REPEATS[size] times.
+    """
+    frame = catalog.load_catalog(file_name)
+    return pd.concat([frame] * CATALOG_REPEATS[size], ignore_index=True)
+
+
+def report_data():
+    """
+    Value for every placeholder of the report template, alternating numbers and text.
+    """
+    from docx import Document
+    from docx.oxml.ns import qn
+    body = Document(constants.GenericConfig.report_template_path).element.body
+    text = '\n'.join(''.join(t.text or '' for t in paragraph.iter(qn('w:t'))) for paragraph in body.iter(qn('w:p')))
+    placeholders = sorted(set(re.findall(r'<[a-z_0-9]+>', text)))
+    return {key: (1234.5678 * i if i % 2 else f'value {i}') for i, key in enumerate(placeholders)}
+
+
+def report_tables(size):
+    """
+    Tables of the report as in Mission.report_tables, with REPORT_TABLE_ROWS[size] rows each.
+    """
+    rows = REPORT_TABLE_ROWS[size]
+    stations = catalog.load_catalog('ground_stations.csv')
+    tables = {'Ground Station Selection': pd.concat([stations] * (rows // len(stations) + 1), ignore_index=True).head(rows)}
+    for identifier, file_name in [('Communication Selection', 'Communication_subsystem.csv'),
+                                  ('Onboard Computer Selection', 'OBC.csv'), ('ADCS Selection', 'ADCS.csv'),
+                                  ('Battery Selection', 'Battery.csv')]:
+        frame = catalog.load_catalog(file_name).drop(columns=['index'])
+        tables[identifier] = pd.concat([frame] * (rows // len(frame) + 1), ignore_index=True).head(rows).round(2)
+    coatings = catalog.load_catalog(constants.Thermal.body_coatings_path)
+    tables['Thermal Coating Selection'] = pd.concat([coatings] * (rows // len(coatings) + 1), ignore_index=True).head(rows)
+    return tables
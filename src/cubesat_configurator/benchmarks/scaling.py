@@ -0,0 +1,533 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from cubesat_configurator import catalog
+from cubesat_configurator import constants
+from cubesat_configurator.benchmarks import reference_missions as rm
+from cubesat_configurator.benchmarks import suite
+
+# Scaling harness: the stages of the configurator run on synthetic inputs of growing size along four axes, the time
+# and peak traced memory per stage are fitted with complexity models and extrapolated to the largest size of the axis.
+# Every run takes place in a child process that is stopped at the time budget; a stage stops at the first size that
+# does not finish within the budget, which the report states instead of extrapolating past it. Every axis also has
+# an end to end 'pipeline' stage, so the growth of a single stage can be told apart from that of a whole design.
+#     python -m cubesat_configurator.benchmarks scale --out scaling.json
+
+AXES = {
+    'catalog_rows': [10, 100, 1_000, 10_000, 100_000],
+    'coatings': [10, 30, 100, 300, 1_000, 10_000, 100_000],
+    'stations': [1, 10, 100, 1_000],
+    'horizon_days': [1, 7, 30, 365, 730],
+}
+
+STAGES = {}  # axis: {stage name: (setup, required modules)}
+
+# complexity models, value = a + b * f(n)
+MODELS = {
+    'O(1)': lambda n: np.zeros_like(n),
+    'O(log n)': np.log,
+    'O(n)': lambda n: n,
+    'O(n log n)': lambda n: n * np.log(n),
+    'O(n^2)': lambda n: n ** 2,
+    'O(n^3)': lambda n: n ** 3,
+}
+
+NOISE_FLOOR = 1e-4  # s, shorter times are not fitted
+DID_NOT_FINISH = 'did not finish within budget'
+
+
+def stage(axis, name, requires=()):
+    """
+    Register the setup of a stage on an axis: setup(size) prepares the synthetic input and returns the function to measure.
+    """
+    def register(setup):
+        STAGES.setdefault(axis, {})[name] = (setup, tuple(requires))
+        return setup
+    return register
+
+
+# synthetic inputs
+
+def synthetic_catalog(file_name, rows, seed=0):
+    """
+    Catalog with the columns of a catalog of the data directory and the given number of rows. Numeric columns are
+    drawn uniformly between the smallest and largest value of the real catalog, text columns are numbered copies.
+    """
+    real = catalog.load_catalog(file_name)
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, column in real.items():
+        if name == 'index':
+            columns[name] = np.arange(1, rows + 1)
+        elif pd.api.types.is_numeric_dtype(column):
+            columns[name] = rng.uniform(column.min(), column.max(), rows)
+        else:
+            columns[name] = [f'{value} #{i}' for i, value in zip(range(rows), np.resize(column.to_numpy(), rows))]
+    return pd.DataFrame(columns)
+
+
+def synthetic_coatings(rows, seed=0):
+    """
+    Coating tables by source as in Thermal.coating_tables, with rows coatings each.
+    """
+    rng = np.random.default_rng(seed)
+    return {source: pd.DataFrame({'Coating': [f'{source} coating {i}' for i in range(rows)],
+                                  'Absorptivity': rng.uniform(0.05, 0.95, rows),
+                                  'Emissivity': rng.uniform(0.05, 0.95, rows)})
+            for source in ('SMAD', 'NASA')}
+
+
+def synthetic_stations(count, seed=0):
+    """
+    Ground stations spread uniformly over the sphere, with the columns of ground_stations.csv.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Number': np.arange(count), 'Company': 'Synthetic', 'Location': 'Synthetic', 'Capability': 'S-band',
+                         'Lat': np.degrees(np.arcsin(rng.uniform(-1, 1, count))), 'Lon': rng.uniform(-180, 180, count),
+                         'Elevation': 0})
+
+
+# stages
+
+@stage('catalog_rows', 'catalog_load')
+def _catalog_load(rows):
+    folder = tempfile.mkdtemp(prefix='cubesat_scaling_')
+    paths = []
+    for criteria in rm.SELECTION_CRITERIA.values():
+        path = os.path.join(folder, criteria['file_name'])
+        synthetic_catalog(criteria['file_name'], rows).to_csv(path, index=False)
+        paths.append(path)
+
+    def load():
+        catalog.clear_catalogs()
+        return [catalog.load_catalog(path) for path in paths]
+    return load
+
+
+def _synthetic_criteria(rows):
+    mass_factor, cost_factor, power_factor = rm.SELECTION_WEIGHTS
+    weights = dict(mass_factor=mass_factor, cost_factor=cost_factor, power_factor=power_factor)
+    selections = []
+    for criteria in rm.SELECTION_CRITERIA.values():
+        criteria = dict(criteria)
+        component = synthetic_catalog(criteria.pop('file_name'), rows)
+        # the median keeps half of the synthetic catalog feasible at every size
+        criteria['filter_value'] = component[criteria['filter_key']].median()
+        selections.append(dict(component=component, **criteria))
+    return selections, weights
+
+
+@stage('catalog_rows', 'component_selection')
+def _component_selection(rows):
+    from cubesat_configurator import selection_helpers as sh
+    selections, weights = _synthetic_criteria(rows)
+    return lambda: [sh.select_component(**criteria, **weights) for criteria in selections]
+
+
+@stage('catalog_rows', 'selection_index')
+def _selection_index(rows):
+    from cubesat_configurator import selection_helpers as sh
+    selections, weights = _synthetic_criteria(rows)
+    indexes = [{key: value for key, value in criteria.items() if key != 'filter_value'} for criteria in selections]
+    return lambda: [sh.build_threshold_index(**criteria, **weights) for criteria in indexes]
+
+
+@stage('catalog_rows', 'batch_selection')
+def _batch_selection(rows):
+    from cubesat_configurator import selection_helpers as sh
+    selections, _ = _synthetic_criteria(rows)
+    weights = np.random.default_rng(0).dirichlet(np.ones(3), 100)
+    return lambda: [sh.batch_select_components(weights=weights, **criteria) for criteria in selections]
+
+
+@stage('coatings', 'coating_index')
+def _coating_index(rows):
+    from cubesat_configurator import thermal_helpers as th
+    tables = synthetic_coatings(rows)
+    return lambda: th.build_coating_index(tables)
+
+
+@stage('coatings', 'selected_coating')
+def _selected_coating(rows):
+    from cubesat_configurator import thermal_helpers as th
+    index = th.build_coating_index(synthetic_coatings(rows))
+    return lambda: th.select_coating_indexed(index, **rm.THERMAL_CASE)
+
+
+@stage('coatings', 'face_coatings')
+def _face_coatings(rows):
+    from cubesat_configurator import thermal_helpers as th
+    tables = synthetic_coatings(rows)
+    case = dict(rm.THERMAL_CASE)
+    faces = th.cubesat_faces(case.pop('form_factor'), ['+X', '-X', '+Y', '-Y'])
+    return lambda: th.optimize_face_coatings(tables, faces, **case)
+
+
+def simulate_contacts(stations:pd.DataFrame, days, dt=constants.PaseosConfig.simulation_timestep):
+    """
+    Propagation, eclipse and line of sight loop of CubeSat.simulate_second_orbit with PASEOS, without the Mission:
+    a 500 km sun-synchronous orbit, a battery and a status entry per step.
+
+    Returns:
+    dict: Status lists per step as in the simulate_* results.
+    """
+    import pykep as pk
+    import paseos
+    t0 = constants.PaseosConfig.start_epoch
+    position, velocity = pk.par2ic([pk.EARTH_RADIUS + 500e3, 0.0, np.radians(97.4), 0.0, 0.0, 0.0], pk.MU_EARTH)
+    sat_actor = paseos.ActorBuilder.get_actor_scaffold(name="myCubeSat", actor_type=paseos.SpacecraftActor, epoch=t0)
+    paseos.ActorBuilder.set_orbit(actor=sat_actor, position=position, velocity=velocity, epoch=t0,
+                                  central_body=constants.PaseosConfig.earth)
+    paseos.ActorBuilder.set_power_devices(actor=sat_actor, battery_level_in_Ws=1e5, max_battery_level_in_Ws=1.5e5,
+                                          charging_rate_in_W=10, power_device_type=paseos.PowerDeviceType.SolarPanel)
+    sim = paseos.init_sim(sat_actor)
+    ground_stations = []
+    for station in stations.itertuples():
+        actor = paseos.ActorBuilder.get_actor_scaffold(name=f"gs_{station.Number}", actor_type=paseos.GroundstationActor, epoch=t0)
+        paseos.ActorBuilder.set_ground_station_location(actor, latitude=station.Lat, longitude=station.Lon,
+                                                        elevation=station.Elevation, minimum_altitude_angle=5)
+        sim.add_known_actor(actor)
+        ground_stations.append(actor)
+
+    status_dict = {"time_s": [], "eclipse": [], "comm_window": [], "battery_SoC": []}
+    for _ in range(int(days * pk.DAY2SEC / dt)):
+        eclipse = sat_actor.is_in_eclipse()
+        # every station is checked, like the contact list of the simulation loops
+        contact = any([sat_actor.is_in_line_of_sight(station, sat_actor.local_time) for station in ground_stations])
+        status_dict["time_s"].append(sim.simulation_time - t0.mjd2000 * pk.DAY2SEC)
+        status_dict["eclipse"].append(eclipse)
+        status_dict["comm_window"].append(contact)
+        status_dict["battery_SoC"].append(sat_actor.state_of_charge)
+        sim.advance_time(dt, 5.0)
+    return status_dict
+
+
+@stage('stations', 'simulation', requires=('pykep', 'paseos'))
+def _simulation_stations(count):
+    stations = synthetic_stations(count)
+    return lambda: simulate_contacts(stations, days=1)
+
+
+@stage('horizon_days', 'simulation', requires=('pykep', 'paseos'))
+def _simulation_horizon(days):
+    stations = catalog.load_catalog('ground_stations.csv').iloc[rm.MISSIONS['typical']['ground_station_selection']]
+    return lambda: simulate_contacts(stations, days=days)
+
+
+def _reference_selections():
+    # selection criteria of the reference mission on the catalogs of the data directory
+    mass_factor, cost_factor, power_factor = rm.SELECTION_WEIGHTS
+    weights = dict(mass_factor=mass_factor, cost_factor=cost_factor, power_factor=power_factor)
+    selections = []
+    for criteria in rm.SELECTION_CRITERIA.values():
+        criteria = dict(criteria)
+        selections.append(dict(component=catalog.load_catalog(criteria.pop('file_name')), **criteria))
+    return selections, weights
+
+
+def _reference_coatings():
+    return {'SMAD': catalog.load_catalog(constants.Thermal.body_coatings_path),
+            'NASA': catalog.load_catalog(constants.Thermal.sa_coatings_path)}
+
+
+def _reference_stations():
+    return catalog.load_catalog('ground_stations.csv').iloc[rm.MISSIONS['typical']['ground_station_selection']]
+
+
+def pipeline(selections, weights, coating_tables, stations, report_data, days=None, number_of_spacers=5):
+    """
+    One design from the inputs to the report, along the ParaPy-free helpers the model delegates to: component selection,
+    stacking of the selected boards on the reference payload, coating selection for the resulting form factor, the
+    contact simulation when days is given, and the report document without PDF.
+
+    Parameters:
+    selections, weights: Arguments of select_component per subsystem, in the order of rm.SELECTION_CRITERIA, and the weights.
+    coating_tables: Coating tables by source as in Thermal.coating_tables.
+    stations: Ground stations with the columns of ground_stations.csv.
+    report_data: Value per placeholder of the report template, as rm.report_data.
+    days: Simulated days, None to skip the simulation.
+
+    Returns:
+    str: Path of the report.
+    """
+    from cubesat_configurator import layout_helpers as lay
+    from cubesat_configurator import report_generator
+    from cubesat_configurator import selection_helpers as sh
+    from cubesat_configurator import stacking_helpers as stk
+    from cubesat_configurator import thermal_helpers as th
+
+    selected = {name: sh.select_component(**criteria, **weights) for name, criteria in zip(rm.SELECTION_CRITERIA, selections)}
+
+    payload = dict(rm.STACK_BOARDS[0])
+    boards = [payload] + [{'name': name, 'mass': float(row['Mass']), 'height': float(row['Height']), 'CoM_Location': None}
+                          for name, row in selected.items()]
+    heights = [board['height'] for board in boards]
+    form_factor = sh.form_factor(sum(heights)) or lay.layout_form_factor(heights)
+    if form_factor is None:
+        raise ValueError("No available Cubesat sizes found")
+    if form_factor in constants.StructureConfig.layouts:
+        lay.optimal_layout(boards, payload, form_factor)
+    else:
+        stk.optimal_stack(boards, payload, 100 * form_factor, number_of_spacers)
+
+    case = dict(rm.THERMAL_CASE, form_factor=float(form_factor))
+    coating = th.select_coating_indexed(th.build_coating_index(coating_tables), **case)
+
+    if days is not None:
+        simulate_contacts(stations, days)
+
+    tables = {'Ground Station Selection': stations.round({'Lat': 4, 'Lon': 4}),
+              'Communication Selection': pd.DataFrame([selected['COMM']]).round(2),
+              'Onboard Computer Selection': pd.DataFrame([selected['OBC']]).round(2),
+              'ADCS Selection': pd.DataFrame([selected['ADCS']]).round(2),
+              'Battery Selection': pd.DataFrame([selected['EPS']]).round(2),
+              'Thermal Coating Selection': pd.DataFrame([coating]).round(2)}
+    output_path = os.path.join(tempfile.mkdtemp(prefix='cubesat_scaling_'), 'report.docx')
+    report_generator.fill_report_template(constants.GenericConfig.report_template_path, output_path, report_data, tables, renderer='none', background=False)
+    return output_path
+
+
+@stage('catalog_rows', 'pipeline', requires=('docx',))
+def _pipeline_catalog_rows(rows):
+    selections, weights = _synthetic_criteria(rows)
+    coatings, stations = _reference_coatings(), _reference_stations()
+    data = rm.report_data()
+    return lambda: pipeline(selections, weights, coatings, stations, data)
+
+
+@stage('coatings', 'pipeline', requires=('docx',))
+def _pipeline_coatings(rows):
+    (selections, weights), stations = _reference_selections(), _reference_stations()
+    coatings, data = synthetic_coatings(rows), rm.report_data()
+    return lambda: pipeline(selections, weights, coatings, stations, data)
+
+
+@stage('stations', 'pipeline', requires=('docx', 'pykep', 'paseos'))
+def _pipeline_stations(count):
+    (selections, weights), coatings = _reference_selections(), _reference_coatings()
+    stations, data = synthetic_stations(count), rm.report_data()
+    return lambda: pipeline(selections, weights, coatings, stations, data, days=1)
+
+
+@stage('horizon_days', 'pipeline', requires=('docx', 'pykep', 'paseos'))
+def _pipeline_horizon(days):
+    (selections, weights), coatings, stations = _reference_selections(), _reference_coatings(), _reference_stations()
+    data = rm.report_data()
+    return lambda: pipeline(selections, weights, coatings, stations, data, days=days)
+
+
+# measurement and fit
+
+def _child_run(setup, size, trace, connection):
+    # prepares the stage, reports that it is ready and then the time or the peak traced memory of one run
+    try:
+        function = setup(size)
+        if trace:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+        connection.send(('ready', None))
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        connection.send(('done', tracemalloc.get_traced_memory()[1] - baseline if trace else elapsed))
+    except Exception as error:
+        connection.send(('error', f"{type(error).__name__}: {error}"))
+    finally:
+        connection.close()
+
+
+def run_with_budget(setup, size, time_budget=float('inf'), trace=False):
+    """
+    Run a stage once in a child process, the setup is not timed. The child is stopped when the run takes longer than
+    the time budget.
+
+    Returns:
+    float or None: Seconds of the run, or the peak traced memory in bytes with trace, None if it did not finish within
+    the time budget.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child_run, args=(setup, size, trace, sender), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        status, value = receiver.recv()
+        if status == 'ready':
+            if not receiver.poll(None if np.isinf(time_budget) else time_budget):
+                return None
+            status, value = receiver.recv()
+    except EOFError:
+        status, value = 'error', f"the stage process exited with code {process.exitcode}"
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        receiver.close()
+    if status == 'error':
+        raise RuntimeError(f"stage failed at size {size}: {value}")
+    return value
+
+def measure(setup, size, memory=True, min_time=1.0, repeat=3, time_budget=float('inf')):
+    """
+    Time and peak memory of one stage at one size, every run in a child process stopped at the time budget.
+
+    Returns:
+    dict: 'finished' False if a run did not finish within the time budget, 'time' in seconds, best of up to repeat
+    runs while the runs take less than min_time together, and 'peak' traced memory in bytes above the memory at the
+    start of a separate run. Both are None if the stage did not finish, the peak also without memory.
+    """
+    times = []
+    while len(times) < repeat and sum(times) < min_time:
+        elapsed = run_with_budget(setup, size, time_budget)
+        if elapsed is None:
+            return {'finished': False, 'time': None, 'peak': None}
+        times.append(elapsed)
+    # tracing slows the run down, so it gets the budget of the untraced run plus its own
+    peak = run_with_budget(setup, size, time_budget * 2, trace=True) if memory else None
+    return {'finished': True, 'time': min(times), 'peak': peak}
+
+
+def fit_complexity(sizes, values, floor=0.0):
+    """
+    Fit value = a + b * f(n) for every model in MODELS with b >= 0 and pick the one with the smallest relative error.
+    Values below floor are not fitted, they are dominated by overhead and noise.
+
+    Returns:
+    dict: 'model', its coefficients 'a' and 'b', the 'exponent' of a power law through the two largest sizes and the
+    relative rms 'error', None if fewer than two values are above the floor.
+    """
+    points = [(n, value) for n, value in zip(sizes, values) if value is not None and value > floor]
+    if len(points) < 2:
+        return None
+    n, y = (np.array(column, dtype=float) for column in zip(*points))
+    best = None
+    for model, f in MODELS.items():
+        # two points fit any model with an offset, so they are fitted without
+        columns = [np.ones_like(n), f(n)] if len(points) > 2 or model == 'O(1)' else [np.zeros_like(n), f(n)]
+        design = np.column_stack(columns) / y[:, None]
+        (a, b), *_ = np.linalg.lstsq(design, np.ones_like(y), rcond=None)
+        if b < 0:
+            continue
+        error = float(np.sqrt(np.mean(((a + b * f(n)) / y - 1) ** 2)))
+        # a more complex model has to be clearly better
+        if best is None or error < 0.8 * best['error']:
+            best = {'model': model, 'a': float(a), 'b': float(b), 'error': error}
+    best['exponent'] = float(np.log(y[-1] / y[-2]) / np.log(n[-1] / n[-2]))
+    return best
+
+
+def predict(fit, size):
+    "Value of a fitted model at a size"
+    return fit['a'] + fit['b'] * float(MODELS[fit['model']](np.array(float(size))))
+
+
+def limit_size(fit, budget, largest=1e12):
+    """
+    Smallest size where the fitted model exceeds the budget, None if it stays below up to largest.
+    """
+    if fit is None or predict(fit, largest) <= budget:
+        return None
+    if predict(fit, 1) > budget:
+        return 1
+    low, high = 1.0, largest
+    while high / low > 1.01:
+        middle = np.sqrt(low * high)
+        low, high = (middle, high) if predict(fit, middle) <= budget else (low, middle)
+    return int(np.ceil(high))
+
+
+def run_scaling(axes=None, time_budget=60.0, memory=True, paseos='auto', progress=print):
+    """
+    Measure every stage along the axes up to the first size that does not finish within the time budget.
+
+    Parameters:
+    axes: Axis names of AXES, all by default.
+    time_budget: Seconds a single run of a stage may take.
+    memory: Also measure the peak traced memory, in a separate run with tracemalloc.
+    paseos: PASEOS mode as in suite.use_paseos.
+    progress: Called with a line of text per measurement, None for silence.
+
+    Returns:
+    dict: 'meta', 'measurements' as a list of dicts with Axis, Stage, Size, Status, Time_s and Peak_MB, and 'skipped'
+    stages. A size that did not finish has the Status DID_NOT_FINISH and no time or peak.
+    """
+    paseos_mode = suite.use_paseos(paseos)
+    measurements, skipped = [], []
+    for axis in axes or AXES:
+        for name, (setup, requires) in STAGES[axis].items():
+            missing = suite.Benchmark(name, setup, requires).missing()
+            if missing:
+                skipped.append({'Axis': axis, 'Stage': name, 'Reason': f"requires {', '.join(missing)}"})
+                continue
+            for size in AXES[axis]:
+                result = measure(setup, size, memory, time_budget=time_budget)
+                if not result['finished']:
+                    measurements.append({'Axis': axis, 'Stage': name, 'Size': size, 'Status': DID_NOT_FINISH,
+                                         'Time_s': None, 'Peak_MB': None})
+                    if progress is not None:
+                        progress(f"{axis:14s} {name:22s} {size:>9} {DID_NOT_FINISH} of {time_budget:g} s")
+                    break
+                peak_MB = result['peak'] / 2**20 if result['peak'] is not None else None
+                measurements.append({'Axis': axis, 'Stage': name, 'Size': size, 'Status': 'finished',
+                                     'Time_s': result['time'], 'Peak_MB': peak_MB})
+                if progress is not None:
+                    progress(f"{axis:14s} {name:22s} {size:>9} {result['time']:10.4f} s"
+                             + (f" {peak_MB:10.2f} MB" if peak_MB is not None else ''))
+    return {'meta': suite.metadata(paseos_mode), 'time_budget': time_budget, 'measurements': measurements, 'skipped': skipped}
+
+
+def scaling_report(results, memory_budget_MB=1024.0):
+    """
+    Complexity model, power law exponent and extrapolation per stage.
+
+    A model is only fitted through at least two sizes above the noise floor; with fewer the model is empty and the
+    value at the target is only given when the target itself was measured. A stage that did not finish within the
+    time budget says so in its Status, has no time or memory at a target beyond that size, and that size as its time
+    limit unless the fit reaches the budget earlier.
+
+    Returns:
+    DataFrame: One row per stage with its Status, the time and memory model and exponent, the largest finished size,
+    the time and peak memory predicted at the largest size of the axis, and the sizes where the stage exceeds the
+    time budget of the results and the memory budget.
+    """
+    measurements = pd.DataFrame(results['measurements'], columns=['Axis', 'Stage', 'Size', 'Status', 'Time_s', 'Peak_MB'])
+    measurements['Status'] = measurements['Status'].fillna('finished')
+    rows = []
+    for (axis, name), group in measurements.groupby(['Axis', 'Stage'], sort=False):
+        unfinished = group.loc[group['Status'] == DID_NOT_FINISH, 'Size']
+        group = group[group['Status'] != DID_NOT_FINISH]
+        time_fit = fit_complexity(group['Size'], group['Time_s'], NOISE_FLOOR)
+        peaks = group['Peak_MB'].dropna()
+        memory_fit = fit_complexity(group.loc[peaks.index, 'Size'], peaks, 0.01) if len(peaks) else None
+        target = AXES[axis][-1]
+        measured = group[group['Size'] == target]
+        time_at_target = predict(time_fit, target) if time_fit else (measured['Time_s'].iloc[0] if len(measured) else np.nan)
+        peak_at_target = predict(memory_fit, target) if memory_fit else \
+            (measured['Peak_MB'].iloc[0] if len(measured) and measured['Peak_MB'].notna().iloc[0] else np.nan)
+        time_limit = limit_size(time_fit, results['time_budget'])
+        status = 'finished'
+        if len(unfinished):
+            status = f"{DID_NOT_FINISH} at {int(unfinished.min())}"
+            time_limit = int(unfinished.min()) if time_limit is None else min(time_limit, int(unfinished.min()))
+            time_at_target = peak_at_target = np.nan
+        rows.append({
+            'Axis': axis, 'Stage': name, 'Status': status,
+            'Time_model': time_fit['model'] if time_fit else None,
+            'Time_exponent': time_fit['exponent'] if time_fit else np.nan,
+            'Memory_model': memory_fit['model'] if memory_fit else None,
+            'Memory_exponent': memory_fit['exponent'] if memory_fit else np.nan,
+            'Largest_measured': int(group['Size'].max()) if len(group) else None,
+            'Target': target,
+            'Time_at_target_s': time_at_target,
+            'Peak_at_target_MB': peak_at_target,
+            'Time_limit_size': time_limit,
+            'Memory_limit_size': limit_size(memory_fit, memory_budget_MB),
+        })
+    return pd.DataFrame(rows)
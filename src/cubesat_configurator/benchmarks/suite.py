@@ -0,0 +1,301 @@
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from cubesat_configurator.benchmarks import reference_missions as rm
+
+# Benchmarks of the hot functions of the configurator. A benchmark is a setup function registered with @benchmark, it
+# gets the size of the reference mission and returns the function to time. Setup is not timed and runs again before
+# every repeat, so attributes of a new Mission are evaluated each time. Pure functions are called in a loop per repeat
+# until the loop takes at least MIN_SAMPLE_TIME, like timeit. Benchmarks that call the helper function behind a model
+# attribute instead of the attribute itself are marked helper_only, the report says so.
+
+BENCHMARKS = {}
+MIN_SAMPLE_TIME = 0.05  # s
+RESULTS_VERSION = 1
+
+
+class Benchmark:
+    def __init__(self, name, setup, requires=(), sizes=rm.SIZES, repeat=5, pure=True, helper_only=False):
+        self.name = name
+        self.setup = setup
+        self.requires = tuple(requires)
+        self.sizes = tuple(sizes)
+        self.repeat = repeat
+        self.pure = pure
+        self.helper_only = helper_only
+
+    def missing(self):
+        "Required modules that are not installed"
+        return [module for module in self.requires if module not in sys.modules and importlib.util.find_spec(module) is None]
+
+
+def benchmark(name, requires=(), sizes=rm.SIZES, repeat=5, pure=True, helper_only=False):
+    """
+    Register a benchmark setup under a name.
+
+    Parameters:
+    requires: Modules that have to be installed, the benchmark is skipped otherwise.
+    sizes: Reference mission sizes the benchmark runs for.
+    repeat: Timed samples per size.
+    pure: The returned function can be called more than once with the same result, else it is called once per sample.
+    helper_only: The benchmark times the helper function behind a model attribute, without ParaPy.
+    """
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, requires, sizes, repeat, pure, helper_only)
+        return setup
+    return register
+
+
+def _time_sample(function, pure):
+    # seconds per call and number of calls of one sample
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if not pure or elapsed >= MIN_SAMPLE_TIME:
+            return elapsed / number, number
+        number = number * 10 if elapsed < MIN_SAMPLE_TIME / 10 else number * 2
+
+
+def run_benchmark(bench, size, repeat=None):
+    """
+    Time one benchmark for one size.
+
+    Returns:
+    dict: 'status' 'ok' with the 'min', 'median' and all 'samples' in seconds per call and 'number' of calls per
+    sample, 'skipped' with the 'reason' when a required module is missing, or 'error' with the exception. All results
+    carry 'helper_only'.
+    """
+    missing = bench.missing()
+    if missing:
+        return {'status': 'skipped', 'reason': f"requires {', '.join(missing)}", 'helper_only': bench.helper_only}
+    samples, number = [], 1
+    try:
+        for _ in range(repeat or bench.repeat):
+            function = bench.setup(size)
+            seconds, number = _time_sample(function, bench.pure)
+            samples.append(seconds)
+    except Exception as error:
+        return {'status': 'error', 'reason': f"{type(error).__name__}: {error}", 'helper_only': bench.helper_only}
+    return {'status': 'ok', 'min': min(samples), 'median': statistics.median(samples), 'samples': samples, 'number': number,
+            'helper_only': bench.helper_only}
+
+
+def metadata(paseos_mode):
+    versions = {}
+    for module in ('numpy', 'pandas', 'scipy', 'docx', 'pykep', 'parapy'):
+        try:
+            versions[module] = getattr(__import__(module), '__version__', 'unknown')
+        except ImportError:
+            versions[module] = None
+    return {'version': RESULTS_VERSION, 'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(),
+            'cpu_count': os.cpu_count(), 'paseos': paseos_mode, 'packages': versions}
+
+
+def use_paseos(mode='auto'):
+    """
+    Install the PASEOS stub if needed.
+
+    Parameters:
+    mode: 'auto' uses the stub when PASEOS is not installed, 'stub' always uses it, 'real' never.
+
+    Returns:
+    str: 'real', 'stub' or 'unavailable'.
+    """
+    paseos_mode = 'real' if 'paseos' in sys.modules or importlib.util.find_spec('paseos') is not None else 'unavailable'
+    # the stub propagates with pykep, which the model needs anyway
+    if mode != 'real' and importlib.util.find_spec('pykep') is not None:
+        from cubesat_configurator.benchmarks import paseos_stub
+        if paseos_stub.install(force=mode == 'stub'):
+            paseos_mode = 'stub'
+    return paseos_mode
+
+
+def run_suite(names=None, sizes=None, repeat=None, paseos='auto', progress=print):
+    """
+    Run the registered benchmarks.
+
+    Parameters:
+    names: Benchmark names to run, all by default. A name matches itself and its variants, e.g. 'component_selection'
+        matches 'component_selection[ADCS]'.
+    sizes: Reference mission sizes, all by default.
+    repeat: Samples per benchmark and size, the repeat of the benchmark by default.
+    paseos: 'auto' uses the stub when PASEOS is not installed, 'stub' always uses it, 'real' never.
+    progress: Called with a line of text per result, None for silence.
+
+    Returns:
+    dict: 'meta' with the environment and 'results' keyed by 'name/size'.
+    """
+    paseos_mode = use_paseos(paseos)
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if names and not any(name == selected or name.startswith(selected + '[') for selected in names):
+            continue
+        for size in bench.sizes:
+            if sizes and size not in sizes:
+                continue
+            result = run_benchmark(bench, size, repeat)
+            results[f'{name}/{size}'] = result
+            if progress is not None:
+                progress(format_result(f'{name}/{size}', result))
+    return {'meta': metadata(paseos_mode), 'results': results}
+
+
+def format_result(key, result):
+    if result['status'] != 'ok':
+        return f"{key:60s} {result['status']}: {result['reason']}"
+    return (f"{key:60s} min {result['min'] * 1000:10.3f} ms  median {result['median'] * 1000:10.3f} ms"
+            + ('  (helper only)' if result.get('helper_only') else ''))
+
+
+def save_results(results, path):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=1)
+    return path
+
+
+def load_results(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(baseline, current, threshold=0.1, statistic='min'):
+    """
+    Compare two result sets of run_suite.
+
+    Parameters:
+    threshold: Relative slowdown that counts as a regression, 0.1 for 10 %.
+    statistic: 'min' or 'median' of the samples.
+
+    Returns:
+    list: (key, baseline seconds, current seconds, ratio, flag) for every benchmark timed in both sets, the flag is
+    'regression', 'improvement' or ''.
+    """
+    rows = []
+    for key, new in current['results'].items():
+        old = baseline['results'].get(key)
+        if old is None or old['status'] != 'ok' or new['status'] != 'ok':
+            continue
+        ratio = new[statistic] / old[statistic] if old[statistic] > 0 else float('inf')
+        flag = 'regression' if ratio > 1 + threshold else 'improvement' if ratio < 1 / (1 + threshold) else ''
+        rows.append((key, old[statistic], new[statistic], ratio, flag))
+    return rows
+
+
+# ParaPy-free benchmarks, the methods and attributes delegate to these helper functions with the same arguments
+
+# spacer counts of the stacking benchmarks, up to the bound of the Structure input
+STACK_SPACERS = (0, 1, 2, 3, 4, 5, 6, 24, 96)
+
+
+def _stacking_setup(spacers):
+    def setup(size):
+        from cubesat_configurator import stacking_helpers as stk
+        boards = [dict(board) for board in rm.STACK_BOARDS]
+        return lambda: stk.optimal_stack(boards, boards[0], rm.STACK_HEIGHT, spacers)
+    return setup
+
+
+for _spacers in STACK_SPACERS:
+    benchmark(f'stacking_helpers.optimal_stack[spacers={_spacers}]', sizes=('typical',), helper_only=True)(_stacking_setup(_spacers))
+
+
+def _selection_setup(subsystem):
+    def setup(size):
+        from cubesat_configurator import selection_helpers as sh
+        criteria = dict(rm.SELECTION_CRITERIA[subsystem])
+        component = rm.component_catalog(criteria.pop('file_name'), size)
+        mass_factor, cost_factor, power_factor = rm.SELECTION_WEIGHTS
+        return lambda: sh.select_component(component, mass_factor=mass_factor, cost_factor=cost_factor,
+                                           power_factor=power_factor, **criteria)
+    return setup
+
+
+for _subsystem in rm.SELECTION_CRITERIA:
+    benchmark(f'component_selection[{_subsystem}]', helper_only=True)(_selection_setup(_subsystem))
+
+
+@benchmark('Thermal.selected_coating', helper_only=True)
+def _selected_coating(size):
+    from cubesat_configurator import catalog
+    from cubesat_configurator import constants
+    from cubesat_configurator import thermal_helpers as th
+    repeats = rm.CATALOG_REPEATS[size]
+    tables = {source: rm.pd.concat([catalog.load_catalog(path)] * repeats, ignore_index=True)
+              for source, path in (('SMAD', constants.Thermal.body_coatings_path), ('NASA', constants.Thermal.sa_coatings_path))}
+
+    def selected_coating():
+        # the index is an attribute of its own, built once per design like selected_coating itself
+        return th.select_coating_indexed(th.build_coating_index(tables), **rm.THERMAL_CASE)
+    return selected_coating
+
+
+@benchmark('fill_report_template', repeat=3)
+def _fill_report_template(size):
+    from cubesat_configurator import constants
+    from cubesat_configurator import report_generator
+    data, tables = rm.report_data(), rm.report_tables(size)
+    output_path = os.path.join(tempfile.mkdtemp(prefix='cubesat_benchmark_'), 'report.docx')
+    return lambda: report_generator.fill_report_template(constants.GenericConfig.report_template_path, output_path,
+                                                         data, tables, renderer='none', background=False)
+
+
+# Benchmarks of the model, a new reference Mission per sample with the attributes the timed one depends on evaluated
+
+def _mission_setup(prepare, timed):
+    def setup(size):
+        mission = rm.make_mission(size)
+        with rm.simulation_days(rm.DAYS_TO_SIMULATE[size]):
+            prepare(mission.cubesat)
+
+        def evaluate():
+            with rm.simulation_days(rm.DAYS_TO_SIMULATE[size]):
+                return timed(mission.cubesat)
+        return evaluate
+    return setup
+
+
+def _prepare_last_orbit(cubesat):
+    cubesat.simulate_first_orbit
+    cubesat.simulate_second_orbit
+    cubesat.thermal.selected_coating
+    cubesat.power.battery_selection
+    cubesat.total_mass
+
+
+def _prepare_heater(cubesat):
+    cubesat.thermal.selected_coating
+
+
+def _structure_stacking_setup(spacers):
+    # Structure.optimal_stacking_order of the reference mission with the given number of spacers, the boards evaluated
+    def prepare(cubesat):
+        cubesat.structure.number_of_spacers = spacers
+        cubesat.structure.form_factor
+        cubesat.structure.subsystem_data_for_stacking
+    return _mission_setup(prepare, lambda cubesat: cubesat.structure.optimal_stacking_order)
+
+
+_MODEL = ('parapy', 'pykep', 'paseos')
+
+benchmark('simulate_first_orbit', requires=_MODEL, repeat=3, pure=False)(
+    _mission_setup(lambda cubesat: cubesat.orbit.position_vector, lambda cubesat: cubesat.simulate_first_orbit))
+benchmark('simulate_second_orbit', requires=_MODEL, repeat=3, pure=False)(
+    _mission_setup(lambda cubesat: cubesat.simulate_first_orbit, lambda cubesat: cubesat.simulate_second_orbit))
+benchmark('simulate_last_orbit', requires=_MODEL, repeat=3, pure=False)(
+    _mission_setup(_prepare_last_orbit, lambda cubesat: cubesat.simulate_last_orbit))
+benchmark('Thermal.final_heater_values', requires=_MODEL, repeat=3, pure=False)(
+    _mission_setup(_prepare_heater, lambda cubesat: cubesat.thermal.final_heater_values))
+for _spacers in STACK_SPACERS:
+    benchmark(f'Structure._find_optimal_stacking_order[spacers={_spacers}]', requires=_MODEL, sizes=('typical',), repeat=3,
+              pure=False)(_structure_stacking_setup(_spacers))
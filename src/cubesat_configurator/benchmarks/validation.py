@@ -0,0 +1,435 @@
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from cubesat_configurator import catalog
+from cubesat_configurator import constants
+from cubesat_configurator import simulation_loop
+from cubesat_configurator.benchmarks import paseos_stub
+from cubesat_configurator.benchmarks import suite
+
+# Validation of simulation engines against the reference: every scenario of the corpus runs through every available
+# engine, the eclipse time, contact windows, battery state of charge, onboard data and temperature are compared with
+# the reference engine within a tolerance per metric, next to the speedup over the reference.
+#     python -m cubesat_configurator.benchmarks validate --out validation.json
+# The reference is PASEOS, or the PASEOS stub when PASEOS is not installed; without pykep neither runs and the
+# validation is skipped with the reason. An engine is a function of a scenario that returns the trace of the loop of
+# CubeSat.simulate_last_orbit, registered with @engine. All engines step that same loop, simulation_loop.run_mission_loop,
+# either with actors or by replaying the eclipse and contact flags they found, so they differ in the orbit, eclipse,
+# line of sight and thermal models only.
+
+ENGINES = {}  # name: (function, required modules)
+REFERENCE_ENGINES = ('paseos', 'stub')  # in order of preference
+
+MINIMUM_ALTITUDE_ANGLE = 10  # deg, as in paseos_parser.set_ground_station
+EARTH_RADIUS = 6378137.0  # m, as pykep
+MU_EARTH = 398600441800000.0  # m^3/s^2, as pykep
+AU = 149597870691.0  # m, as pykep
+DAY2SEC = simulation_loop.DAY2SEC
+TRACE_KEYS = ('time_s', 'eclipse', 'station_contact', 'battery_SoC', 'onboard_data', 'temperature')
+
+# scenario defaults: a 2U CubeSat with the bookkeeping of simulate_last_orbit
+DEFAULTS = dict(start=datetime(2024, 8, 1, 8), days=1, dt=constants.PaseosConfig.simulation_timestep,
+                eccentricity=0.0, raan=0.0, argument_of_periapsis=0.0, true_anomaly=0.0,
+                power_idle=2.0, power_comm=6.0, capacity=20 * 3600.0, charging_rate=8.0,
+                images_per_day=5, picture_size=8e5, downlink_data_rate=1000.0, bus_data_rate=1.0,
+                mass=3.0, absorptivity=0.3, emissivity=0.8, side_panel=0.02, front_panel=0.01, T0=290.0)
+
+# corpus of reference scenarios, stations are rows of ground_stations.csv
+SCENARIOS = {
+    'sso_500_delft_hawaii': dict(altitude=500, inclination=97.4, raan=0.0, stations=[58, 53]),
+    'dawn_dusk_sso_delft': dict(altitude=500, inclination=97.4, raan=45.0, stations=[58]),  # no eclipse
+    'iss_like_kourou': dict(altitude=420, inclination=51.6, raan=120.0, stations=[49]),
+    'equatorial_600_kourou': dict(altitude=600, inclination=0.0, stations=[49], images_per_day=10),
+    'polar_network_3_days': dict(altitude=550, inclination=90.0, stations=[58, 53, 49, 0, 10, 20, 30, 40], days=3),
+    'elliptic_sso_2_days': dict(altitude=500, inclination=97.4, eccentricity=0.02, argument_of_periapsis=90.0,
+                                stations=[58], days=2, capacity=10 * 3600.0),
+}
+
+# metric: (description, unit, tolerance)
+TOLERANCES = {
+    'eclipse_time': ('relative error of the eclipse time', '-', 0.02),
+    'contact_time': ('relative error of the total contact time', '-', 0.05),
+    'contacts': ('difference in the number of contact windows', 'windows', 0),
+    'contact_windows': ('largest start or end offset of matched contact windows', 's', 2 * constants.PaseosConfig.simulation_timestep),
+    'battery_SoC': ('largest difference of the state of charge', '-', 0.02),
+    # pictures at a step boundary may fall one step apart, so the maximum is compared as in the simulate_* results
+    'onboard_data': ('relative error of the maximum onboard data', '-', 0.05),
+    'temperature': ('largest difference of the temperature', 'K', 2.0),
+}
+
+
+def engine(name, requires=()):
+    """
+    Register a simulation engine, skipped when one of the required modules is not installed.
+    """
+    def register(function):
+        ENGINES[name] = (function, tuple(requires))
+        return function
+    return register
+
+
+def scenario(name):
+    "Parameters of a scenario of the corpus with the defaults filled in"
+    return {'name': name, **DEFAULTS, **SCENARIOS[name]}
+
+
+def scenario_stations(parameters):
+    "Ground stations of a scenario as a DataFrame with Lat, Lon and Elevation"
+    return catalog.load_catalog('ground_stations.csv').iloc[parameters['stations']].reset_index(drop=True)
+
+
+def start_mjd2000(parameters):
+    return (parameters['start'] - datetime(2000, 1, 1)).total_seconds() / DAY2SEC
+
+
+def orbit_elements(parameters):
+    "Semi major axis in m and the angles in rad, the altitude is the mean altitude as in Orbit"
+    return ((parameters['altitude'] * 1000 + EARTH_RADIUS), parameters['eccentricity'],
+            *np.radians([parameters['inclination'], parameters['raan'], parameters['argument_of_periapsis'],
+                         parameters['true_anomaly']]))
+
+
+class _FlagReplay:
+    """
+    Actor and simulation in one for simulation_loop.run_mission_loop that replays eclipse and contact flags found
+    without stepping an actor, with the battery and the single node thermal model of the PASEOS stub.
+    """
+    def __init__(self, parameters, eclipse, contact, heat_balance):
+        p = parameters
+        self.parameters, self.eclipse, self.contact, self.heat_balance = p, eclipse, contact, heat_balance
+        self.thermal = dict(mass=p['mass'], alpha=p['absorptivity'], epsilon=p['emissivity'], sun_area=p['side_panel'],
+                            earth_area=p['side_panel'], emissive_area=4 * p['side_panel'] + 2 * p['front_panel'],
+                            capacity=900, heat_ratio=1)
+        # the epoch advances as the one of the stub actors, so pictures at a step boundary fall on the same step
+        self.epoch = SimpleNamespace(mjd2000=start_mjd2000(p))
+        self.local_time = self.epoch
+        self.step, self.battery, self.temperature = 0, p['capacity'], p['T0']
+
+    @property
+    def simulation_time(self):
+        return self.local_time.mjd2000 * DAY2SEC
+
+    @property
+    def state_of_charge(self):
+        return self.battery / self.parameters['capacity']
+
+    @property
+    def temperature_in_C(self):
+        return self.temperature - 273.15
+
+    def is_in_eclipse(self):
+        return bool(self.eclipse[self.step])
+
+    def in_contact(self):
+        return bool(self.contact[self.step])
+
+    def get_position(self, epoch):
+        return None
+
+    def advance_time(self, dt, power_consumption):
+        p, eclipse_flag = self.parameters, self.eclipse[self.step]
+        charge = 0.0 if eclipse_flag else p['charging_rate']
+        self.battery = min(max(self.battery + (charge - power_consumption) * dt, 0.0), p['capacity'])
+        self.temperature += (self.heat_balance(self.thermal, self.temperature, 0.0 if eclipse_flag else 1.0, power_consumption)
+                             * dt / (self.thermal['mass'] * self.thermal['capacity']))
+        self.local_time = SimpleNamespace(mjd2000=self.local_time.mjd2000 + dt / DAY2SEC)
+        self.step += 1
+
+
+def bookkeeping(parameters, eclipse, contact, heat_balance=None):
+    """
+    Battery, onboard data and temperature per step from the eclipse and contact flags, through the loop of
+    CubeSat.simulate_last_orbit. Used by engines that find eclipses and contacts without stepping an actor.
+
+    Returns:
+    dict: Arrays battery_SoC, onboard_data and temperature (deg C) at the start of every step.
+    """
+    replay = _FlagReplay(parameters, eclipse, contact, heat_balance or paseos_stub.heat_balance)
+    status = _run_loop(replay, replay, [replay.in_contact], replay.epoch, len(eclipse), parameters)
+    return {key: status[key] for key in ('battery_SoC', 'onboard_data', 'temperature')}
+
+
+def _run_loop(sat_actor, sim, contact_checks, t0, runs, parameters):
+    # the loop of the model without printing, the trace as arrays
+    p = parameters
+    status, _ = simulation_loop.run_mission_loop(sat_actor, sim, contact_checks, t0, runs, p['dt'], p['power_comm'],
+                                                 p['power_idle'], p['downlink_data_rate'], DAY2SEC / p['images_per_day'],
+                                                 p['picture_size'], p['bus_data_rate'], p['capacity'], verbose=False)
+    return {key: np.array(status[key]) for key in TRACE_KEYS}
+
+
+def run_actors(paseos, parameters):
+    """
+    Build the actors of a scenario on a module with the PASEOS API and step them through the loop of
+    CubeSat.simulate_last_orbit, without printing.
+
+    Returns:
+    dict: Trace with arrays time_s, eclipse, station_contact (steps x stations), battery_SoC, onboard_data and
+    temperature (deg C).
+    """
+    import pykep as pk
+    p = parameters
+    t0 = pk.epoch(start_mjd2000(p))
+    a, e, i, raan, argument_of_periapsis, true_anomaly = orbit_elements(p)
+    # the last element of par2ic is the eccentric anomaly
+    position, velocity = pk.par2ic([a, e, i, raan, argument_of_periapsis, _eccentric_anomaly(true_anomaly, e)], pk.MU_EARTH)
+    sat_actor = paseos.ActorBuilder.get_actor_scaffold(name="myCubeSat", actor_type=paseos.SpacecraftActor, epoch=t0)
+    paseos.ActorBuilder.set_orbit(actor=sat_actor, position=position, velocity=velocity, epoch=t0,
+                                  central_body=pk.planet.jpl_lp("earth"))
+    paseos.ActorBuilder.set_thermal_model(
+        actor=sat_actor, actor_mass=p['mass'], actor_initial_temperature_in_K=p['T0'],
+        actor_sun_absorptance=p['absorptivity'], actor_infrared_absorptance=p['emissivity'],
+        actor_sun_facing_area=p['side_panel'], actor_central_body_facing_area=p['side_panel'],
+        actor_emissive_area=4 * p['side_panel'] + 2 * p['front_panel'], actor_thermal_capacity=900,
+        power_consumption_to_heat_ratio=1)
+    paseos.ActorBuilder.add_comm_device(actor=sat_actor, device_name="comm_1", bandwidth_in_kbps=p['downlink_data_rate'])
+    paseos.ActorBuilder.set_power_devices(actor=sat_actor, battery_level_in_Ws=p['capacity'], max_battery_level_in_Ws=p['capacity'],
+                                          charging_rate_in_W=p['charging_rate'], power_device_type=paseos.PowerDeviceType.SolarPanel)
+    sim = paseos.init_sim(sat_actor)
+    ground_stations = []
+    for station in scenario_stations(p).itertuples():
+        actor = paseos.ActorBuilder.get_actor_scaffold(name=f"gs_{station.Number}", actor_type=paseos.GroundstationActor, epoch=t0)
+        paseos.ActorBuilder.set_ground_station_location(actor, latitude=station.Lat, longitude=station.Lon,
+                                                        elevation=station.Elevation, minimum_altitude_angle=MINIMUM_ALTITUDE_ANGLE)
+        sim.add_known_actor(actor)
+        ground_stations.append(actor)
+
+    contact_checks = [lambda station=station: sat_actor.is_in_line_of_sight(station, sat_actor.local_time)
+                      for station in ground_stations]
+    return _run_loop(sat_actor, sim, contact_checks, t0, int(p['days'] * DAY2SEC / p['dt']), p)
+
+
+@engine('paseos', requires=('pykep', 'paseos'))
+def _paseos_engine(parameters):
+    import paseos
+    if getattr(paseos, '__stub__', False):
+        raise ModuleNotFoundError("PASEOS is replaced by the stub", name='paseos')
+    return run_actors(paseos, parameters)
+
+
+@engine('stub', requires=('pykep',))
+def _stub_engine(parameters):
+    return run_actors(paseos_stub, parameters)
+
+
+def earth_heliocentric(mjd2000):
+    """
+    Heliocentric ecliptic position of the Earth in m from the JPL approximate elements of the Earth-Moon barycenter,
+    as pykep.planet.jpl_lp('earth').
+    """
+    centuries = np.asarray(mjd2000) / 36525.0
+    a = (1.00000261 + 0.00000562 * centuries) * AU
+    e = 0.01671123 - 0.00004392 * centuries
+    i = np.radians(-0.00001531 - 0.01294668 * centuries)
+    mean_longitude = np.radians(100.46457166 + 35999.37244981 * centuries)
+    periapsis_longitude = np.radians(102.93768193 + 0.32327364 * centuries)
+    node = np.zeros_like(centuries)
+    return _kepler_positions(a, e, i, node, periapsis_longitude - node, mean_longitude - periapsis_longitude)
+
+
+def _kepler_positions(a, e, i, raan, argument_of_periapsis, mean_anomaly):
+    # positions of elliptic orbits, vectorized over the mean anomaly, Newton iterations of Kepler's equation
+    E = np.array(mean_anomaly, dtype=float)
+    for _ in range(20):
+        E = E - (E - e * np.sin(E) - mean_anomaly) / (1 - e * np.cos(E))
+    x, y = a * (np.cos(E) - e), a * np.sqrt(1 - e ** 2) * np.sin(E)
+    cos_w, sin_w, cos_W, sin_W, cos_i, sin_i = (np.cos(argument_of_periapsis), np.sin(argument_of_periapsis),
+                                                np.cos(raan), np.sin(raan), np.cos(i), np.sin(i))
+    return np.stack([(cos_W * cos_w - sin_W * sin_w * cos_i) * x + (-cos_W * sin_w - sin_W * cos_w * cos_i) * y,
+                     (sin_W * cos_w + cos_W * sin_w * cos_i) * x + (-sin_W * sin_w + cos_W * cos_w * cos_i) * y,
+                     (sin_w * sin_i) * x + (cos_w * sin_i) * y], axis=-1)
+
+
+def _eccentric_anomaly(true_anomaly, e):
+    return 2 * np.arctan2(np.sqrt(1 - e) * np.sin(true_anomaly / 2), np.sqrt(1 + e) * np.cos(true_anomaly / 2))
+
+
+def _mean_anomaly(true_anomaly, e):
+    E = _eccentric_anomaly(true_anomaly, e)
+    return E - e * np.sin(E)
+
+
+@engine('analytic')
+def _analytic_engine(parameters):
+    """
+    Vectorized two-body engine without PASEOS and pykep: Kepler's equation for all steps at once, a cylindrical Earth
+    shadow, stations on a rotating spherical Earth, then the bookkeeping loop over the flags.
+    """
+    p = parameters
+    dt = p['dt']
+    runs = int(p['days'] * DAY2SEC / dt)
+    time_s = np.arange(runs) * dt
+    mjd2000 = start_mjd2000(p) + time_s / DAY2SEC
+    a, e, i, raan, argument_of_periapsis, true_anomaly = orbit_elements(p)
+    mean_anomaly = _mean_anomaly(true_anomaly, e) + np.sqrt(MU_EARTH / a ** 3) * time_s
+    positions = _kepler_positions(a, e, i, raan, argument_of_periapsis, mean_anomaly)
+
+    sun = -earth_heliocentric(mjd2000)
+    sun /= np.linalg.norm(sun, axis=1)[:, None]
+    along = np.einsum('ij,ij->i', positions, sun)
+    eclipse = (along < 0) & (np.linalg.norm(positions - along[:, None] * sun, axis=1) < EARTH_RADIUS)
+
+    stations = scenario_stations(p)
+    latitude = np.radians(stations['Lat'].to_numpy(dtype=float))
+    longitude = np.radians(stations['Lon'].to_numpy(dtype=float))[None, :] + paseos_stub.gmst(mjd2000)[:, None]
+    radius = EARTH_RADIUS + stations['Elevation'].to_numpy(dtype=float)
+    station_positions = np.stack([radius * np.cos(latitude) * np.cos(longitude), radius * np.cos(latitude) * np.sin(longitude),
+                                  np.broadcast_to(radius * np.sin(latitude), longitude.shape)], axis=-1)
+    line = positions[:, None, :] - station_positions
+    sin_elevation = np.einsum('ijk,ijk->ij', line, station_positions) / (np.linalg.norm(line, axis=2) * np.linalg.norm(station_positions, axis=2))
+    station_contact = sin_elevation >= np.sin(np.radians(MINIMUM_ALTITUDE_ANGLE))
+
+    trace = bookkeeping(p, eclipse, station_contact.any(axis=1))
+    return {'time_s': time_s, 'eclipse': eclipse, 'station_contact': station_contact, **trace}
+
+
+# comparison
+
+def contact_windows(station_contact, dt):
+    """
+    Contact windows per station as (station, start s, end s), a window still open at the end ends with the trace.
+    """
+    windows = []
+    padded = np.pad(np.asarray(station_contact, dtype=np.int8).reshape(len(station_contact), -1), ((1, 1), (0, 0)))
+    for station in range(padded.shape[1]):
+        changes = np.diff(padded[:, station])
+        for start, end in zip(np.flatnonzero(changes == 1), np.flatnonzero(changes == -1)):
+            windows.append((station, start * dt, end * dt))
+    return windows
+
+
+def _window_offset(reference_windows, windows):
+    # largest start or end offset between each reference window and the overlapping window of the same station
+    offsets = []
+    for station, start, end in reference_windows:
+        matches = [(s, e) for st, s, e in windows if st == station and s < end and e > start]
+        if matches:
+            s, e = max(matches, key=lambda window: min(window[1], end) - max(window[0], start))
+            offsets.append(max(abs(s - start), abs(e - end)))
+    return max(offsets) if offsets else 0.0
+
+
+def compare_traces(reference, trace, dt):
+    """
+    Error of a trace against the reference trace per metric of TOLERANCES.
+    """
+    steps = min(len(reference['time_s']), len(trace['time_s']))
+    reference = {key: value[:steps] for key, value in reference.items()}
+    trace = {key: value[:steps] for key, value in trace.items()}
+    reference_windows = contact_windows(reference['station_contact'], dt)
+    windows = contact_windows(trace['station_contact'], dt)
+    reference_eclipse = reference['eclipse'].sum() * dt
+    reference_contact = sum(end - start for _, start, end in reference_windows)
+
+    def relative(value, reference_value):
+        return abs(value - reference_value) / reference_value if reference_value else float(value != reference_value)
+    return {
+        'eclipse_time': relative(trace['eclipse'].sum() * dt, reference_eclipse),
+        'contact_time': relative(sum(end - start for _, start, end in windows), reference_contact),
+        'contacts': abs(len(windows) - len(reference_windows)),
+        'contact_windows': _window_offset(reference_windows, windows),
+        'battery_SoC': float(np.max(np.abs(trace['battery_SoC'] - reference['battery_SoC']))),
+        'onboard_data': relative(np.max(trace['onboard_data']), np.max(reference['onboard_data'])),
+        'temperature': float(np.max(np.abs(trace['temperature'] - reference['temperature']))),
+    }
+
+
+def available_engines(names=None):
+    """
+    Engines that can run here, with the reason for the others.
+
+    Returns:
+    tuple: (list of names, dict of skipped name: reason).
+    """
+    available, skipped = [], {}
+    for name, (function, requires) in ENGINES.items():
+        if names and name not in names:
+            continue
+        missing = suite.Benchmark(name, function, requires).missing()
+        if name == 'paseos' and not missing and getattr(sys.modules.get('paseos'), '__stub__', False):
+            missing = ['paseos (replaced by the stub)']
+        if missing:
+            skipped[name] = f"requires {', '.join(missing)}"
+        else:
+            available.append(name)
+    return available, skipped
+
+
+def run_validation(scenarios=None, engines=None, reference=None, repeat=1, progress=print):
+    """
+    Run the scenarios through the engines and compare them with the reference engine.
+
+    Parameters:
+    scenarios: Names of SCENARIOS, all by default.
+    engines: Names of ENGINES, all available by default.
+    reference: Name of the reference engine, the first available of REFERENCE_ENGINES by default.
+    repeat: Runs per engine and scenario, the fastest counts for the speedup.
+
+    Returns:
+    dict: 'meta', the 'reference', the 'skipped' engines with their reason, 'runs' with the wall time per scenario
+    and engine, and 'errors' with one row per scenario, engine and metric (Error, Tolerance, Passed). Without an
+    available reference engine nothing runs, the reference is None and 'message' gives the reason.
+    """
+    available, skipped = available_engines(engines)
+    if reference is None:
+        reference = next((name for name in REFERENCE_ENGINES if name in available), None)
+    if reference not in available:
+        names = [reference] if reference else REFERENCE_ENGINES
+        reasons = '; '.join(f"{name} {skipped.get(name, 'not selected')}" for name in names)
+        message = f"no reference engine to validate against ({reasons})"
+        if progress is not None:
+            progress(f"validation skipped: {message}")
+        return {'meta': suite.metadata('unavailable'), 'reference': None, 'skipped': skipped, 'runs': [], 'errors': [],
+                'message': message}
+    runs, errors = [], []
+    for name in scenarios or SCENARIOS:
+        parameters = scenario(name)
+        traces, times = {}, {}
+        for engine_name in [reference] + [other for other in available if other != reference]:
+            function = ENGINES[engine_name][0]
+            wall_times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                traces[engine_name] = function(parameters)
+                wall_times.append(time.perf_counter() - start)
+            times[engine_name] = min(wall_times)
+            runs.append({'Scenario': name, 'Engine': engine_name, 'Wall_time_s': times[engine_name],
+                         'Speedup': times[reference] / times[engine_name]})
+            if engine_name == reference:
+                continue
+            for metric, error in compare_traces(traces[reference], traces[engine_name], parameters['dt']).items():
+                tolerance = TOLERANCES[metric][2]
+                errors.append({'Scenario': name, 'Engine': engine_name, 'Metric': metric, 'Error': float(error),
+                               'Tolerance': tolerance, 'Passed': bool(error <= tolerance)})
+            if progress is not None:
+                failed = [row['Metric'] for row in errors[-len(TOLERANCES):] if not row['Passed']]
+                progress(f"{name:25s} {engine_name:10s} x{runs[-1]['Speedup']:8.1f}  "
+                         + (f"outside tolerance: {', '.join(failed)}" if failed else 'within tolerance'))
+    paseos_mode = 'real' if reference == 'paseos' else 'stub'
+    return {'meta': suite.metadata(paseos_mode), 'reference': reference, 'skipped': skipped, 'runs': runs, 'errors': errors}
+
+
+def validation_report(results):
+    """
+    Error against speedup per engine: the median speedup over the scenarios, the largest error relative to its
+    tolerance per metric (1 is at the tolerance) and whether all scenarios passed.
+
+    Returns:
+    DataFrame: One row per engine other than the reference.
+    """
+    errors = pd.DataFrame(results['errors'], columns=['Scenario', 'Engine', 'Metric', 'Error', 'Tolerance', 'Passed'])
+    runs = pd.DataFrame(results['runs'], columns=['Scenario', 'Engine', 'Wall_time_s', 'Speedup'])
+    if errors.empty:
+        return pd.DataFrame(columns=['Engine', 'Speedup', 'Passed'])
+    # an exact metric with zero tolerance counts any difference as 1 tolerance over
+    errors['Error_to_tolerance'] = np.where(errors['Tolerance'] > 0, errors['Error'] / errors['Tolerance'].where(errors['Tolerance'] > 0, 1),
+                                            np.where(errors['Error'] > 0, 1 + errors['Error'], 0.0))
+    report = errors.pivot_table(index='Engine', columns='Metric', values='Error_to_tolerance', aggfunc='max')[list(TOLERANCES)]
+    report.insert(0, 'Speedup', runs[runs['Engine'] != results['reference']].groupby('Engine')['Speedup'].median())
+    report['Passed'] = errors.groupby('Engine')['Passed'].all()
+    return report.reset_index()
@@ -0,0 +1,57 @@
+import os
+import threading
+import pandas as pd
+from cubesat_configurator import compiled_catalog
+
+# callers get shallow copies of the cached frames, copy on write keeps the cache unchanged when they modify them
+pd.options.mode.copy_on_write = True
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+_lock = threading.Lock()
+_catalogs = {}
+
+
+def catalog_path(file_name):
+    """
+    Absolute path of a catalog, file names are relative to the data directory.
+    """
+    return file_name if os.path.isabs(file_name) else os.path.join(DATA_DIR, file_name)
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_catalog(file_name) -> pd.DataFrame:
+    """
+    Component catalog from a CSV file, parsed once per process.
+    The file is parsed again only when its modification time or size changes.
+    Files in the data directory are read from the compiled binary catalog, other files from the CSV.
+
+    Parameters:
+    file_name: CSV file in the data directory or an absolute path.
+
+    Returns:
+    DataFrame: Read-only view of the catalog, modifications copy the data instead of changing the cached frame.
+    """
+    path = catalog_path(file_name)
+    version = _file_version(path)
+    with _lock:
+        cached = _catalogs.get(path)
+        if cached is None or cached[0] != version:
+            frame = compiled_catalog.load_compiled(path)
+            if frame is None:
+                frame = pd.read_csv(path)
+            cached = (version, frame)
+            _catalogs[path] = cached
+    return cached[1].copy(deep=False)
+
+
+def clear_catalogs():
+    """
+    Drop all cached catalogs.
+    """
+    with _lock:
+        _catalogs.clear()
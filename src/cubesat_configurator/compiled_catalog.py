@@ -0,0 +1,178 @@
+import glob
+import json
+import os
+import struct
+import threading
+import numpy as np
+import pandas as pd
+
+# Compiled catalog: all CSV libraries in data/ in one typed, columnar binary file.
+# Layout: magic, header length (uint64), JSON header, then the columns, each aligned to ALIGNMENT bytes.
+# Numeric columns are memory mapped without copying, text columns are stored as fixed width unicode with a null mask.
+# The CSV files stay the editable source, the binary is rebuilt when any of them changes.
+
+MAGIC = b'CSCAT\x00\x01\x00'
+ALIGNMENT = 64
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+STORE_PATH = os.path.join(DATA_DIR, 'catalogs.bin')
+
+_lock = threading.Lock()
+_store = None
+
+
+def source_files(data_dir=DATA_DIR):
+    """
+    CSV sources of the compiled catalog: data/*.csv and the thermal coating tables, relative to data_dir.
+    """
+    patterns = [os.path.join(data_dir, '*.csv'), os.path.join(data_dir, 'thermal_coatings', '*.csv')]
+    paths = sorted(path for pattern in patterns for path in glob.glob(pattern))
+    return [os.path.relpath(path, data_dir).replace(os.sep, '/') for path in paths]
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def _encode_column(column:pd.Series):
+    """
+    Arrays stored for a column: the values and, for text columns, the null mask.
+    """
+    if column.dtype.kind in 'biuf':
+        return {'kind': 'numeric'}, [column.to_numpy()]
+    nulls = column.isna().to_numpy()
+    text = column.astype(object).where(~nulls, '').to_numpy().astype(str)
+    return {'kind': 'text', 'dtype': str(column.dtype)}, [text, nulls]
+
+
+def compile_catalogs(data_dir=DATA_DIR, store_path=STORE_PATH):
+    """
+    Compile all CSV libraries into the binary catalog at store_path.
+    The file is written next to its final location and moved in place, readers never see a partial file.
+
+    Returns:
+    str: Path of the compiled catalog.
+    """
+    header = {'tables': {}}
+    arrays = []
+    offset = 0
+    for name in source_files(data_dir):
+        path = os.path.join(data_dir, name)
+        version = _file_version(path)
+        frame = pd.read_csv(path)
+        columns = []
+        for column_name in frame.columns:
+            spec, column_arrays = _encode_column(frame[column_name])
+            spec['name'] = column_name
+            spec['arrays'] = []
+            for array in column_arrays:
+                array = np.ascontiguousarray(array)
+                spec['arrays'].append({'dtype': array.dtype.str, 'length': len(array), 'offset': offset})
+                arrays.append((offset, array))
+                offset += array.nbytes + _padding(array.nbytes)
+            columns.append(spec)
+        header['tables'][name] = {'version': version, 'rows': len(frame), 'columns': columns}
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = len(MAGIC) + 8 + len(header_bytes)
+    data_start += _padding(data_start)
+    temporary_path = f"{store_path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack('<Q', len(header_bytes)))
+        file.write(header_bytes)
+        file.write(b'\x00' * (data_start - file.tell()))
+        for array_offset, array in arrays:
+            file.seek(data_start + array_offset)
+            file.write(array.tobytes())
+    try:
+        os.replace(temporary_path, store_path)
+    except OSError:
+        os.remove(temporary_path)
+        raise
+    return store_path
+
+
+class CompiledCatalog:
+    """
+    Memory mapped view of a compiled catalog file.
+    """
+
+    def __init__(self, store_path=STORE_PATH):
+        self.store_path = store_path
+        self.version = _file_version(store_path)
+        self.buffer = np.memmap(store_path, dtype=np.uint8, mode='r')
+        if bytes(self.buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{store_path} is not a compiled catalog.")
+        header_length = struct.unpack('<Q', bytes(self.buffer[len(MAGIC):len(MAGIC) + 8]))[0]
+        header_end = len(MAGIC) + 8 + header_length
+        self.header = json.loads(bytes(self.buffer[len(MAGIC) + 8:header_end]).decode('utf-8'))
+        self.data_start = header_end + _padding(header_end)
+
+    @property
+    def tables(self):
+        return self.header['tables']
+
+    def is_current(self, data_dir=DATA_DIR):
+        """
+        True if the catalog holds exactly the current CSV sources.
+        """
+        if source_files(data_dir) != sorted(self.tables):
+            return False
+        return all(_file_version(os.path.join(data_dir, name)) == table['version'] for name, table in self.tables.items())
+
+    def _array(self, spec):
+        dtype = np.dtype(spec['dtype'])
+        start = self.data_start + spec['offset']
+        return np.frombuffer(self.buffer, dtype=dtype, count=spec['length'], offset=start)
+
+    def table(self, name) -> pd.DataFrame:
+        """
+        Table of a CSV source as a DataFrame, numeric columns share memory with the mapped file.
+        """
+        table = self.tables[name]
+        columns = {}
+        for spec in table['columns']:
+            arrays = [self._array(array) for array in spec['arrays']]
+            if spec['kind'] == 'numeric':
+                columns[spec['name']] = arrays[0]
+            else:
+                values = arrays[0].astype(object)
+                values[arrays[1]] = np.nan
+                columns[spec['name']] = pd.Series(values).astype(spec['dtype'])
+        return pd.DataFrame(columns, index=pd.RangeIndex(table['rows']), copy=False)
+
+
+def load_compiled(path, data_dir=DATA_DIR, store_path=STORE_PATH):
+    """
+    Table of the CSV file at path from the compiled catalog, compiling it first if it is missing or out of date.
+
+    Returns:
+    DataFrame or None: None if path is not a catalog source or the compiled catalog cannot be written.
+    """
+    global _store
+    name = os.path.relpath(os.path.abspath(path), data_dir).replace(os.sep, '/')
+    with _lock:
+        store = _store
+        if store is None or store.store_path != store_path or not store.is_current(data_dir):
+            if name not in source_files(data_dir):
+                return None
+            try:
+                if not os.path.exists(store_path) or not CompiledCatalog(store_path).is_current(data_dir):
+                    # release the old mapping, it would block replacing the file on Windows
+                    _store = store = None
+                    compile_catalogs(data_dir, store_path)
+                store = _store = CompiledCatalog(store_path)
+            except (OSError, ValueError):
+                return None
+        if name not in store.tables:
+            return None
+        return store.table(name)
+
+
+if __name__ == '__main__':
+    print(f"Compiled {len(source_files())} catalogs into {compile_catalogs()}")
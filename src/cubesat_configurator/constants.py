@@ -1,18 +1,30 @@
-import pykep as pk
 import os
+from cubesat_configurator.lazy import lazy_import, lazy_constant
+
+pk = lazy_import('pykep')
 
 script_dir = os.path.dirname(__file__)
 
 
 class PaseosConfig:
     simulation_timestep = 60  # seconds
-    start_epoch = pk.epoch_from_string("2024-august-01 08:00:00")
-    earth = pk.planet.jpl_lp("earth")
+
+    @lazy_constant
+    def start_epoch():
+        return pk.epoch_from_string("2024-august-01 08:00:00")
+
+    @lazy_constant
+    def earth():
+        return pk.planet.jpl_lp("earth")
+
     days_to_simulate = 1  # days
     relative_plots_path = os.path.join(script_dir, 'plots', 'simulation_plots.png')
     simulation_plots_location = os.path.join(script_dir, relative_plots_path)
     relative_animation_output_path = os.path.join('animations', 'orbit_animation')
     animation_output_path = os.path.join(script_dir, relative_animation_output_path)
+    earth_map_path = os.path.join(script_dir, 'images', 'earth.jpg')
+    animation_frame_stride = 5  # simulation steps per animation frame
+    progress_interval = 100  # simulation steps between progress callbacks
     
 
 class Thermal:
@@ -33,6 +45,16 @@ class SystemConfig:
     system_margin = 0.2
 
 
+class StructureConfig:
+    # form factors with their stack height limit in mm, the stack has to stay below the limit
+    form_factors = [(1, 100), (1.5, 150), (2, 200), (3, 300)]
+    # buses with several stacks side by side: form factor with the (x, y) centers of its stacks in mm, every stack is 3U high
+    layouts = {6: [(-50, 0), (50, 0)], 12: [(-50, -50), (50, -50), (-50, 50), (50, 50)]}
+    layout_stack_height = 300
+    # spacers of equal height in a stack; beyond this, masses without a common quantum can make the exact search slow
+    max_spacers = 100
+
+
 class GenericConfig:
     relative_step_file_path = os.path.join(script_dir, 'step_files', 'cubesat_configuration.step')
     step_file_location = os.path.join(script_dir, relative_step_file_path)
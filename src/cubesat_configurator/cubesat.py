@@ -3,19 +3,22 @@ from parapy.geom import *
 from parapy.core.validate import OneOf, LessThan, GreaterThan, GreaterThanOrEqualTo, IsInstance, Range
 from cubesat_configurator import subsystems as subsys
 from cubesat_configurator import subsystem as ac
+from cubesat_configurator import selection_helpers as sh
 import numpy as np
-import pykep as pk
-import yaml
 import os
 from pprint import pprint
 from cubesat_configurator import paseos_parser as pp
-import paseos
-from paseos import ActorBuilder, SpacecraftActor, GroundstationActor, PowerDeviceType
 from cubesat_configurator import constants
+from cubesat_configurator import simulation_metrics as sm
+from cubesat_configurator import simulation_loop as sl
+from cubesat_configurator import thermal_helpers as th
+from cubesat_configurator.lazy import lazy_import
 from cubesat_configurator.orbit import Orbit
-import matplotlib.pyplot as plt
 from cubesat_configurator.structure import Structure
-import matplotlib.pyplot as plt
+
+pk = lazy_import('pykep')
+paseos = lazy_import('paseos')
+plotting = lazy_import('cubesat_configurator.plotting')
 
 
 
@@ -24,6 +27,7 @@ class CubeSat(GeomBase):
     cost_factor = Input(0.3, validator=Range(0, 1))
     mass_factor = Input(0.4, validator=Range(0, 1))
     power_factor = Input(0.3, validator=Range(0, 1))
+    simulation_progress = Input(None, doc="Called with the metrics of a running simulation every PaseosConfig.progress_interval steps, None for no progress reports")
 
     
 
@@ -81,7 +85,76 @@ class CubeSat(GeomBase):
         """
         return self.system_data_rate/(self.simulate_first_orbit["comm_window_fraction"]) * (1+constants.SystemConfig.system_margin) # kbps
 
-    @Part 
+    def batch_component_selection(self, weights):
+        """
+        Selects the components of all subsystems for many weight vectors at once, without changing the design.
+        The requirements are those of the current design, e.g. the battery capacity follows from the currently selected subsystems.
+
+        Parameters:
+            weights: (n, 3) array of (mass_factor, cost_factor, power_factor) rows.
+
+        Returns:
+            dict: Subsystem name to a DataFrame of the selected components, one row per weight vector.
+        """
+        selections = {}
+        for subsystem in (self.adcs, self.communication, self.obc, self.power):
+            criteria = subsystem.selection_criteria
+            positions = sh.batch_select_components(weights=weights, **criteria)
+            selections[subsystem.__class__.__name__] = criteria['component'].iloc[positions].reset_index(drop=True)
+        return selections
+
+    @Attribute
+    def joint_component_selection(self):
+        """
+        Selects the ADCS, communication, onboard computer and battery together with the structure, minimizing the total score
+        within the height limits of the form factors. The requirements are those of the current design.
+
+        Returns:
+            dict: Selected components per subsystem, 'Form Factor', 'Structure' and the total 'Score'.
+        """
+        subsystems = {subsystem.__class__.__name__: subsystem for subsystem in (self.adcs, self.communication, self.obc, self.power)}
+        criteria = {name: subsystem.selection_criteria for name, subsystem in subsystems.items()}
+        structure = self.structure.read_struct_from_csv()
+        result = sh.optimize_joint_selection(criteria, structure, self.mass_factor, self.cost_factor, self.power_factor,
+                                             fixed_height=self.payload.height)
+        selection = {name: criteria[name]['component'].iloc[position] for name, position in result['Selection'].items()}
+        selection['Form Factor'] = result['Form Factor']
+        selection['Structure'] = structure.iloc[result['Structure']]
+        selection['Score'] = result['Score']
+        return selection
+
+    @Attribute
+    def pareto_components(self):
+        """
+        Components of every subsystem that are Pareto optimal in mass, cost and power, independent of the weights.
+
+        Returns:
+            dict: Subsystem name to a DataFrame of its non-dominated feasible components.
+        """
+        pareto = {}
+        for subsystem in (self.adcs, self.communication, self.obc, self.power):
+            criteria = dict(subsystem.selection_criteria)
+            component = criteria.pop('component')
+            pareto[subsystem.__class__.__name__] = component.iloc[sh.pareto_components(component, **criteria)]
+        return pareto
+
+    @Attribute
+    def pareto_front(self):
+        """
+        Pareto optimal designs of the whole CubeSat in total mass, cost and power, independent of the weights.
+        The requirements are those of the current design.
+
+        Returns:
+            DataFrame: One row per design with Mass, Cost, Power, Form_Factor and the company of every subsystem.
+        """
+        subsystems = {subsystem.__class__.__name__: subsystem for subsystem in (self.adcs, self.communication, self.obc, self.power)}
+        criteria = {name: subsystem.selection_criteria for name, subsystem in subsystems.items()}
+        front = sh.system_pareto_front(criteria, self.structure.read_struct_from_csv(), fixed_height=self.payload.height)
+        for name in subsystems:
+            front[name] = criteria[name]['component']['Company'].to_numpy()[front[name].to_numpy()]
+        return front.drop(columns='Structure')
+
+    @Part
     def orbit(self):
         """
         Returns an instance of the Orbit class with the maximum allowed orbital altitude from the mission as input.
@@ -95,19 +168,18 @@ class CubeSat(GeomBase):
         Simulates the first run of paseos for a day to get communication windows and eclipse times. 
         """
         verbose = False
-        plotting = False
         # Things that will be calculated
         eclipse_time = 0
 
         # Set the start epoch of the simulation
         t0 = constants.PaseosConfig.start_epoch
         # Create a spacecraft actor
-        sat_actor = ActorBuilder.get_actor_scaffold(name="myCubeSat",
-                                        actor_type=SpacecraftActor,
+        sat_actor = paseos.ActorBuilder.get_actor_scaffold(name="myCubeSat",
+                                        actor_type=paseos.SpacecraftActor,
                                         epoch=t0)
 
         # Set the orbit of sat_actor.
-        ActorBuilder.set_orbit(actor=sat_actor,
+        paseos.ActorBuilder.set_orbit(actor=sat_actor,
                             position=self.orbit.position_vector,
                             velocity=self.orbit.velocity_vector,
                             epoch=t0, 
@@ -137,9 +209,6 @@ class CubeSat(GeomBase):
         runs = int(pk.DAY2SEC / dt) * days_to_simulate
         # print(f"runs: {runs}")
 
-        if plotting:
-            plotter = paseos.plot(sim, paseos.PlotType.SpacePlot)
-
         simulation_inputs = {
             "simulation_start": t0,
             "simulation_duration": pk.DAY2SEC,
@@ -160,23 +229,23 @@ class CubeSat(GeomBase):
                 "-----------------------------------------------------"
             )
 
+        metrics = sm.SimulationMetrics(runs, self.simulation_progress, constants.PaseosConfig.progress_interval)
+        metrics.start()
         for i in range(runs):
 
             eclipse_flag = sat_actor.is_in_eclipse()
             if eclipse_flag:
                 eclipse_time += dt
+            metrics.lap('eclipse')
 
             for gs_info in used_gs_info_list:
                 gs_info.has_link_to_ground_station()
+            metrics.lap('line_of_sight')
 
             # advance the time
             sim.advance_time(dt, 0)
-
-            if plotting:
-                plotter.update(sim)
-
-        if plotting:
-            plotter.animate(sim=sim, dt=dt, steps=runs, save_to_file="animations\mymovie")
+            metrics.lap('propagation')
+            metrics.step()
 
         total_comm_window = 0
         comm_windows = []
@@ -186,6 +255,8 @@ class CubeSat(GeomBase):
             total_comm_window += contact_time 
             comm_windows.extend(gs_info.comm_window_list)
 
+        metrics_summary = metrics.finish(contacts=len(comm_windows), line_of_sight_checks=runs*len(used_gs_info_list))
+
         # RESULTS
         simulation_results = {
             "simulation_inputs": simulation_inputs,
@@ -201,6 +272,7 @@ class CubeSat(GeomBase):
             "average_comm_window": total_comm_window / len(comm_windows),
             "longest_comm_window": max(comm_windows),
             "number_of_contacts_per_day": len(comm_windows) / days_to_simulate,
+            "metrics": metrics_summary,
         }
 
         if verbose:
@@ -246,7 +318,6 @@ class CubeSat(GeomBase):
         Simulates the first run of paseos for a day to get communication windows and eclipse times. 
         """
         verbose = False
-        plotting = False
         # Things that will be calculated
         eclipse_time = 0
         onboard_data = 0 # kbits
@@ -295,26 +366,26 @@ class CubeSat(GeomBase):
         # Set the start epoch of the simulation
         t0 = constants.PaseosConfig.start_epoch
         # Create a spacecraft actor
-        sat_actor = ActorBuilder.get_actor_scaffold(name="myCubeSat",
-                                        actor_type=SpacecraftActor,
+        sat_actor = paseos.ActorBuilder.get_actor_scaffold(name="myCubeSat",
+                                        actor_type=paseos.SpacecraftActor,
                                         epoch=t0)
 
         # Set the orbit of sat_actor.
-        ActorBuilder.set_orbit(actor=sat_actor,
+        paseos.ActorBuilder.set_orbit(actor=sat_actor,
                             position=self.orbit.position_vector,
                             velocity=self.orbit.velocity_vector,
                             epoch=t0, 
                             central_body=constants.PaseosConfig.earth)
         
-        ActorBuilder.add_comm_device(actor=sat_actor,
+        paseos.ActorBuilder.add_comm_device(actor=sat_actor,
                              device_name="comm_1",
                              bandwidth_in_kbps=downlink_data_rate)
 
-        ActorBuilder.set_power_devices(actor=sat_actor,
+        paseos.ActorBuilder.set_power_devices(actor=sat_actor,
                                     battery_level_in_Ws=capacity, # start with full battery
                                     max_battery_level_in_Ws=capacity,
                                     charging_rate_in_W=charging_rate,
-                                    power_device_type=PowerDeviceType.SolarPanel)
+                                    power_device_type=paseos.PowerDeviceType.SolarPanel)
         
         # Initialize PASEOS simulation
         sim = paseos.init_sim(sat_actor)
@@ -334,9 +405,6 @@ class CubeSat(GeomBase):
         runs = int(days_to_simulate * pk.DAY2SEC / dt) 
         # print(f"runs: {runs}")
 
-        if plotting:
-            plotter = paseos.plot(sim, paseos.PlotType.SpacePlot)
-
         simulation_inputs = {
             "simulation_start": t0,
             "simulation_duration": pk.DAY2SEC,
@@ -359,16 +427,20 @@ class CubeSat(GeomBase):
         ### SIMULATION LOOP ###
         #######################
 
+        metrics = sm.SimulationMetrics(runs, self.simulation_progress, constants.PaseosConfig.progress_interval)
+        metrics.start()
         for i in range(runs):
 
             eclipse_flag = sat_actor.is_in_eclipse()
             if eclipse_flag:
                 eclipse_time += dt
+            metrics.lap('eclipse')
 
             contact_list = []
             for gs_info in used_gs_info_list:
                 contact = gs_info.has_link_to_ground_station()
                 contact_list.append(contact)
+            metrics.lap('line_of_sight')
 
             # if there is a contact with any ground station
             # calculate the power consumption and data rate
@@ -388,9 +460,12 @@ class CubeSat(GeomBase):
             if PICTURE_OVERDUE:
                 onboard_data += picture_size
                 pictures_taken += 1
+                metrics.count('pictures')
+                metrics.lap('bookkeeping')
                 print(" ------------- PICTURE TAKEN! --------------------\n"
                     f"Picture nr {pictures_taken} taken at: {sat_actor.local_time}\n"
                     "----------------------------------------------------")
+                metrics.lap('printing')
 
             # update the status dict for plotting
             status_dict["time_s"].append(sim.simulation_time - t0.mjd2000*pk.DAY2SEC)
@@ -403,17 +478,14 @@ class CubeSat(GeomBase):
 
             # update onboard data with the bus data rate
             onboard_data += bus_data_rate*dt
+            metrics.lap('bookkeeping')
 
             # advance the time
             sim.advance_time(dt, power_consumption)
-
-            if plotting:
-                plotter.update(sim)
+            metrics.lap('propagation')
+            metrics.step()
 
 
-        if plotting:
-            plotter.animate(sim=sim, dt=dt, steps=runs, save_to_file="animations\mymovie")
-
         #################################
         ######## POST-PROCESSING ########
         #################################
@@ -432,7 +504,10 @@ class CubeSat(GeomBase):
             total_comm_window += contact_time 
             comm_windows.extend(gs_info.comm_window_list)
 
+        metrics_summary = metrics.finish(contacts=len(comm_windows), line_of_sight_checks=runs*len(used_gs_info_list))
+
         status_dict["comm_windows"] = comm_windows
+        status_dict["metrics"] = metrics_summary
 
         #################################
         ############ RESULTS ############
@@ -452,6 +527,7 @@ class CubeSat(GeomBase):
             "average_comm_window": total_comm_window / len(comm_windows),
             "longest_comm_window": max(comm_windows),
             "number_of_contacts_per_day": len(comm_windows) / days_to_simulate,
+            "metrics": metrics_summary,
             "maximum_onboard_data": max_onboard_data,
             "minimum_onboard_data": min_onboard_data,
         }
@@ -498,22 +574,6 @@ class CubeSat(GeomBase):
         Simulates the first run of paseos for a day to get communication windows and eclipse times. 
         """
         verbose = False
-        plotting = False
-        # Things that will be calculated
-        eclipse_time = 0
-        onboard_data = 0 # kbits
-        pictures_taken = 0
-        status_dict = { 
-            "time_s": [],
-            "time_h": [],
-            "eclipse": [],
-            "contact": [],
-            "power_consumption": [],
-            "battery_SoC": [],
-            "onboard_data": [],
-            "comm_windows": [],
-            "temperature": [],
-        } # status dict for plotting
 
         # Getting parameters from other places
 
@@ -524,8 +584,8 @@ class CubeSat(GeomBase):
         mass = self.total_mass # kg
         alpha = self.thermal.selected_coating["Absorptivity"]
         epsilon = self.thermal.selected_coating["Emissivity"]
-        side_panel = self.structure.form_factor * 0.01  # m^2
-        front_panel = 0.01  # m^2
+        areas = th.cubesat_areas(self.structure.form_factor)
+        side_panel = areas['Side Panel']  # m^2
         T0_in_K = (self.thermal.selected_coating["Hot Case"] + self.thermal.selected_coating["Cold Case"])/2  # K
 
         # Orbit parameters
@@ -551,18 +611,18 @@ class CubeSat(GeomBase):
         # Set the start epoch of the simulation
         t0 = constants.PaseosConfig.start_epoch
         # Create a spacecraft actor
-        sat_actor = ActorBuilder.get_actor_scaffold(name="myCubeSat",
-                                        actor_type=SpacecraftActor,
+        sat_actor = paseos.ActorBuilder.get_actor_scaffold(name="myCubeSat",
+                                        actor_type=paseos.SpacecraftActor,
                                         epoch=t0)
 
         # Set the orbit of sat_actor.
-        ActorBuilder.set_orbit(actor=sat_actor,
+        paseos.ActorBuilder.set_orbit(actor=sat_actor,
                             position=self.orbit.position_vector,
                             velocity=self.orbit.velocity_vector,
                             epoch=t0, 
                             central_body=constants.PaseosConfig.earth)
         
-        ActorBuilder.set_thermal_model(
+        paseos.ActorBuilder.set_thermal_model(
             actor=sat_actor,
             actor_mass=mass,
             actor_initial_temperature_in_K=T0_in_K,
@@ -570,20 +630,20 @@ class CubeSat(GeomBase):
             actor_infrared_absorptance=epsilon,
             actor_sun_facing_area=side_panel,
             actor_central_body_facing_area=side_panel,
-            actor_emissive_area=4 * side_panel + 2 * front_panel,
+            actor_emissive_area=areas['Surface'],
             actor_thermal_capacity=900,
             power_consumption_to_heat_ratio=1,
     )
         
-        ActorBuilder.add_comm_device(actor=sat_actor,
+        paseos.ActorBuilder.add_comm_device(actor=sat_actor,
                              device_name="comm_1",
                              bandwidth_in_kbps=downlink_data_rate)
 
-        ActorBuilder.set_power_devices(actor=sat_actor,
+        paseos.ActorBuilder.set_power_devices(actor=sat_actor,
                                     battery_level_in_Ws=capacity, # start with full battery
                                     max_battery_level_in_Ws=capacity,
                                     charging_rate_in_W=charging_rate,
-                                    power_device_type=PowerDeviceType.SolarPanel)
+                                    power_device_type=paseos.PowerDeviceType.SolarPanel)
         
         # Initialize PASEOS simulation
         sim = paseos.init_sim(sat_actor)
@@ -603,9 +663,6 @@ class CubeSat(GeomBase):
         runs = int(days_to_simulate * pk.DAY2SEC / dt) 
         # print(f"runs: {runs}")
 
-        if plotting:
-            plotter = paseos.plot(sim, paseos.PlotType.SpacePlot)
-
         simulation_inputs = {
             "simulation_start": t0,
             "simulation_duration": pk.DAY2SEC,
@@ -628,66 +685,14 @@ class CubeSat(GeomBase):
         ### SIMULATION LOOP ###
         #######################
 
-        for i in range(runs):
-
-            eclipse_flag = sat_actor.is_in_eclipse()
-            if eclipse_flag:
-                eclipse_time += dt
-
-            contact_list = []
-            for gs_info in used_gs_info_list:
-                contact = gs_info.has_link_to_ground_station()
-                contact_list.append(contact)
+        # the step loop is shared with the validation harness; the status dict is for plotting, the positions are the
+        # trajectory for orbit_animation
+        metrics = sm.SimulationMetrics(runs, self.simulation_progress, constants.PaseosConfig.progress_interval)
+        contact_checks = [gs_info.has_link_to_ground_station for gs_info in used_gs_info_list]
+        status_dict, eclipse_time = sl.run_mission_loop(sat_actor, sim, contact_checks, t0, runs, dt, power_comm, power_idle,
+                                                        downlink_data_rate, time_btw_pics, picture_size, bus_data_rate,
+                                                        capacity, metrics)
 
-            # if there is a contact with any ground station
-            # calculate the power consumption and data rate
-            if any(contact_list):
-                power_consumption = power_comm  # W
-                # reduce the onboard data by the downlink data rate until it reaches 0
-                onboard_data -= downlink_data_rate*dt
-                if onboard_data < 0:
-                    onboard_data = 0
-            else:
-                power_consumption = power_idle  # W
-
-            # check if it is time to take a picture, this basically divides the orbit in equal time intervals and takes a picture at each interval
-            # simulation starts halfway through the first interval, so the first picture is taken at t = t0 + time_btw_pics/2
-            local_time_since_start = (sat_actor.local_time.mjd2000 - t0.mjd2000)*pk.DAY2SEC
-            PICTURE_OVERDUE = local_time_since_start > time_btw_pics*(0.5+pictures_taken) # 0.5 is a buffer time, to avoid taking picture right at the edges of the time interval
-            if PICTURE_OVERDUE:
-                onboard_data += picture_size
-                pictures_taken += 1
-                print(" ------------- PICTURE TAKEN! --------------------\n"
-                    f"Picture nr {pictures_taken} taken at: {sat_actor.local_time}\n"
-                    "----------------------------------------------------")
-                
-            temperature = sat_actor.temperature_in_C
-
-            # update the status dict for plotting
-            status_dict["time_s"].append(sim.simulation_time - t0.mjd2000*pk.DAY2SEC)
-            status_dict["time_h"].append(((sim.simulation_time - t0.mjd2000*pk.DAY2SEC))/3600)
-            status_dict["eclipse"].append(eclipse_flag)
-            status_dict["contact"].append(contact)
-            status_dict["power_consumption"].append(power_consumption)
-            status_dict["battery_SoC"].append(sat_actor.state_of_charge)
-            status_dict["onboard_data"].append(onboard_data)
-            status_dict["temperature"].append(temperature)
-
-            # update onboard data with the bus data rate
-            onboard_data += bus_data_rate*dt
-
-            if dt*power_consumption > capacity*status_dict["battery_SoC"][-1]:
-                power_consumption = 0
-
-            # advance the time
-            sim.advance_time(dt, power_consumption)
-
-            if plotting:
-                plotter.update(sim)
-
-
-        if plotting:
-            plotter.animate(sim=sim, dt=dt, steps=runs, save_to_file=constants.PaseosConfig.animation_output_path)
 
         #################################
         ######## POST-PROCESSING ########
@@ -707,7 +712,10 @@ class CubeSat(GeomBase):
             total_comm_window += contact_time 
             comm_windows.extend(gs_info.comm_window_list)
 
+        metrics_summary = metrics.finish(contacts=len(comm_windows), line_of_sight_checks=runs*len(used_gs_info_list))
+
         status_dict["comm_windows"] = comm_windows
+        status_dict["metrics"] = metrics_summary
 
         #################################
         ############ RESULTS ############
@@ -727,6 +735,7 @@ class CubeSat(GeomBase):
             "average_comm_window": total_comm_window / len(comm_windows),
             "longest_comm_window": max(comm_windows),
             "number_of_contacts_per_day": len(comm_windows) / days_to_simulate,
+            "metrics": metrics_summary,
             "maximum_onboard_data": max_onboard_data,
             "minimum_onboard_data": min_onboard_data,
         }
@@ -800,102 +809,12 @@ class CubeSat(GeomBase):
     @Attribute
     def plot_simulation_data(self):
         """
-        Plot the simulation data for the first orbit.
+        Plot the simulation data for the first orbit. The panels are drawn with Agg in worker processes and
+        skipped when the plots on disk already show this telemetry.
         """
-        
         status_dict = self.simulate_last_orbit
-        # Extracting data
-        time = status_dict["time_s"]
-        hours = status_dict["time_h"]
-        eclipse = status_dict["eclipse"]
-        contact = status_dict["contact"]
-        power_consumption = status_dict["power_consumption"]
-        battery_SoC = status_dict["battery_SoC"]
-        onboard_data = status_dict["onboard_data"]
-        comm_windows = status_dict["comm_windows"]
-
-        # Plotting the data
-        fig = plt.figure(figsize=(12, 8))
-
-        # Plot eclipse
-        plt.subplot(3, 3, 1)
-        plt.plot(hours, eclipse, label="Eclipse")
-        plt.xlabel("Time [hours]")
-        plt.ylabel("Eclipse")
-        plt.title("Eclipse over Time")
-        plt.grid(True)
-
-        # Plot contact
-        plt.subplot(3, 3, 2)
-        plt.plot(hours, contact, label="Contact", color='orange')
-        plt.xlabel("Time [hours]")
-        plt.ylabel("Contact")
-        plt.title("Contact over Time")
-        plt.grid(True)
-
-        # Plot power consumption
-        plt.subplot(3, 3, 3)
-        plt.plot(hours, power_consumption, label="Power Consumption", color='green')
-        plt.xlabel("Time [hours]")
-        plt.ylabel("Power Consumption (W)")
-        plt.title("Power Consumption over Time")
-        plt.grid(True)
-
-        # Plot battery DoD
-        plt.subplot(3, 3, 4)
-        plt.plot(hours, battery_SoC, label="battery SoC", color='red')
-        plt.xlabel("Time [hours]")
-        plt.ylabel("Battery SoC (%)")
-        plt.title("Battery State of Charge over Time")
-        plt.grid(True)
-
-        # Plot comms window duration
-        plt.subplot(3, 3, 6)
-        plt.hist(comm_windows, bins=10, color='blue')
-        plt.xlabel("Comm Window Duration (s)")
-        plt.ylabel("Frequency")
-        plt.title("Comm Window Duration Histogram")
-        plt.grid(False)
-
-        # Plot onboard data
-        plt.subplot(3, 3, 5)
-        plt.plot(hours, onboard_data, label="Onboard Data", color='purple')
-        plt.xlabel("Time [hours]")
-        plt.ylabel("Onboard Data (kbits)")
-        plt.title("Onboard Data over Time")
-        plt.grid(True)
-
-        # Plot temperature
-        plt.subplot(3, 3, 7)
-        plt.plot(hours, status_dict["temperature"], label="Temperature", color='black')
-        plt.xlabel("Time [hours]")
-        plt.ylabel("Temperature (C)")
-        plt.title("Temperature over Time")
-        plt.grid(True)
-
-        # Sample path to the map of the earth, replace with the actual path to your map image
-        earth_map_path = r"src\cubesat_configurator\images\earth.jpg"
-
-        # Load the image of the Earth
-        img = plt.imread(earth_map_path)
-
-        # Plot the ground station locations
-        plt.subplot(3, 3, 8)
-        plt.imshow(img, extent=[-180, 180, -90, 90])
-        for gs in self.parent.groundstation:
-            plt.scatter(gs.longitude, gs.latitude, label=gs.name, color='red')
-            plt.text(gs.longitude, gs.latitude, gs.name, fontsize=9, ha='right', color='blue')
-
-        plt.xlabel("Longitude")
-        plt.ylabel("Latitude")
-        plt.title("Ground Station Locations")
-        plt.grid(False)
-
-        plt.tight_layout()
-
-        plt.savefig(constants.PaseosConfig.simulation_plots_location)
-        plt.close()
-
+        stations = [(gs.name, gs.longitude, gs.latitude) for gs in self.parent.groundstation]
+        plotting.plot_simulation(status_dict, stations, constants.PaseosConfig.simulation_plots_location)
         return status_dict
 
 
@@ -0,0 +1,61 @@
+import json
+import subprocess
+import sys
+
+# Import time budget of the package, checked in fresh interpreters:
+#     python -m cubesat_configurator.import_budget
+# Every entry imports a module and fails when it takes longer than its budget or loads a heavy dependency it should defer.
+
+HEAVY = ['parapy', 'paseos', 'pykep', 'matplotlib', 'scipy', 'docx', 'docx2pdf']
+
+# module, budget in seconds, dependencies that must not be loaded by the import
+# the light entries take a few ms; their budgets leave room for slow shared CI runners and still fail on an eager
+# import of numpy or pandas, which alone takes a few hundred ms
+BUDGETS = [
+    ('cubesat_configurator', 0.2, HEAVY + ['pandas', 'numpy']),
+    ('cubesat_configurator.constants', 0.2, HEAVY + ['pandas', 'numpy']),
+    ('cubesat_configurator.pdf_rendering', 0.25, HEAVY + ['pandas', 'numpy']),
+    ('cubesat_configurator.catalog', 1.0, HEAVY),
+    ('cubesat_configurator.selection_helpers', 1.0, HEAVY),
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted({{name.split('.')[0] for name in sys.modules}})
+print(json.dumps({{'elapsed': elapsed, 'loaded': loaded}}))
+"""
+
+
+def measure(module, python=sys.executable):
+    """
+    Import time of a module in a fresh interpreter and the top-level modules loaded after it.
+    """
+    output = subprocess.run([python, '-c', _PROBE.format(module=module)], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def check(budgets=BUDGETS, repeat=3):
+    """
+    Check all budgets, the best of repeat imports counts.
+
+    Returns:
+    list: (module, time, budget, deferred dependencies that were loaded, passed) per entry.
+    """
+    results = []
+    for module, budget, deferred in budgets:
+        runs = [measure(module) for _ in range(repeat)]
+        elapsed = min(run['elapsed'] for run in runs)
+        loaded = [name for name in deferred if name in runs[0]['loaded']]
+        results.append((module, elapsed, budget, loaded, elapsed <= budget and not loaded))
+    return results
+
+
+if __name__ == '__main__':
+    results = check()
+    for module, elapsed, budget, loaded, passed in results:
+        print(f"{'ok  ' if passed else 'FAIL'} {module:45s} {elapsed * 1000:8.1f} ms (budget {budget * 1000:.0f} ms)"
+              + (f", loads {', '.join(loaded)}" if loaded else ''))
+    sys.exit(0 if all(result[-1] for result in results) else 1)
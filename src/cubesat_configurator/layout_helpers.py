@@ -0,0 +1,210 @@
+import itertools
+import numpy as np
+from cubesat_configurator import constants
+
+
+def _first_fit_decreasing(heights, columns, capacity):
+    """
+    Column per board by first fit decreasing, None if a board does not fit.
+    """
+    load = [0.0] * columns
+    assignment = [None] * len(heights)
+    for board in sorted(range(len(heights)), key=lambda i: -heights[i]):
+        for column in range(columns):
+            if load[column] + heights[board] < capacity:
+                load[column] += heights[board]
+                assignment[board] = column
+                break
+        else:
+            return None
+    return assignment
+
+
+def _exact_packing(heights, columns, capacity):
+    """
+    Column per board by depth-first search, None if no packing exists.
+    Boards are placed from the highest down and a board only opens the first empty column, as empty columns are interchangeable.
+    """
+    order = sorted(range(len(heights)), key=lambda i: -heights[i])
+    load = [0.0] * columns
+    assignment = [None] * len(heights)
+
+    def place(k):
+        if k == len(order):
+            return True
+        board = order[k]
+        for column in range(columns):
+            if load[column] + heights[board] < capacity:
+                load[column] += heights[board]
+                assignment[board] = column
+                if place(k + 1):
+                    return True
+                load[column] -= heights[board]
+            if load[column] == 0:
+                break
+        return False
+
+    return assignment if place(0) else None
+
+
+def pack_columns(heights, columns, capacity):
+    """
+    Assign boards to columns so that every column stays below capacity.
+    First fit decreasing answers most cases at once, an exact search decides the rest.
+
+    Returns:
+    list or None: Column of every board, None if the boards cannot be packed.
+    """
+    return _first_fit_decreasing(heights, columns, capacity) or _exact_packing(heights, columns, capacity)
+
+
+def layout_form_factor(heights):
+    """
+    Smallest multi-stack form factor whose stacks can hold the boards, None if none can.
+    """
+    for size, centers in constants.StructureConfig.layouts.items():
+        if pack_columns(heights, len(centers), constants.StructureConfig.layout_stack_height) is not None:
+            return size
+    return None
+
+
+def bus_envelope(form_factor):
+    """
+    Outer box of the structure of a form factor, a 100 mm square per stack.
+
+    Returns:
+    tuple: dimensions (x, y, z) and center (x, y, z) of the box in mm, the stack(s) start at z = 0.
+    """
+    if form_factor in constants.StructureConfig.layouts:
+        centers_xy = np.array(constants.StructureConfig.layouts[form_factor], dtype=float)
+        height = constants.StructureConfig.layout_stack_height
+        return ((np.ptp(centers_xy[:, 0]) + 100, np.ptp(centers_xy[:, 1]) + 100, height),
+                (*centers_xy.mean(axis=0), height / 2))
+    height = 100 * form_factor
+    return (100, 100, height), (0, 0, height / 2)
+
+
+def stack_CoM(stack):
+    """
+    CoM (x, y, z) of a stack of dicts with mass, CoM_Location and optionally x and y.
+    """
+    masses = np.array([sub['mass'] for sub in stack], dtype=float)
+    positions = np.array([[sub.get('x', 0), sub.get('y', 0), sub['CoM_Location']] for sub in stack], dtype=float)
+    return masses @ positions / masses.sum()
+
+
+def _column_orders(boards, fixed_at_bottom=None):
+    """
+    Board orders of a stack packed from the bottom, one per distinct z moment.
+
+    Returns:
+    dict: z moment to the order, bottom first.
+    """
+    orders = {}
+    for order in itertools.permutations(boards):
+        order = ([fixed_at_bottom] if fixed_at_bottom is not None else []) + list(order)
+        moment, height = 0.0, 0.0
+        for sub in order:
+            moment += sub['mass'] * (height + sub['height'] / 2)
+            height += sub['height']
+        orders.setdefault(round(moment, 9), order)
+    return orders
+
+
+def _matching_orders(column_orders, target):
+    """
+    One order per stack whose z moments add up to target.
+    """
+    if not column_orders:
+        return [] if abs(target) < 1e-6 else None
+    for moment, order in column_orders[0].items():
+        rest = _matching_orders(column_orders[1:], target - moment)
+        if rest is not None:
+            return [order] + rest
+    return None
+
+
+def optimal_layout(subsystems, fixed_at_bottom, form_factor):
+    """
+    Layout of the subsystems over the stacks of a multi-stack bus that brings the 3D CoM closest to the geometric center.
+
+    The x and y of the CoM only depend on which stack holds each board, the z follows from the order in every stack and
+    from spacers of free height lifting the boards. A stack of mass M with free space s lifts its moment by any value
+    between 0 and s * M (the payload stays at the bottom of the first stack), so the reachable z moments of an assignment
+    are intervals around the bottom packed orders. Assignments are visited by increasing x-y offset, the search stops
+    once that offset alone cannot beat the best 3D offset found.
+
+    Parameters:
+    subsystems: dicts with name, mass and height, including fixed_at_bottom.
+    fixed_at_bottom: Subsystem at the bottom of the first stack.
+    form_factor: Multi-stack form factor in StructureConfig.layouts.
+
+    Returns:
+    list: Boards and spacers as dicts with name, mass, height, CoM_Location, x and y, the highest first.
+    """
+    centers = np.array(constants.StructureConfig.layouts[form_factor], dtype=float)
+    capacity = constants.StructureConfig.layout_stack_height
+    boards = [sub for sub in subsystems if sub is not fixed_at_bottom]
+    masses = np.array([sub['mass'] for sub in boards], dtype=float)
+    heights = np.array([sub['height'] for sub in boards], dtype=float)
+    total_mass = masses.sum() + fixed_at_bottom['mass']
+    centered_moment = total_mass * capacity / 2
+    center_xy = centers.mean(axis=0)
+
+    # every assignment of the boards to the stacks, the payload is in the first stack (all stacks are alike)
+    assignments = np.array(list(itertools.product(range(len(centers)), repeat=len(boards))), dtype=int).reshape(-1, len(boards))
+    one_hot = assignments[:, :, None] == np.arange(len(centers))[None, None, :]
+    column_heights = (one_hot * heights[None, :, None]).sum(axis=1)
+    column_heights[:, 0] += fixed_at_bottom['height']
+    column_masses = (one_hot * masses[None, :, None]).sum(axis=1)
+    fits = np.all(column_heights < capacity, axis=1)
+    if not np.any(fits):
+        raise ValueError("The subsystems do not fit the stacks of the form factor.")
+    assignments, column_heights, column_masses = assignments[fits], column_heights[fits], column_masses[fits]
+    column_masses_total = column_masses.copy()
+    column_masses_total[:, 0] += fixed_at_bottom['mass']
+    xy = column_masses_total @ centers / total_mass - center_xy
+    xy_offsets = np.hypot(xy[:, 0], xy[:, 1])
+
+    best = (np.inf, None)
+    for a in np.argsort(xy_offsets, kind='stable'):
+        if xy_offsets[a] >= best[0]:
+            break
+        column_orders = [_column_orders([boards[i] for i in np.flatnonzero(assignments[a] == column)],
+                                        fixed_at_bottom if column == 0 else None) for column in range(len(centers))]
+        # reachable z moments: one interval [S, S + total lift] per combination of bottom packed moments
+        sums = np.zeros(1)
+        for orders in column_orders:
+            sums = np.unique((sums[:, None] + np.array(list(orders))[None, :]).ravel())
+        total_lift = float(((capacity - column_heights[a]) * column_masses[a]).sum())
+        gaps = np.maximum(np.maximum(sums - centered_moment, centered_moment - (sums + total_lift)), 0)
+        offset = np.hypot(xy_offsets[a], gaps.min() / total_mass)
+        if offset < best[0]:
+            best = (offset, (a, column_orders, total_lift, sums[np.argmin(gaps)]))
+
+    a, column_orders, total_lift, start_sum = best[1]
+    fraction = 0.0 if total_lift <= 0 else min(max((centered_moment - start_sum) / total_lift, 0.0), 1.0)
+
+    stack, spacer_index = [], 0
+    for column, order in enumerate(_matching_orders(column_orders, start_sum)):
+        if not order:
+            continue
+        x, y = centers[column]
+        space = capacity - column_heights[a, column]
+        column_stack = [dict(sub) for sub in order]
+        # every stack is lifted by the same share of its free space, above the payload in the first stack
+        lift = fraction * space
+        position = 1 if column == 0 else 0
+        if lift > 1e-9 and column_stack[position:]:
+            column_stack.insert(position, {'name': f'Spacer_{spacer_index}', 'mass': 0, 'height': lift, 'CoM_Location': None})
+            spacer_index += 1
+        if space - lift > 1e-9:
+            column_stack.append({'name': f'Spacer_{spacer_index}', 'mass': 0, 'height': space - lift, 'CoM_Location': None})
+            spacer_index += 1
+        height = 0.0
+        for sub in column_stack:
+            sub['CoM_Location'] = height + sub['height'] / 2
+            sub['x'], sub['y'] = float(x), float(y)
+            height += sub['height']
+        stack.extend(column_stack)
+    return sorted(stack, key=lambda sub: sub['CoM_Location'], reverse=True)
@@ -0,0 +1,51 @@
+import importlib
+import importlib.util
+import sys
+import types
+
+# Deferred imports and constants, so that importing the package does not load pykep, paseos, scipy, matplotlib or
+# python-docx before they are used.
+
+
+def lazy_import(name):
+    """
+    Module that is only executed on its first attribute access.
+
+    Parameters:
+    name: Absolute module name, e.g. 'pykep' or 'scipy.optimize'.
+
+    Returns:
+    module: The module, already imported modules are returned as they are. A module that is not installed raises
+    ModuleNotFoundError on first use, not here.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return _MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+class _MissingModule(types.ModuleType):
+    def __getattr__(self, attribute):
+        raise ModuleNotFoundError(f"No module named '{self.__name__}'", name=self.__name__)
+
+
+class lazy_constant:
+    """
+    Class attribute computed by a function without arguments on first access, then stored on the class.
+    """
+    def __init__(self, function):
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance, owner):
+        value = self.function()
+        setattr(owner, self.name, value)
+        return value
@@ -0,0 +1,92 @@
+import numpy as np
+from cubesat_configurator import layout_helpers as lay
+
+# Analytic mass properties of the configured CubeSat: every subsystem is a solid box, the structure a thin-walled
+# box of four side panels. Inputs are in g and mm like the catalogs, results are in SI units (kg, m, kg m^2).
+# All functions accept leading batch dimensions, e.g. one row per candidate layout.
+
+BOARD_SIZE = 94  # mm, length and width of every subsystem board
+
+
+def box_inertia(masses, dimensions) -> np.ndarray:
+    """
+    Inertia tensors of solid boxes about their own centers.
+
+    Parameters:
+    masses: (..., n) masses in kg.
+    dimensions: (..., n, 3) edge lengths along x, y and z in m.
+
+    Returns:
+    np.ndarray: (..., n, 3, 3) inertia tensors in kg m^2.
+    """
+    masses = np.asarray(masses, dtype=float)
+    squares = np.asarray(dimensions, dtype=float) ** 2
+    diagonal = np.stack([squares[..., 1] + squares[..., 2], squares[..., 0] + squares[..., 2], squares[..., 0] + squares[..., 1]], axis=-1)
+    return masses[..., None, None] / 12 * (diagonal[..., :, None] * np.eye(3))
+
+
+def side_panel_inertia(mass, dimensions) -> np.ndarray:
+    """
+    Inertia tensor of a thin-walled box without top and bottom, the mass spread over the four side panels by area.
+
+    Parameters:
+    mass: (...) mass in kg.
+    dimensions: (..., 3) outer edge lengths along x, y and z in m.
+
+    Returns:
+    np.ndarray: (..., 3, 3) inertia tensor about the center in kg m^2.
+    """
+    mass = np.asarray(mass, dtype=float)
+    a, b, h = np.moveaxis(np.asarray(dimensions, dtype=float), -1, 0)
+    # panels at x = +-a/2 (b x h) and at y = +-b/2 (a x h)
+    m_x = mass * b / (2 * (a + b))
+    m_y = mass * a / (2 * (a + b))
+    I_xx = 2 * (m_x * (b**2 + h**2) / 12) + 2 * (m_y * h**2 / 12 + m_y * (b / 2)**2)
+    I_yy = 2 * (m_x * h**2 / 12 + m_x * (a / 2)**2) + 2 * (m_y * (a**2 + h**2) / 12)
+    I_zz = 2 * (m_x * b**2 / 12 + m_x * (a / 2)**2) + 2 * (m_y * a**2 / 12 + m_y * (b / 2)**2)
+    return np.stack([I_xx, I_yy, I_zz], axis=-1)[..., :, None] * np.eye(3)
+
+
+def combine(masses, centers, inertias):
+    """
+    Total mass, CoM and inertia tensor about the CoM of a set of bodies, by the parallel axis theorem.
+
+    Parameters:
+    masses: (..., n) masses in kg.
+    centers: (..., n, 3) centers of mass in m.
+    inertias: (..., n, 3, 3) inertia tensors about the own centers in kg m^2.
+
+    Returns:
+    tuple: mass (...), CoM (..., 3) and inertia tensor (..., 3, 3).
+    """
+    masses = np.asarray(masses, dtype=float)
+    centers = np.asarray(centers, dtype=float)
+    total = masses.sum(axis=-1)
+    CoM = np.einsum('...n,...ni->...i', masses, centers) / total[..., None]
+    r = centers - CoM[..., None, :]
+    parallel = masses[..., None, None] * (np.einsum('...ni,...ni->...n', r, r)[..., None, None] * np.eye(3) - r[..., :, None] * r[..., None, :])
+    return total, CoM, (np.asarray(inertias, dtype=float) + parallel).sum(axis=-3)
+
+
+def stack_mass_properties(stacks, structure_mass, form_factor) -> dict:
+    """
+    Mass properties of the CubeSat for one or more stacks in the format of Structure.optimal_stacking_order.
+    Stacks are batched when they hold the same elements, so candidate layouts are evaluated in one call.
+
+    Parameters:
+    stacks: list of stacks, each a list of dicts with name, mass (g), height (mm), CoM_Location (mm) and optionally x and y (mm).
+    structure_mass: Mass of the structure in g.
+    form_factor: Form factor of the structure, single stack or in StructureConfig.layouts.
+
+    Returns:
+    dict: 'Mass' (n), 'CoM' (n, 3) and 'Inertia' (n, 3, 3) in SI units, one row per stack.
+    """
+    envelope, center = lay.bus_envelope(form_factor)
+
+    masses = np.array([[sub['mass'] for sub in stack] + [structure_mass] for stack in stacks], dtype=float) / 1000
+    centers = np.array([[[sub.get('x', 0), sub.get('y', 0), sub['CoM_Location']] for sub in stack] + [center] for stack in stacks], dtype=float) / 1000
+    dimensions = np.array([[[BOARD_SIZE, BOARD_SIZE, sub['height']] for sub in stack] for stack in stacks], dtype=float) / 1000
+    inertias = np.concatenate([box_inertia(masses[:, :-1], dimensions),
+                               side_panel_inertia(masses[:, -1], np.array(envelope) / 1000)[:, None]], axis=1)
+    total, CoM, inertia = combine(masses, centers, inertias)
+    return {'Mass': total, 'CoM': CoM, 'Inertia': inertia}
@@ -10,9 +10,18 @@ from cubesat_configurator import paseos_parser as pp
 from cubesat_configurator import constants
 from cubesat_configurator.cubesat import CubeSat
 from cubesat_configurator.groundstation import GroundStation
-from cubesat_configurator.report_generator import fill_report_template
+from cubesat_configurator.lazy import lazy_import
 from datetime import date
 
+# python-docx and matplotlib are only loaded when a report or an animation is made
+report_generator = lazy_import('cubesat_configurator.report_generator')
+orbit_animation = lazy_import('cubesat_configurator.orbit_animation')
+
+
+def report_done(job):
+    error = job.future.exception()
+    print(f"PDF report failed: {error!r}" if error else f"PDF report ready: {job.pdf_path}")
+
 
 class Mission(GeomBase): 
     """
@@ -47,6 +56,8 @@ class Mission(GeomBase):
     #system requirements
     req_pointing_accuracy = Input(validator=GreaterThan(0)) # deg
     username = Input('USERNAME', doc="Username for the report")
+    pdf_renderer = Input('auto', doc="Converter of the report to PDF, 'auto' picks Word, LibreOffice or the plain text writer, whichever is available",
+                         widget=Dropdown(['auto', 'docx2pdf', 'libreoffice', 'text', 'none']))
 
     @action(label="Generate STEP",
             button_label="Click to generate STEP file.")
@@ -57,7 +68,7 @@ class Mission(GeomBase):
         print(f'total mass: {self.cubesat.total_mass}')
         structure = self.cubesat.structure
         structure.subsystem_data_for_stacking
-        structure._display_stacking(structure.optimal_stacking_order, structure.form_factor*100)
+        structure._display_stacking(structure.optimal_stacking_order, structure.stack_height_of(structure.form_factor))
         print("Generating STEP file...")
         writer = STEPWriter(trees=[self.cubesat], filename = constants.GenericConfig.step_file_location)
         writer.write()
@@ -66,6 +77,26 @@ class Mission(GeomBase):
             button_label="Click to generate report.")
     def generate_report(self):
         print("Generating report...")
+        # the PDF is rendered in a worker process, the GUI does not wait for it
+        job = report_generator.fill_report_template(constants.GenericConfig.report_template_path, constants.GenericConfig.report_output_path,
+                                                    self.report_data, self.report_tables, renderer=self.pdf_renderer)
+        if job is not None:
+            job.add_done_callback(report_done)
+        self.cubesat.plot_simulation_data
+
+    @action(label="Generate Animation",
+            button_label="Click to generate the orbit animation.")
+    def generate_animation(self):
+        # the simulation only records the trajectory, the animation is rendered in a worker process
+        stations = [(gs.name, gs.longitude, gs.latitude) for gs in self.groundstation]
+        job = orbit_animation.submit_animation(self.cubesat.simulate_last_orbit, stations)
+        job.add_done_callback(lambda job: print(f"Animation failed: {job.exception()!r}" if job.exception() else f"Animation ready: {job.result()}"))
+
+    @Attribute
+    def report_tables(self):
+        """
+        Returns the tables of the report, keyed by the paragraph of the template they follow.
+        """
         comm_df = pd.DataFrame([self.cubesat.communication.comm_selection])
         comm_df = comm_df.drop(columns=["index", "Pointing_Accuracy", "Storage", "Form_factor",  "Type", "Power", "Capacity" ])
         obc_df = pd.DataFrame([self.cubesat.obc.obc_selection])
@@ -77,7 +108,7 @@ class Mission(GeomBase):
         th_coating_df = pd.DataFrame([self.cubesat.thermal.selected_coating])
 
         print(comm_df)
-        custom_tables = {
+        return {
             "Ground Station Selection": pd.DataFrame(self.ground_station_info).round({'Lat': 4, 'Lon': 4}),
             "Communication Selection": comm_df.round(2),
             "Onboard Computer Selection": obc_df.round(2),
@@ -86,9 +117,6 @@ class Mission(GeomBase):
             "Thermal Coating Selection": th_coating_df.round(2)
         }
 
-        fill_report_template(constants.GenericConfig.report_template_path, constants.GenericConfig.report_output_path, self.report_data, custom_tables)
-        self.cubesat.plot_simulation_data
-
     @Attribute
     def report_data(self):
         """
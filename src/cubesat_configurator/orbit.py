@@ -1,10 +1,12 @@
 from parapy.core import *
 from parapy.geom import *
 import numpy as np
-import pykep as pk
 from typing import cast
 from parapy.core.validate import OneOf, LessThan, GreaterThan, GreaterThanOrEqualTo, IsInstance, Range, AdaptedValidator
 from cubesat_configurator.custom_validators import altitude_validator
+from cubesat_configurator.lazy import lazy_import
+
+pk = lazy_import('pykep')
 
 
 class Orbit(Base):
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+from cubesat_configurator import constants
+from cubesat_configurator import pdf_rendering
+from cubesat_configurator import plotting
+
+# Ground track animation of a recorded simulation, made after the simulation and away from it. The simulation only
+# records the positions, the frames are drawn here with Agg: the Earth map and the ground stations are drawn once as a
+# static background, every frame restores it and draws the track on top.
+
+
+def ground_track(positions, mjd2000):
+    """
+    Longitude and latitude below the spacecraft.
+
+    Parameters:
+    positions: (n, 3) positions in the Earth centered inertial frame in m.
+    mjd2000: (n) epochs in days since 2000-01-01 00:00.
+
+    Returns:
+    tuple: longitude and latitude in degrees, longitude in [-180, 180).
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    # Greenwich mean sidereal time, days counted from J2000.0 (noon)
+    gmst = 280.46061837 + 360.98564736629 * (np.asarray(mjd2000, dtype=float) - 0.5)
+    longitude = (np.degrees(np.arctan2(positions[:, 1], positions[:, 0])) - gmst + 180) % 360 - 180
+    latitude = np.degrees(np.arctan2(positions[:, 2], np.hypot(positions[:, 0], positions[:, 1])))
+    return longitude, latitude
+
+
+def _split_at_wrap(longitude, latitude):
+    # NaN between samples that jump across the date line, so that the track is not drawn across the map
+    jumps = np.flatnonzero(np.abs(np.diff(longitude)) > 180) + 1
+    return np.insert(longitude, jumps, np.nan), np.insert(latitude, jumps, np.nan)
+
+
+def render_animation(positions, time_s, stations, output_path, start_mjd2000=None, stride=None, size=(800, 400), dpi=100, fps=20):
+    """
+    Render the ground track animation of a recorded trajectory as an animated GIF.
+
+    Parameters:
+    positions: (n, 3) recorded positions in m, e.g. CubeSat.simulate_last_orbit['position'].
+    time_s: (n) seconds since the start of the simulation.
+    stations: (name, longitude, latitude) of the ground stations.
+    output_path: Path of the animation, '.gif' is added if it has no extension.
+    start_mjd2000: Start epoch of the simulation, PaseosConfig.start_epoch by default.
+    stride: Recorded samples per frame, PaseosConfig.animation_frame_stride by default.
+
+    Returns:
+    str: Path of the animation.
+    """
+    if start_mjd2000 is None:
+        start_mjd2000 = constants.PaseosConfig.start_epoch.mjd2000
+    stride = stride or constants.PaseosConfig.animation_frame_stride
+    if not os.path.splitext(output_path)[1]:
+        output_path += '.gif'
+    longitude, latitude = ground_track(positions, start_mjd2000 + np.asarray(time_s, dtype=float) / 86400)
+
+    figure = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    axes = figure.add_axes([0, 0, 1, 1])
+    axes.set_axis_off()
+    axes.imshow(plotting.earth_map(), extent=[-180, 180, -90, 90])
+    axes.set_xlim(-180, 180)
+    axes.set_ylim(-90, 90)
+    for name, station_longitude, station_latitude in stations:
+        axes.scatter(station_longitude, station_latitude, color='red', s=20)
+        axes.text(station_longitude, station_latitude, name, fontsize=8, ha='right', color='white')
+    canvas.draw()
+    background = canvas.copy_from_bbox(figure.bbox)
+    # one palette for all frames, taken from the static layer with the track colors, so that frames are not quantized one by one
+    palette = Image.fromarray(np.asarray(canvas.buffer_rgba())[..., :3].copy()).quantize(colors=250, dither=Image.Dither.NONE)
+    colors = palette.getpalette()[:250 * 3] + [255, 255, 0] + [255, 255, 255] + [255, 0, 0]
+    palette.putpalette(colors + [0, 0, 0] * (256 - len(colors) // 3))
+
+    track, = axes.plot([], [], color='yellow', linewidth=1, animated=True)
+    spacecraft, = axes.plot([], [], 'o', color='yellow', markersize=6, animated=True)
+    clock = axes.text(-175, -85, '', color='white', fontsize=9, animated=True, bbox=dict(facecolor='black', alpha=0.5, edgecolor='none'))
+    frames = []
+    for end in list(range(1, len(longitude), stride)) + [len(longitude)]:
+        canvas.restore_region(background)
+        track.set_data(*_split_at_wrap(longitude[:end], latitude[:end]))
+        spacecraft.set_data([longitude[end - 1]], [latitude[end - 1]])
+        clock.set_text(f"t = {time_s[end - 1] / 3600:.2f} h")
+        for artist in (track, spacecraft, clock):
+            axes.draw_artist(artist)
+        canvas.blit(figure.bbox)
+        frame = Image.fromarray(np.asarray(canvas.buffer_rgba())[..., :3].copy())
+        frames.append(frame.quantize(palette=palette, dither=Image.Dither.NONE))
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    frames[0].save(output_path, save_all=True, append_images=frames[1:], duration=int(1000 / fps), loop=0)
+    return output_path
+
+
+def submit_animation(status_dict, stations, output_path=constants.PaseosConfig.animation_output_path, stride=None):
+    """
+    Render the animation of a simulation in a worker process of pdf_rendering.worker_pool, without blocking the caller.
+
+    Parameters:
+    status_dict: Telemetry of CubeSat.simulate_last_orbit with the recorded positions.
+    stations: (name, longitude, latitude) of the ground stations.
+
+    Returns:
+    concurrent.futures.Future: Future of the path of the animation.
+    """
+    stations = [(str(name), float(longitude), float(latitude)) for name, longitude, latitude in stations]
+    return pdf_rendering.worker_pool().submit(render_animation, np.asarray(status_dict['position'], dtype=float),
+                                              np.asarray(status_dict['time_s'], dtype=float), stations, output_path,
+                                              constants.PaseosConfig.start_epoch.mjd2000, stride)
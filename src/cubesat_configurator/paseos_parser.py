@@ -1,10 +1,12 @@
-import pykep as pk
-import paseos
-from paseos import ActorBuilder, SpacecraftActor, GroundstationActor
 import numpy as np
 import os
 import pandas as pd
 from parapy.core.sequence import Sequence
+from cubesat_configurator.lazy import lazy_import
+from cubesat_configurator import catalog
+
+pk = lazy_import('pykep')
+paseos = lazy_import('paseos')
 
 
 def keplerian_to_eci(a, e, i, RAAN, argument_of_periapsis, true_anomaly):
@@ -57,7 +59,7 @@ def keplerian_to_eci(a, e, i, RAAN, argument_of_periapsis, true_anomaly):
 
 
 class GroundContactInfo():
-    def __init__(self, spacecraft: SpacecraftActor, station: GroundstationActor):
+    def __init__(self, spacecraft: 'paseos.SpacecraftActor', station: 'paseos.GroundstationActor'):
         self.first_contact = True
         self.lost_contact = False
         self.stored_first_contact_time = None
@@ -131,11 +133,11 @@ def set_ground_station_old(epoch, simulation, index_list:list):
             company = stations.loc[i, "Company"]
             location = stations.loc[i, "Location"]
             gs_name = f"gs_actor_{i}"
-            locals()[gs_name] = ActorBuilder.get_actor_scaffold(
-                name=f"gs_{i} ({location})", actor_type=GroundstationActor, epoch=epoch
+            locals()[gs_name] = paseos.ActorBuilder.get_actor_scaffold(
+                name=f"gs_{i} ({location})", actor_type=paseos.GroundstationActor, epoch=epoch
             )
 
-            ActorBuilder.set_ground_station_location(
+            paseos.ActorBuilder.set_ground_station_location(
                 locals()[gs_name],
                 latitude=lat,
                 longitude=lon,
@@ -159,11 +161,11 @@ def set_ground_station(epoch, simulation, ground_stations:Sequence):
     stations_list = []
 
     for station in ground_stations:
-        locals()[station.name] = ActorBuilder.get_actor_scaffold(
-            name=station.name, actor_type=GroundstationActor, epoch=epoch
+        locals()[station.name] = paseos.ActorBuilder.get_actor_scaffold(
+            name=station.name, actor_type=paseos.GroundstationActor, epoch=epoch
         )
 
-        ActorBuilder.set_ground_station_location(
+        paseos.ActorBuilder.set_ground_station_location(
             locals()[station.name],
             latitude=station.latitude,
             longitude=station.longitude,
@@ -179,15 +181,8 @@ def set_ground_station(epoch, simulation, ground_stations:Sequence):
 
 
 def read_ground_stations_from_csv():
-    # Get the current directory of the script
-    script_dir = os.path.dirname(__file__)
-    relative_path = os.path.join('data', 'ground_stations.csv')
-
-    # Construct the full relative file path
-    gs_info_path = os.path.join(script_dir, relative_path)
-
-    all_gs_import = pd.read_csv(gs_info_path)
-    return all_gs_import
+    # parsed once per process, reloaded when the file changes
+    return catalog.load_catalog('ground_stations.csv')
 
 
 if __name__ == '__main__':
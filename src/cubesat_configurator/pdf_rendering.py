@@ -0,0 +1,206 @@
+import atexit
+import multiprocessing
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Conversion of the generated .docx reports to PDF. Renderers are registered by name, render_pdf converts in the calling
+# process and submit_render hands the conversion to a pool of worker processes, returning a RenderJob handle at once.
+
+RENDERERS = {}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def register_renderer(name):
+    """
+    Decorator registering a function (docx_path, pdf_path) as the PDF renderer name.
+    """
+    def register(function):
+        RENDERERS[name] = function
+        return function
+    return register
+
+
+@register_renderer('docx2pdf')
+def render_docx2pdf(docx_path, pdf_path):
+    "Convert with Microsoft Word, Windows and macOS only"
+    from docx2pdf import convert
+    convert(docx_path, pdf_path)
+
+
+@register_renderer('libreoffice')
+def render_libreoffice(docx_path, pdf_path, timeout=300):
+    "Convert with a headless LibreOffice, which writes the PDF next to the .docx under the same name"
+    executable = shutil.which('soffice') or shutil.which('libreoffice')
+    if executable is None:
+        raise RuntimeError("LibreOffice (soffice) not found on the PATH.")
+    out_dir = os.path.dirname(os.path.abspath(pdf_path))
+    # a temporary profile per conversion, so that several conversions can run at the same time
+    profile_dir = tempfile.mkdtemp(prefix='lo_profile_')
+    try:
+        profile = f"-env:UserInstallation={pathlib.Path(profile_dir).as_uri()}"
+        subprocess.run([executable, profile, '--headless', '--convert-to', 'pdf', '--outdir', out_dir, docx_path],
+                       check=True, capture_output=True, timeout=timeout)
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+    written = os.path.join(out_dir, os.path.splitext(os.path.basename(docx_path))[0] + '.pdf')
+    if os.path.abspath(written) != os.path.abspath(pdf_path):
+        os.replace(written, pdf_path)
+
+
+def _pdf_string(text):
+    text = text.encode('cp1252', errors='replace').decode('latin-1')
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+@register_renderer('text')
+def render_text(docx_path, pdf_path, font_size=10, width=95, lines_per_page=64):
+    """
+    Write the text of the document, paragraphs and table rows, to a plain PDF without any external converter.
+    Layout, images and styles are not kept, the result is meant for servers without Word or LibreOffice.
+    """
+    from docx import Document
+    body = Document(docx_path).element.body
+    lines = []
+    for element in body.iterchildren():
+        tag = element.tag.rsplit('}', 1)[-1]
+        if tag == 'p':
+            text = ''.join(t.text or '' for t in element.iter('{*}t'))
+            lines.extend(textwrap.wrap(text, width) or [''])
+        elif tag == 'tbl':
+            for row in element.iter('{*}tr'):
+                cells = [''.join(t.text or '' for t in cell.iter('{*}t')) for cell in row.iter('{*}tc')]
+                lines.extend(textwrap.wrap(' | '.join(cells), width) or [''])
+            lines.append('')
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>']
+    page_ids = []
+    for page in pages:
+        stream = [f'BT /F1 {font_size} Tf {1.2 * font_size} TL 50 800 Td']
+        stream += [f'{_pdf_string(line)} Tj T*' for line in page]
+        stream = ('\n'.join(stream) + '\nET').encode('latin-1')
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> '
+                       b'/Contents %d 0 R >>' % (len(objects) + 2))
+        page_ids.append(len(objects))
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % i for i in page_ids), len(page_ids))
+
+    content = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += b'%d 0 obj\n' % number + obj + b'\nendobj\n'
+    xref = len(content)
+    content += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    content += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    content += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(pdf_path, 'wb') as file:
+        file.write(content)
+
+
+def default_renderer():
+    """
+    Name of the best renderer available on this machine: Word on Windows and macOS, else LibreOffice, else the text writer.
+    """
+    if sys.platform in ('win32', 'darwin'):
+        try:
+            import docx2pdf  # noqa: F401
+            return 'docx2pdf'
+        except ImportError:
+            pass
+    if shutil.which('soffice') or shutil.which('libreoffice'):
+        return 'libreoffice'
+    return 'text'
+
+
+def render_pdf(docx_path, pdf_path=None, renderer=None):
+    """
+    Convert a .docx file to PDF in this process.
+
+    Parameters:
+    docx_path: Path of the .docx file.
+    pdf_path: Path of the PDF, by default next to the .docx file.
+    renderer: Name of a registered renderer, the default_renderer if None or 'auto'.
+
+    Returns:
+    str: Path of the PDF.
+    """
+    if pdf_path is None:
+        pdf_path = os.path.splitext(docx_path)[0] + '.pdf'
+    if renderer in (None, 'auto'):
+        renderer = default_renderer()
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown PDF renderer '{renderer}', available: {sorted(RENDERERS)}.")
+    RENDERERS[renderer](docx_path, pdf_path)
+    return pdf_path
+
+
+class RenderJob:
+    """
+    Handle of a PDF conversion running in a worker process.
+    """
+    def __init__(self, future, docx_path, pdf_path):
+        self.future = future
+        self.docx_path = docx_path
+        self.pdf_path = pdf_path
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        "Wait for the conversion and return the path of the PDF, errors of the renderer are raised here"
+        return self.future.result(timeout)
+
+    def add_done_callback(self, function):
+        "Call function(job) once the conversion has finished"
+        self.future.add_done_callback(lambda future: function(self))
+
+    def __repr__(self):
+        state = 'running' if not self.done() else ('failed' if self.future.exception() else 'done')
+        return f"RenderJob({self.pdf_path!r}, {state})"
+
+
+def worker_pool(max_workers=None):
+    """
+    Process pool shared by all report jobs, started on first use. Workers are spawned, not forked, so that the
+    GUI process is never duplicated.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+@atexit.register
+def shutdown_pool(wait=True):
+    "Stop the worker processes, waiting for running conversions by default"
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+def submit_render(docx_path, pdf_path=None, renderer=None):
+    """
+    Convert a .docx file to PDF in a worker process without blocking the caller.
+
+    Returns:
+    RenderJob: Handle of the conversion.
+    """
+    if pdf_path is None:
+        pdf_path = os.path.splitext(docx_path)[0] + '.pdf'
+    future = worker_pool().submit(render_pdf, docx_path, pdf_path, renderer)
+    return RenderJob(future, docx_path, pdf_path)
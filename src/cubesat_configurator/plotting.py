@@ -0,0 +1,148 @@
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import matplotlib.image as mpimg
+
+from cubesat_configurator import constants
+from cubesat_configurator import pdf_rendering
+
+# Plots of the simulation telemetry with the object-oriented Agg API, no pyplot state is touched. Every panel is
+# drawn as its own figure, in worker processes by default, and the panels are tiled into one image.
+
+# grid position (row, column), kind, telemetry key, title, y label, color
+PANELS = [
+    ((0, 0), 'line', 'eclipse', "Eclipse over Time", "Eclipse", None),
+    ((0, 1), 'line', 'contact', "Contact over Time", "Contact", 'orange'),
+    ((0, 2), 'line', 'power_consumption', "Power Consumption over Time", "Power Consumption (W)", 'green'),
+    ((1, 0), 'line', 'battery_SoC', "Battery State of Charge over Time", "Battery SoC (%)", 'red'),
+    ((1, 1), 'line', 'onboard_data', "Onboard Data over Time", "Onboard Data (kbits)", 'purple'),
+    ((1, 2), 'histogram', 'comm_windows', "Comm Window Duration Histogram", "Frequency", 'blue'),
+    ((2, 0), 'line', 'temperature', "Temperature over Time", "Temperature (C)", 'black'),
+    ((2, 1), 'map', None, "Ground Station Locations", "Latitude", 'red'),
+]
+GRID = (3, 3)
+PANEL_SIZE = (400, 266)  # pixels
+DPI = 100
+PLOT_VERSION = 1  # part of the telemetry hash, increase when the panels change
+
+
+@lru_cache(maxsize=4)
+def earth_map(path=constants.PaseosConfig.earth_map_path):
+    "Decoded basemap image, read once per process"
+    return mpimg.imread(path)
+
+
+def decimate(x, y, width):
+    """
+    Downsample a time series to about two points per pixel column, keeping the minimum and maximum of every column
+    so that peaks and switching edges stay visible.
+
+    Parameters:
+    x, y: Samples, x increasing.
+    width: Width of the plot in pixels.
+
+    Returns:
+    tuple: x and y of the kept samples, in their original order.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * width:
+        return x, y
+    bucket = n // width
+    columns = y[:bucket * width].reshape(width, bucket)
+    offsets = np.arange(width) * bucket
+    kept = np.concatenate([offsets + columns.argmin(axis=1), offsets + columns.argmax(axis=1),
+                           np.arange(bucket * width, n), [0, n - 1]])
+    kept = np.unique(kept)
+    return x[kept], y[kept]
+
+
+def render_panel(panel, series, hours, stations, size=PANEL_SIZE, dpi=DPI):
+    """
+    Draw one panel with Agg.
+
+    Parameters:
+    panel: Entry of PANELS.
+    series: Telemetry values of the panel, None for the map.
+    hours: Time axis in hours.
+    stations: (name, longitude, latitude) of the ground stations.
+
+    Returns:
+    np.ndarray: RGBA image of the panel, (height, width, 4) uint8.
+    """
+    _, kind, key, title, ylabel, color = panel
+    figure = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    if kind == 'line':
+        axes.plot(*decimate(hours, series, size[0]), color=color)
+        axes.set_xlabel("Time [hours]")
+        axes.grid(True)
+    elif kind == 'histogram':
+        axes.hist(series, bins=10, color=color)
+        axes.set_xlabel("Comm Window Duration (s)")
+    elif kind == 'map':
+        axes.imshow(earth_map(), extent=[-180, 180, -90, 90])
+        for name, longitude, latitude in stations:
+            axes.scatter(longitude, latitude, color=color)
+            axes.text(longitude, latitude, name, fontsize=9, ha='right', color='blue')
+        axes.set_xlabel("Longitude")
+    axes.set_ylabel(ylabel)
+    axes.set_title(title)
+    figure.tight_layout()
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def telemetry_hash(status_dict, stations):
+    "Hash of everything the plots show, used to skip unchanged plots"
+    digest = hashlib.sha256(repr((PLOT_VERSION, PANELS, GRID, PANEL_SIZE, DPI, stations)).encode())
+    for key in ['time_h'] + [panel[2] for panel in PANELS if panel[2] is not None]:
+        digest.update(key.encode())
+        digest.update(np.ascontiguousarray(status_dict[key], dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def plot_simulation(status_dict, stations, output_path=constants.PaseosConfig.simulation_plots_location, parallel=True):
+    """
+    Save the telemetry panels of a simulation as one image. Nothing is drawn when the image on disk was made from
+    the same telemetry, its hash is kept next to the image.
+
+    Parameters:
+    status_dict: Telemetry of CubeSat.simulate_last_orbit.
+    stations: (name, longitude, latitude) of the ground stations.
+    output_path: Path of the image.
+    parallel: Draw the panels in the worker processes of pdf_rendering.worker_pool, else in this process.
+
+    Returns:
+    bool: True if the image was drawn, False if it was up to date.
+    """
+    stations = [(str(name), float(longitude), float(latitude)) for name, longitude, latitude in stations]
+    digest = telemetry_hash(status_dict, stations)
+    hash_path = output_path + '.sha256'
+    if os.path.exists(output_path) and os.path.exists(hash_path):
+        with open(hash_path) as file:
+            if file.read().strip() == digest:
+                return False
+
+    hours = np.asarray(status_dict['time_h'], dtype=float)
+    series = [None if key is None else np.asarray(status_dict[key], dtype=float) for _, _, key, *_ in PANELS]
+    arguments = [PANELS, series, [hours] * len(PANELS), [stations] * len(PANELS)]
+    if parallel:
+        images = list(pdf_rendering.worker_pool().map(render_panel, *arguments))
+    else:
+        images = list(map(render_panel, *arguments))
+
+    width, height = PANEL_SIZE
+    sheet = np.full((GRID[0] * height, GRID[1] * width, 4), 255, dtype=np.uint8)
+    for ((row, column), *_), image in zip(PANELS, images):
+        sheet[row * height:(row + 1) * height, column * width:(column + 1) * width] = image[:height, :width]
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    mpimg.imsave(output_path, sheet)
+    with open(hash_path, 'w') as file:
+        file.write(digest)
+    return True
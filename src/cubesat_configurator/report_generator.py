@@ -1,9 +1,20 @@
+import copy
+import os
+import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from xml.sax.saxutils import escape
+import numpy as np
 import pandas as pd
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
 from docx.table import Table
-from docx2pdf import convert
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.shared import Cm, Inches, Pt
+from cubesat_configurator import pdf_rendering
 
 
 def move_table_after(table, paragraph):
@@ -11,71 +22,234 @@ def move_table_after(table, paragraph):
     p.addnext(tbl)
 
 
-def add_table_from_dataframe(document, paragraph_identifier, dataframe):
-    # Find the paragraph after the paragraph that has the text `paragraph_identifier`
-    table_paragraph_index = -1
-    for i, p in enumerate(document.paragraphs):
-        if p.text == paragraph_identifier:
-            table_paragraph_index = i + 1
-            break
-
-    if table_paragraph_index == -1:
+def _cells_xml(texts, run_properties, tc_properties):
+    # one table row of cells sharing the same cell and run properties, line breaks become w:br like in cell.text
+    cells = []
+    for text in texts:
+        lines = []
+        for line in text.split('\n'):
+            # xml:space only where whitespace has to be kept, it is costly when the table is moved into the document
+            space = ' xml:space="preserve"' if line != line.strip() else ''
+            lines.append(f'<w:t{space}>{escape(line)}</w:t>')
+        cells.append(f'<w:tc>{tc_properties}<w:p><w:r>{run_properties}{"<w:br/>".join(lines)}</w:r></w:p></w:tc>')
+    return '<w:tr>' + ''.join(cells) + '</w:tr>'
+
+
+def table_xml(dataframe, style_id=None, width=None, font_size=Pt(12)):
+    """
+    WordprocessingML of a table holding a DataFrame with its columns as bold header row.
+    The table is written as one string and parsed once, all cells share one run style, so that tables of thousands of
+    rows do not go through the python-docx object model cell by cell.
+
+    Parameters:
+    dataframe: Table content, every value is shown as str(value) of its column.
+    style_id: Style id of a table style of the document, no table style if None.
+    width: Total width of the columns as docx Length, columns of equal width. Automatic widths if None.
+    font_size: Font size of all cells as docx Length.
+
+    Returns:
+    str: w:tbl element.
+    """
+    columns = len(dataframe.columns)
+    half_points = int(round(font_size.pt * 2))
+    body_run = f'<w:rPr><w:sz w:val="{half_points}"/></w:rPr>'
+    header_run = f'<w:rPr><w:b/><w:sz w:val="{half_points}"/></w:rPr>'
+    if width is not None and columns > 0:
+        column_width = int(width // columns) // 635  # EMU to twips
+        grid = ''.join(f'<w:gridCol w:w="{column_width}"/>' for _ in range(columns))
+        cell_properties = f'<w:tcPr><w:tcW w:type="dxa" w:w="{column_width}"/></w:tcPr>'
+    else:
+        grid = '<w:gridCol/>' * columns
+        cell_properties = ''
+    style = f'<w:tblStyle w:val="{escape(style_id, {chr(34): "&quot;"})}"/>' if style_id else ''
+
+    text_columns = [list(map(str, dataframe.iloc[:, i].tolist())) for i in range(columns)]
+    rows = [_cells_xml([str(column) for column in dataframe.columns], header_run, cell_properties)]
+    rows.extend(_cells_xml(texts, body_run, cell_properties) for texts in zip(*text_columns))
+    return (f'<w:tbl {nsdecls("w")}><w:tblPr>{style}<w:tblW w:type="auto" w:w="0"/>'
+            '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+            f'</w:tblPr><w:tblGrid>{grid}</w:tblGrid>{"".join(rows)}</w:tbl>')
+
+
+def text_width(document):
+    "Width between the margins of the last section, where tables are added"
+    section = document.sections[-1]
+    return section.page_width - section.left_margin - section.right_margin
+
+
+def add_table_from_dataframe(document, paragraph_identifier, dataframe, style='Grid Table 4 Accent 1'):
+    """
+    Insert a table of the DataFrame after the paragraph that follows the paragraph with the text paragraph_identifier.
+    The table XML is built in bulk by table_xml.
+    """
+    paragraphs = document.paragraphs
+    table_paragraph = next((following for p, following in zip(paragraphs, paragraphs[1:]) if p.text == paragraph_identifier), None)
+    if table_paragraph is None:
         raise ValueError(f"Paragraph identifier '{paragraph_identifier}' not found in document.")
 
-    table_paragraph = document.paragraphs[table_paragraph_index]
-
-    # Create the table with the number of columns equal to the DataFrame columns
-    table = document.add_table(rows=1, cols=len(dataframe.columns), style='Grid Table 4 Accent 1')
-
-    # Add the header row
-    hdr_cells = table.rows[0].cells
-    for i, column in enumerate(dataframe.columns):
-        hdr_cells[i].text = str(column)
-        # Optional: Customize header formatting
-        for paragraph in hdr_cells[i].paragraphs:
-            run = paragraph.runs[0]
-            run.font.size = Pt(12)
-            run.bold = True
-
-    # Add the data rows
-    for index, row in dataframe.iterrows():
-        row_cells = table.add_row().cells
-        for i, cell in enumerate(row):
-            row_cells[i].text = str(cell)
-            # Optional: Customize cell formatting
-            for paragraph in row_cells[i].paragraphs:
-                run = paragraph.runs[0]
-                run.font.size = Pt(12)
+    style_id = document.part.get_style_id(style, WD_STYLE_TYPE.TABLE) if style is not None else None
+    tbl = parse_xml(table_xml(dataframe, style_id, text_width(document)))
 
     # Move the table to the correct position
-    move_table_after(table, table_paragraph)
-
-
-def fill_report_template(template_path, output_path, data, custom_tables):
-    doc = Document(template_path)
-    
-    for paragraph in doc.paragraphs:
-        for key, value in data.items():
-            if key in paragraph.text:
-                if type(value) == float:
-                    value = round(value, 2)
-                paragraph.text = paragraph.text.replace(key, str(value))
-
+    table_paragraph._p.addnext(tbl)
+    return Table(tbl, table_paragraph._parent)
+
+
+def format_placeholder(value, policy=None):
+    """
+    Text of a placeholder value. The policy is a format spec such as '.3f' or a callable, by default floats are rounded to 2 decimals.
+    """
+    if policy is None:
+        if isinstance(value, (float, np.floating)):
+            return str(round(float(value), 2))
+        return str(value)
+    if callable(policy):
+        return policy(value)
+    return format(value, policy)
+
+
+def _copy_text(pieces, starts, text, begin, end):
+    # copy text[begin:end] to the runs that hold it
+    k = bisect_right(starts, begin) - 1
+    while begin < end:
+        stop = min(end, starts[k + 1]) if k + 1 < len(starts) else end
+        pieces[k].append(text[begin:stop])
+        begin = stop
+        k += 1
+
+
+def substitute_placeholders(document, data, formats=None):
+    """
+    Replace all placeholders of data in the paragraphs and table cells of a document in one pass.
+    All keys are matched at once by one compiled pattern over the text of each paragraph, placeholders split over
+    several runs are found too. A replacement goes into the run where its placeholder starts, so the formatting of the runs is kept.
+
+    Parameters:
+    document: python-docx Document.
+    data: Placeholder to value.
+    formats: Placeholder to format policy, see format_placeholder.
+    """
+    formats = formats or {}
+    replacements = {key: format_placeholder(value, formats.get(key)) for key, value in data.items()}
+    if not replacements:
+        return
+    # longest keys first, so a key never matches the start of a longer one
+    pattern = re.compile('|'.join(re.escape(key) for key in sorted(replacements, key=len, reverse=True)))
+
+    for paragraph in document.element.body.iter(qn('w:p')):
+        runs = list(paragraph.iter(qn('w:t')))
+        if not runs:
+            continue
+        texts = [run.text or '' for run in runs]
+        text = ''.join(texts)
+        matches = list(pattern.finditer(text))
+        if not matches:
+            continue
+
+        starts = [0]
+        for run_text in texts[:-1]:
+            starts.append(starts[-1] + len(run_text))
+        pieces = [[] for _ in runs]
+        position = 0
+        for match in matches:
+            _copy_text(pieces, starts, text, position, match.start())
+            pieces[bisect_right(starts, match.start()) - 1].append(replacements[match.group()])
+            position = match.end()
+        _copy_text(pieces, starts, text, position, len(text))
+
+        for run, run_pieces in zip(runs, pieces):
+            run.text = ''.join(run_pieces)
+            if run.text != run.text.strip():
+                run.set(qn('xml:space'), 'preserve')
+
+
+def fill_document(doc, data, custom_tables, formats=None):
+    """
+    Fill a parsed template in place with the placeholder data and the custom tables.
+    """
+    substitute_placeholders(doc, data, formats)
     for table in doc.tables:
         table.alignment = WD_TABLE_ALIGNMENT.CENTER
-        for row in table.rows:
-            for cell in row.cells:
-                for key, value in data.items():
-                    if key in cell.text:
-                        if type(value) == float:
-                            value = round(value, 2)
-                        cell.text = cell.text.replace(key, str(value))
 
     for table_identifier, dataframe in custom_tables.items():
         add_table_from_dataframe(doc, table_identifier, dataframe)
+    return doc
+
+
+def fill_report_template(template_path, output_path, data, custom_tables, formats=None, renderer=None, background=True):
+    """
+    Fill the template with data and the custom tables, save it to output_path and convert it to PDF next to it.
+    The PDF is rendered in a worker process by default, the returned RenderJob tells when it is ready.
+
+    Parameters:
+    renderer: Name of a PDF renderer in pdf_rendering.RENDERERS, 'auto' or None for the best available one, 'none' for no PDF.
+    background: Render in a worker process and return at once, else render in this process.
 
+    Returns:
+    RenderJob or str or None: Job of the PDF, its path if rendered in this process, None without PDF.
+    """
+    doc = fill_document(Document(template_path), data, custom_tables, formats)
 
     # export to word and pdf file
     doc.save(output_path)
+    if renderer == 'none':
+        return None
     pdf_output_path = output_path.replace('.docx', '.pdf')
-    convert(output_path, pdf_output_path)
\ No newline at end of file
+    if background:
+        return pdf_rendering.submit_render(output_path, pdf_output_path, renderer)
+    return pdf_rendering.render_pdf(output_path, pdf_output_path, renderer)
+
+
+# template parsed once per batch worker
+_batch_template = None
+
+
+def _init_batch_worker(template_path):
+    global _batch_template
+    _batch_template = Document(template_path)
+
+
+def _batch_report(name, data, custom_tables, output_dir, formats, renderer):
+    docx_path = os.path.join(output_dir, f'{name}.docx')
+    pdf_path = None
+    try:
+        doc = fill_document(copy.deepcopy(_batch_template), data, custom_tables, formats)
+        doc.save(docx_path)
+        if renderer != 'none':
+            pdf_path = pdf_rendering.render_pdf(docx_path, os.path.join(output_dir, f'{name}.pdf'), renderer)
+    except Exception as error:
+        return {'Name': name, 'Report': docx_path if os.path.exists(docx_path) else None, 'PDF': pdf_path,
+                'Status': f'failed: {error!r}'}
+    return {'Name': name, 'Report': docx_path, 'PDF': pdf_path, 'Status': 'ok'}
+
+
+def generate_reports(template_path, output_dir, designs, formats=None, renderer=None, max_workers=None, index_name='index.csv'):
+    """
+    Reports of many designs from one template. Every worker process parses the template once and fills an
+    in-memory copy of it per design, the reports are saved and rendered in parallel over the workers.
+    A failing design is listed in the index with its error instead of stopping the batch.
+
+    Parameters:
+    template_path: Path of the .docx template.
+    output_dir: Folder of the reports, created if missing.
+    designs: Iterable of (name, data, custom_tables) per design, e.g. from Mission.report_data and Mission.report_tables.
+    formats: Placeholder to format policy, see format_placeholder, callables have to be picklable (module-level functions).
+    renderer: PDF renderer as in fill_report_template, 'none' for .docx reports only.
+    max_workers: Number of worker processes, the number of cores by default.
+    index_name: File name of the index in output_dir.
+
+    Returns:
+    pd.DataFrame: Index of the reports with Name, Report, PDF and Status, also written to output_dir.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    designs = list(designs)
+    if renderer in (None, 'auto'):
+        renderer = pdf_rendering.default_renderer()
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(designs)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_batch_worker, initargs=(template_path,)) as pool:
+        futures = [pool.submit(_batch_report, name, data, custom_tables, output_dir, formats, renderer)
+                   for name, data, custom_tables in designs]
+        index = pd.DataFrame([future.result() for future in futures], columns=['Name', 'Report', 'PDF', 'Status'])
+    index.to_csv(os.path.join(output_dir, index_name), index=False)
+    return index
@@ -0,0 +1,452 @@
+import numpy as np
+import pandas as pd
+from cubesat_configurator import constants
+
+
+# fields of the selected component, missing columns are returned as None
+SELECTION_FIELDS = ['Company', 'Data_Rate', 'Pointing_Accuracy', 'Storage', 'Form_factor', 'Type', 'Power', 'Power_DL',
+                    'Power_Nom', 'Mass', 'Height', 'Cost', 'Min_Temp', 'Max_Temp', 'Capacity']
+
+
+def combined_comm_power(power_dl, power_nom, tgs):
+    """
+    Average power of a communication subsystem with tgs seconds of downlink per day.
+    """
+    return power_dl * (tgs / (24*3600)) + power_nom * (1 - (tgs / (24*3600)))
+
+
+def component_power(component:pd.DataFrame, is_comm=False, tgs=None, subsystem_name='subsystem'):
+    """
+    Power column used for scoring: the combined downlink / nominal power for COMM, none for EPS and the structure.
+    """
+    if is_comm and tgs is not None:
+        return combined_comm_power(component['Power_DL'], component['Power_Nom'], tgs)
+    if subsystem_name in ('eps', 'structure'):
+        return None
+    return component['Power']
+
+
+def normalized_features(component:pd.DataFrame, is_comm=False, tgs=None, subsystem_name='subsystem') -> np.ndarray:
+    """
+    z-scores of mass, cost and power of all components as an (n, 3) array.
+    Mean and standard deviation are taken over the whole catalog, the power column is zero for EPS.
+    A column without spread (all values equal, or a single component) has a z-score of 0.
+    """
+    columns = [component['Mass'], component['Cost'], component_power(component, is_comm, tgs, subsystem_name)]
+    features = np.zeros((len(component), 3))
+    for j, column in enumerate(columns):
+        if column is not None:
+            std = column.std()
+            features[:, j] = ( column - column.mean() ) / ( std if std > 0 else 1 )
+    return features
+
+
+def feasible_mask(component:pd.DataFrame, filter_key, filter_value, comparator='greater') -> np.ndarray:
+    """
+    Components that satisfy the requirement, strictly greater or strictly less than the filter value.
+    """
+    if comparator == 'greater':
+        return (component[filter_key] > filter_value).to_numpy()
+    return (component[filter_key] < filter_value).to_numpy()
+
+
+def component_scores(component:pd.DataFrame, mass_factor, cost_factor, power_factor, is_comm=False, tgs=None, subsystem_name='subsystem') -> np.ndarray:
+    """
+    Weighted z-score of every component, lower is better.
+    """
+    weights = np.array([mass_factor, cost_factor, 0 if subsystem_name in ('eps', 'structure') else power_factor], dtype=float)
+    return normalized_features(component, is_comm, tgs, subsystem_name) @ weights
+
+
+def selected_fields(component:pd.DataFrame, position:int, score) -> dict:
+    """
+    Fields of the component at the given row position as returned by select_component.
+    """
+    row = component.iloc[position]
+    selected = {'index': component.index[position]}
+    selected.update({field: row.get(field, None) for field in SELECTION_FIELDS})
+    selected['Score'] = score
+    return selected
+
+
+def select_component(component:pd.DataFrame, filter_key, filter_value, comparator, mass_factor, cost_factor, power_factor, is_comm=False, tgs=None, subsystem_name='subsystem') -> dict:
+    """
+    Filter components and select the one with the lowest score, using column operations only.
+
+    Parameters:
+    component: Component catalog.
+    filter_key, filter_value, comparator: Requirement, the value in filter_key has to be 'greater' or 'less' than filter_value.
+    mass_factor, cost_factor, power_factor: Weights of the z-scores.
+    is_comm, tgs: COMM scores on the combined power for tgs seconds of downlink per day.
+    subsystem_name: 'eps' scores without power.
+
+    Returns:
+    dict: Fields of the selected component and its score.
+    """
+    scores = component_scores(component, mass_factor, cost_factor, power_factor, is_comm, tgs, subsystem_name)
+    # components with missing data cannot be scored
+    feasible = np.flatnonzero(feasible_mask(component, filter_key, filter_value, comparator) & ~np.isnan(scores))
+    if len(feasible) == 0:
+        raise ValueError("No suitable component found based on the criteria.")
+
+    # first lowest score wins ties, like min() over the rows in catalog order
+    best = feasible[np.argmin(scores[feasible])]
+    return selected_fields(component, best, scores[best])
+
+
+def batch_select_components(component:pd.DataFrame, filter_key, filter_value, comparator, weights, is_comm=False, tgs=None, subsystem_name='subsystem', chunk_size=4096) -> np.ndarray:
+    """
+    Select a component for every weight vector at once.
+    The normalized features of the feasible components are multiplied with the weight matrix, one column of scores
+    per weight vector, and the lowest score per column wins, as in select_component.
+
+    Parameters:
+    weights: (n, 3) array of (mass_factor, cost_factor, power_factor) rows.
+    chunk_size: Number of weight vectors scored per matrix product, bounds the memory of large catalogs.
+
+    Returns:
+    np.ndarray: Row position in the catalog of the selected component, one per weight vector.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    features = normalized_features(component, is_comm, tgs, subsystem_name)
+    feasible = np.flatnonzero(feasible_mask(component, filter_key, filter_value, comparator) & ~np.isnan(features).any(axis=1))
+    if len(feasible) == 0:
+        raise ValueError("No suitable component found based on the criteria.")
+
+    features = features[feasible]
+    selected = np.empty(len(weights), dtype=int)
+    for start in range(0, len(weights), chunk_size):
+        scores = features @ weights[start:start + chunk_size].T
+        selected[start:start + chunk_size] = feasible[np.argmin(scores, axis=0)]
+    return selected
+
+
+class ThresholdIndex:
+    """
+    Best component for any requirement threshold, for fixed scores.
+    Components are sorted by their requirement value, the feasible components of a threshold are a suffix ('greater')
+    or a prefix ('less') of that order, found with a binary search. The best component of every prefix or suffix is
+    precomputed, so a query costs O(log n).
+    """
+
+    def __init__(self, keys, scores, comparator='greater'):
+        keys = np.asarray(keys, dtype=float)
+        scores = np.asarray(scores, dtype=float)
+        self.comparator = comparator
+
+        # components with a missing requirement value or score are never selected
+        valid = np.flatnonzero(~np.isnan(keys) & ~np.isnan(scores))
+        order = valid[np.argsort(keys[valid], kind='stable')]
+        self.sorted_keys = keys[order]
+
+        # rank 0 is the lowest score, ties go to the first component in catalog order
+        self.ranked_positions = valid[np.lexsort((valid, scores[valid]))]
+        rank = np.empty(len(keys), dtype=int)
+        rank[self.ranked_positions] = np.arange(len(valid))
+        if comparator == 'greater':
+            self.best_rank = np.minimum.accumulate(rank[order][::-1])[::-1]
+        else:
+            self.best_rank = np.minimum.accumulate(rank[order])
+
+    def best_many(self, thresholds) -> np.ndarray:
+        """
+        Row positions of the best components meeting each threshold, -1 where no component does.
+        """
+        thresholds = np.asarray(thresholds, dtype=float)
+        selected = np.full(thresholds.shape, -1, dtype=int)
+        if self.comparator == 'greater':
+            start = np.searchsorted(self.sorted_keys, thresholds, side='right')
+            found = start < len(self.sorted_keys)
+            selected[found] = self.ranked_positions[self.best_rank[start[found]]]
+        else:
+            end = np.searchsorted(self.sorted_keys, thresholds, side='left')
+            found = end > 0
+            selected[found] = self.ranked_positions[self.best_rank[end[found] - 1]]
+        return selected
+
+    def best(self, threshold) -> int:
+        """
+        Row position of the best component meeting the threshold, -1 if no component does.
+        """
+        return int(self.best_many(threshold))
+
+
+def build_threshold_index(component:pd.DataFrame, filter_key, comparator, mass_factor, cost_factor, power_factor, is_comm=False, tgs=None, subsystem_name='subsystem') -> ThresholdIndex:
+    """
+    Threshold index of a catalog on its requirement key, scored as in select_component.
+    """
+    scores = component_scores(component, mass_factor, cost_factor, power_factor, is_comm, tgs, subsystem_name)
+    return ThresholdIndex(component[filter_key].to_numpy(), scores, comparator)
+
+
+def form_factor(total_height):
+    """
+    Smallest form factor that fits a stack of total_height mm, None if the stack does not fit any.
+    """
+    for size, max_height in constants.StructureConfig.form_factors:
+        if total_height < max_height:
+            return size
+    return None
+
+
+def _candidates(criteria:dict, mass_factor, cost_factor, power_factor):
+    """
+    Row positions, scores and heights of the feasible components of one subsystem, sorted by score.
+    """
+    component = criteria['component']
+    scores = component_scores(component, mass_factor, cost_factor, power_factor, criteria.get('is_comm', False),
+                              criteria.get('tgs'), criteria.get('subsystem_name', 'subsystem'))
+    heights = component['Height'].to_numpy(dtype=float)
+    mask = feasible_mask(component, criteria['filter_key'], criteria['filter_value'], criteria['comparator'])
+    positions = np.flatnonzero(mask & ~np.isnan(scores) & ~np.isnan(heights))
+    if len(positions) == 0:
+        raise ValueError("No suitable component found based on the criteria.")
+    positions = positions[np.lexsort((positions, scores[positions]))]
+    return positions, scores[positions], heights[positions]
+
+
+def _pareto_candidates(positions, scores, heights):
+    """
+    Drop components with a higher or equal score than a lower or equal component, keeps the order by score.
+    """
+    order = np.lexsort((positions, scores, heights))
+    best_before = np.minimum.accumulate(np.concatenate(([np.inf], scores[order][:-1])))
+    keep = np.sort(order[scores[order] < best_before])
+    return positions[keep], scores[keep], heights[keep]
+
+
+def optimize_joint_selection(criteria:dict, structure:pd.DataFrame, mass_factor, cost_factor, power_factor, fixed_height=0):
+    """
+    Select the components of all subsystems together, minimizing the sum of their scores and the score of the structure
+    that fits the stack. Unlike independent selection, a slightly worse component is chosen when it keeps the stack in
+    a smaller form factor.
+
+    Depth-first branch and bound over the subsystems: components are visited by increasing score and a branch is cut
+    when its score plus the lowest scores of the remaining subsystems and the structure of the lowest remaining stack
+    cannot beat the best selection found. The last subsystem is evaluated for all components at once. When the
+    structure score grows with the form factor, components that are both worse and higher than another are dropped first.
+
+    Parameters:
+    criteria: Subsystem name to its selection criteria, as in Subsystem.selection_criteria.
+    structure: Structure catalog with Form_Factor, Mass and Cost, scored like the components without power over the
+    single stack form factors.
+    mass_factor, cost_factor, power_factor: Weights of the z-scores.
+    fixed_height: Height of the stack that is not selected, e.g. the payload, in mm.
+
+    Returns:
+    dict: 'Selection' subsystem name to catalog row position, 'Structure' row position, 'Form Factor', 'Score' and the
+    number of explored 'Nodes'.
+    """
+    names = list(criteria)
+    candidates = [_candidates(criteria[name], mass_factor, cost_factor, power_factor) for name in names]
+
+    # structure score per height band, first catalog row of each form factor as in Structure.structure; the z-scores are
+    # taken over the single stack form factors only, so the multi-stack rows of the catalog do not shift them
+    eligible = np.isin(structure['Form_Factor'].to_numpy(), [size for size, _ in constants.StructureConfig.form_factors])
+    structure_scores = np.full(len(structure), np.nan)
+    structure_scores[eligible] = component_scores(structure[eligible], mass_factor, cost_factor, 0, subsystem_name='structure')
+    band_limits, band_scores, band_rows = [], [], []
+    for size, max_height in constants.StructureConfig.form_factors:
+        rows = np.flatnonzero(structure['Form_Factor'].to_numpy() == size)
+        band_limits.append(max_height)
+        band_rows.append(rows[0] if len(rows) else -1)
+        band_scores.append(structure_scores[rows[0]] if len(rows) and not np.isnan(structure_scores[rows[0]]) else np.inf)
+    band_limits = np.array(band_limits, dtype=float)
+    band_scores = np.append(band_scores, np.inf)
+
+    # lowest structure score of any stack at least this high
+    band_bounds = np.minimum.accumulate(band_scores[::-1])[::-1]
+
+    def structure_score(height):
+        return band_scores[np.searchsorted(band_limits, height, side='right')]
+
+    def structure_bound(height):
+        return band_bounds[np.searchsorted(band_limits, height, side='right')]
+
+    finite_bands = band_scores[np.isfinite(band_scores)]
+    if len(finite_bands) == 0:
+        raise ValueError("No suitable structure found based on the criteria.")
+    if np.all(band_scores[1:] >= band_scores[:-1]):
+        candidates = [_pareto_candidates(*candidate) for candidate in candidates]
+
+    # larger catalogs deeper in the tree, the last one is evaluated vectorized
+    order = sorted(range(len(names)), key=lambda k: len(candidates[k][0]))
+    levels = [candidates[k] for k in order]
+    rest_score = np.append(np.cumsum([level[1][0] for level in levels][::-1])[::-1], 0.0)
+    rest_height = np.append(np.cumsum([level[2].min() for level in levels][::-1])[::-1], 0.0)
+    lowest_structure = finite_bands.min()
+
+    best = {'score': np.inf, 'path': None}
+    nodes = 0
+
+    def search(depth, score, height, path):
+        nonlocal nodes
+        positions, scores, heights = levels[depth]
+        if depth == len(levels) - 1:
+            nodes += len(scores)
+            totals = score + scores + structure_score(height + heights)
+            i = int(np.argmin(totals))
+            if totals[i] < best['score']:
+                best['score'], best['path'] = totals[i], path + [i]
+            return
+        for i in range(len(scores)):
+            nodes += 1
+            partial = score + scores[i]
+            if partial + rest_score[depth + 1] + lowest_structure >= best['score']:
+                break
+            stack = height + heights[i]
+            if partial + rest_score[depth + 1] + structure_bound(stack + rest_height[depth + 1]) >= best['score']:
+                continue
+            search(depth + 1, partial, stack, path + [i])
+
+    search(0, 0.0, float(fixed_height), [])
+    if best['path'] is None:
+        raise ValueError("No combination of components fits an available CubeSat size.")
+
+    selection, total_height = {}, float(fixed_height)
+    for k, i in zip(order, best['path']):
+        positions, _, heights = candidates[k]
+        selection[names[k]] = int(positions[i])
+        total_height += heights[i]
+    band = int(np.searchsorted(band_limits, total_height, side='right'))
+    return {'Selection': selection,
+            'Structure': int(band_rows[band]),
+            'Form Factor': constants.StructureConfig.form_factors[band][0],
+            'Score': float(best['score']),
+            'Nodes': nodes}
+
+
+def pareto_mask(points) -> np.ndarray:
+    """
+    Mask of the non-dominated rows of an (n, k) array, lower is better in every column.
+    Rows are sorted lexicographically, so a row can only be dominated by an earlier one; of identical rows the first is kept.
+    Rows with missing values are never part of the front.
+    """
+    points = np.asarray(points, dtype=float)
+    mask = np.zeros(len(points), dtype=bool)
+    valid = np.flatnonzero(~np.isnan(points).any(axis=1))
+    if len(valid) == 0:
+        return mask
+    order = valid[np.lexsort(points[valid].T[::-1])]
+    ordered = points[order]
+
+    if points.shape[1] == 2:
+        # sorted by the first column, a row is on the front if its second column beats all rows before it
+        best_before = np.minimum.accumulate(np.concatenate(([np.inf], ordered[:-1, 1])))
+        mask[order[ordered[:, 1] < best_before]] = True
+        return mask
+
+    front = np.empty_like(ordered)
+    size = 0
+    for row, point in zip(order, ordered):
+        if size and np.any(np.all(front[:size] <= point, axis=1)):
+            continue
+        front[size] = point
+        size += 1
+        mask[row] = True
+    return mask
+
+
+def component_objectives(component:pd.DataFrame, is_comm=False, tgs=None, subsystem_name='subsystem') -> np.ndarray:
+    """
+    Mass, cost and power of all components as an (n, 3) array, power is zero for EPS and the structure.
+    """
+    power = component_power(component, is_comm, tgs, subsystem_name)
+    power = np.zeros(len(component)) if power is None else np.asarray(power, dtype=float)
+    return np.column_stack([component['Mass'].to_numpy(dtype=float), component['Cost'].to_numpy(dtype=float), power])
+
+
+def pareto_components(component:pd.DataFrame, filter_key, filter_value, comparator, is_comm=False, tgs=None, subsystem_name='subsystem') -> np.ndarray:
+    """
+    Row positions of the feasible components that are Pareto optimal in mass, cost and power.
+    Every weighted selection picks one of these components.
+    """
+    objectives = component_objectives(component, is_comm, tgs, subsystem_name)
+    feasible = np.flatnonzero(feasible_mask(component, filter_key, filter_value, comparator))
+    if len(feasible) == 0:
+        raise ValueError("No suitable component found based on the criteria.")
+    return feasible[pareto_mask(objectives[feasible])]
+
+
+def system_pareto_front(criteria:dict, structure:pd.DataFrame, fixed_height=0) -> pd.DataFrame:
+    """
+    Pareto optimal designs of the whole CubeSat in total mass, cost and power, including the structure that fits the stack.
+
+    When a higher stack never gets a lighter, cheaper or less power hungry structure, a component that is dominated in
+    mass, cost, power and height only leads to dominated designs. The front is then built exactly from the fronts of
+    the subsystems in these four objectives: subsystems are added one at a time and only the partial designs that are
+    non-dominated in mass, cost, power and stack height are kept. A shorter but heavier component stays, as it may
+    allow a smaller form factor. If the structure catalog breaks that order, all feasible components are combined and
+    partial designs are only compared with designs of the same height.
+
+    Parameters:
+    criteria: Subsystem name to its selection criteria, as in Subsystem.selection_criteria.
+    structure: Structure catalog with Form_Factor, Mass and Cost.
+    fixed_height: Height of the stack that is not selected, e.g. the payload, in mm.
+
+    Returns:
+    DataFrame: One row per Pareto optimal design with Mass, Cost, Power, Form_Factor and the catalog row position of
+    every subsystem and of the structure, sorted by mass.
+    """
+    form_factors = constants.StructureConfig.form_factors
+    band_limits = np.array([max_height for _, max_height in form_factors], dtype=float)
+    band_rows = []
+    for size, _ in form_factors:
+        rows = np.flatnonzero(structure['Form_Factor'].to_numpy() == size)
+        band_rows.append(rows[0] if len(rows) else -1)
+    structure_objectives = component_objectives(structure, subsystem_name='structure')
+    band_objectives = np.array([structure_objectives[row] if row >= 0 else [np.nan] * 3 for row in band_rows])
+    available = np.flatnonzero(~np.isnan(band_objectives).any(axis=1))
+    if len(available) == 0:
+        raise ValueError("No suitable structure found based on the criteria.")
+    monotone = np.all(np.diff(band_objectives[available], axis=0) >= 0) and np.all(np.diff(available) == 1) and available[0] == 0
+    max_height = band_limits[available[-1]]
+
+    names = list(criteria)
+    fronts = []
+    for name in names:
+        c = criteria[name]
+        component = c['component']
+        objectives = np.column_stack([component_objectives(component, c.get('is_comm', False), c.get('tgs'),
+                                                           c.get('subsystem_name', 'subsystem')),
+                                      component['Height'].to_numpy(dtype=float)])
+        feasible = np.flatnonzero(feasible_mask(component, c['filter_key'], c['filter_value'], c['comparator']))
+        if len(feasible) == 0:
+            raise ValueError("No suitable component found based on the criteria.")
+        if monotone:
+            # a lower stack never gets a worse structure, so height is pruned on like the other objectives
+            positions = feasible[pareto_mask(objectives[feasible])]
+        else:
+            # without the height order, components of other heights cannot be compared
+            positions = feasible[~np.isnan(objectives[feasible]).any(axis=1)]
+        fronts.append((positions, objectives[positions]))
+    rest_height = np.append(np.cumsum([front[1][:, 3].min() for front in fronts][::-1])[::-1], 0.0)
+
+    # partial designs: objectives (mass, cost, power, height) and the chosen position per subsystem
+    designs = np.array([[0.0, 0.0, 0.0, float(fixed_height)]])
+    chosen = np.empty((1, 0), dtype=int)
+    for k, (positions, objectives) in enumerate(fronts):
+        designs = (designs[:, None, :] + objectives[None, :, :]).reshape(-1, 4)
+        chosen = np.column_stack([np.repeat(chosen, len(positions), axis=0), np.tile(positions, len(chosen))])
+        fits = designs[:, 3] + rest_height[k + 1] < max_height
+        designs, chosen = designs[fits], chosen[fits]
+        if monotone:
+            keep = pareto_mask(designs)
+        else:
+            keep = np.zeros(len(designs), dtype=bool)
+            for height in np.unique(designs[:, 3]):
+                same = np.flatnonzero(designs[:, 3] == height)
+                keep[same[pareto_mask(designs[same, :3])]] = True
+        designs, chosen = designs[keep], chosen[keep]
+    if len(designs) == 0:
+        raise ValueError("No combination of components fits an available CubeSat size.")
+
+    bands = np.searchsorted(band_limits, designs[:, 3], side='right')
+    totals = designs[:, :3] + band_objectives[bands]
+    keep = pareto_mask(totals)
+    front = pd.DataFrame(totals[keep], columns=['Mass', 'Cost', 'Power'])
+    front['Form_Factor'] = [form_factors[band][0] for band in bands[keep]]
+    for k, name in enumerate(names):
+        front[name] = chosen[keep, k]
+    front['Structure'] = np.asarray(band_rows)[bands[keep]]
+    return front.sort_values(['Mass', 'Cost', 'Power'], ignore_index=True)
@@ -0,0 +1,95 @@
+from cubesat_configurator import simulation_metrics as sm
+
+# Step loop of CubeSat.simulate_last_orbit, shared with the validation harness so that both run the same bookkeeping.
+# Works on any module with the PASEOS actor API and does not import ParaPy, PASEOS or pykep itself.
+
+DAY2SEC = 86400.0  # s, as pykep
+
+STATUS_KEYS = ('time_s', 'time_h', 'eclipse', 'contact', 'station_contact', 'power_consumption', 'battery_SoC',
+               'onboard_data', 'temperature', 'position')
+
+
+def run_mission_loop(sat_actor, sim, contact_checks, t0, runs, dt, power_comm, power_idle, downlink_data_rate,
+                     time_btw_pics, picture_size, bus_data_rate, capacity, metrics=None, verbose=True):
+    """
+    Step the simulation with the operations of the CubeSat: downlink during contacts, a picture every time_btw_pics
+    starting halfway the first interval, the bus data and the power consumption, which is dropped when the battery
+    cannot deliver it for a step.
+
+    Parameters:
+    sat_actor, sim: Spacecraft actor and simulation, with orbit, power devices and thermal model set.
+    contact_checks: One function per ground station, called every step, True while the station is in contact.
+    t0: Start epoch of the simulation.
+    runs, dt: Number of steps and step size in s.
+    power_comm, power_idle: Power consumption in W with and without contact.
+    downlink_data_rate, bus_data_rate: Data rates in kbps, picture_size in kbits, capacity of the battery in Ws.
+    metrics: SimulationMetrics to book the stages on, started here, a new one without progress by default.
+    verbose: Print every picture taken.
+
+    Returns:
+    tuple: Status dict with a list per step for every key of STATUS_KEYS ('contact' is the flag of the last station
+    as before, 'station_contact' the flags of all stations) and the eclipse time in s.
+    """
+    metrics = metrics or sm.SimulationMetrics(runs)
+    status = {key: [] for key in STATUS_KEYS}
+    eclipse_time = 0
+    onboard_data = 0  # kbits
+    pictures_taken = 0
+
+    metrics.start()
+    for _ in range(runs):
+        eclipse_flag = sat_actor.is_in_eclipse()
+        if eclipse_flag:
+            eclipse_time += dt
+        metrics.lap('eclipse')
+
+        contact_list = [check() for check in contact_checks]
+        metrics.lap('line_of_sight')
+
+        # if there is a contact with any ground station, downlink and use the power of the communication subsystem
+        if any(contact_list):
+            power_consumption = power_comm  # W
+            # reduce the onboard data by the downlink data rate until it reaches 0
+            onboard_data = max(onboard_data - downlink_data_rate * dt, 0)
+        else:
+            power_consumption = power_idle  # W
+
+        # the orbit is divided in equal time intervals with a picture in each, starting halfway the first interval
+        # to avoid taking a picture right at the edges of the time interval
+        local_time_since_start = (sat_actor.local_time.mjd2000 - t0.mjd2000) * DAY2SEC
+        if local_time_since_start > time_btw_pics * (0.5 + pictures_taken):
+            onboard_data += picture_size
+            pictures_taken += 1
+            metrics.count('pictures')
+            metrics.lap('bookkeeping')
+            if verbose:
+                print(" ------------- PICTURE TAKEN! --------------------\n"
+                      f"Picture nr {pictures_taken} taken at: {sat_actor.local_time}\n"
+                      "----------------------------------------------------")
+            metrics.lap('printing')
+
+        time_s = sim.simulation_time - t0.mjd2000 * DAY2SEC
+        status["time_s"].append(time_s)
+        status["time_h"].append(time_s / 3600)
+        status["eclipse"].append(eclipse_flag)
+        status["contact"].append(contact_list[-1] if contact_list else False)
+        status["station_contact"].append(contact_list)
+        status["power_consumption"].append(power_consumption)
+        status["battery_SoC"].append(sat_actor.state_of_charge)
+        status["onboard_data"].append(onboard_data)
+        status["temperature"].append(sat_actor.temperature_in_C)
+        status["position"].append(sat_actor.get_position(sat_actor.local_time))
+
+        # update onboard data with the bus data rate
+        onboard_data += bus_data_rate * dt
+
+        if dt * power_consumption > capacity * status["battery_SoC"][-1]:
+            power_consumption = 0
+        metrics.lap('bookkeeping')
+
+        # advance the time
+        sim.advance_time(dt, power_consumption)
+        metrics.lap('propagation')
+        metrics.step()
+
+    return status, eclipse_time
@@ -0,0 +1,255 @@
+import itertools
+import math
+import numpy as np
+
+
+def stack_positions(stack):
+    """
+    Set the CoM_Location of every element of a stack listed bottom first, the stack starts at height 0.
+    """
+    current_height = 0
+    for sub in stack:
+        sub['CoM_Location'] = current_height + sub['height'] / 2
+        current_height += sub['height']
+    return stack
+
+
+def _best_spacer_distribution(suffix_masses, target, spacers, best_error, tolerance=0.0, window=64):
+    """
+    Spacers per gap minimizing |sum(d_g * M_g) - target| with sum(d_g) <= spacers, the rest of the spacers go on top.
+    Gap g lies below board g, so its spacers lift all boards from g up, whose mass is M_g (non-increasing in g).
+    Depth-first over the gaps: a branch is cut when the range of values it can still reach is further from the target
+    than best_error, the spacers of the last gap follow from rounding. The spacers of a gap are tried outwards from the
+    count that centers the target in the range the remaining gaps can reach, so with many spacers the first branches
+    already come within tolerance, and the search stops once the error is within tolerance.
+
+    Returns:
+    tuple: (error, spacers per gap), error is inf if no distribution beats best_error.
+    """
+    gaps = len(suffix_masses)
+    best = [best_error, None]
+    counts = [0] * gaps
+
+    def last_gap(value, remaining, mass):
+        # spacers of the last gap that bring the value closest to the target
+        if mass <= 0:
+            return np.zeros(np.shape(value), dtype=int)
+        return np.clip(np.round((target - value) / mass), 0, remaining).astype(int)
+
+    def search(g, value, remaining):
+        if best[0] <= tolerance:
+            return
+        mass = suffix_masses[g]
+        if g == gaps - 1:
+            d = int(last_gap(value, remaining, mass))
+            error = abs(value + d * mass - target)
+            if error < best[0]:
+                counts[g] = d
+                best[0], best[1] = error, counts.copy()
+            return
+        next_mass = suffix_masses[g + 1]
+        # spacers in this gap for which the reachable values [low, low + (remaining - d) * next_mass] come within best
+        # of the target, the remaining spacers lift the value at most by next_mass each
+        first, last = 0, remaining
+        if np.isfinite(best[0]):
+            if mass > 0:
+                last = min(last, int(np.ceil((target + best[0] - value) / mass)))
+            if mass > next_mass:
+                first = max(first, int(np.floor((target - best[0] - value - remaining * next_mass) / (mass - next_mass))))
+        if first > last:
+            return
+        # count that puts the target in the middle of the range the remaining gaps can reach
+        center = int(round((target - value - remaining * next_mass / 2) / (mass - next_mass / 2))) if mass > 0 else first
+        center = min(max(center, first), last)
+        if g == gaps - 2:
+            # all spacer counts of this gap at once, the last gap follows from rounding; a window around the center
+            # first, as it usually comes within tolerance already
+            windows = [(max(first, center - window), min(last, center + window))]
+            if windows[0] != (first, last):
+                windows.append((first, last))
+            for low_d, high_d in windows:
+                d = np.arange(low_d, high_d + 1)
+                low = value + d * mass
+                d_last = last_gap(low, remaining - d, next_mass)
+                errors = np.abs(low + d_last * next_mass - target)
+                i = int(np.argmin(errors))
+                if errors[i] < best[0]:
+                    counts[g], counts[g + 1] = int(d[i]), int(d_last[i])
+                    best[0], best[1] = float(errors[i]), counts.copy()
+                if best[0] <= tolerance:
+                    return
+            return
+        up, down = center, center - 1
+        while up <= last or down >= first:
+            if up <= last and (down < first or up - center <= center - down):
+                d, up = up, up + 1
+            else:
+                d, down = down, down - 1
+            low = value + d * mass
+            # more spacers in this gap only raise the lowest reachable value, fewer only lower the highest one
+            if low - target >= best[0]:
+                last = min(last, d - 1)
+            elif target - (low + (remaining - d) * next_mass) >= best[0]:
+                first = max(first, d + 1)
+            else:
+                counts[g] = d
+                search(g + 1, low, remaining - d)
+                if best[0] <= tolerance:
+                    return
+
+    if gaps == 0:
+        return (abs(target), []) if abs(target) < best_error else (np.inf, None)
+    search(0, 0.0, spacers)
+    return (best[0], best[1]) if best[1] is not None else (np.inf, None)
+
+
+def mass_quantum(masses, resolution=1e-6):
+    """
+    Largest mass that all masses are integer multiples of, at the given resolution, e.g. 1 for masses in whole grams.
+    """
+    steps = [round(mass / resolution) for mass in masses]
+    if any(abs(step * resolution - mass) > resolution * 1e-3 for step, mass in zip(steps, masses)):
+        return 0.0
+    return math.gcd(*steps) * resolution
+
+
+def optimal_stack(subsystems, fixed_at_bottom, total_height, number_of_spacers):
+    """
+    Stacking order of the subsystems and identical massless spacers that brings the CoM closest to the geometric center.
+
+    The spacers share the space left in the structure equally and are treated as a multiset: only how many spacers
+    lie below each board matters. For every order of the boards the best spacer distribution is found by branch and bound,
+    sharing the best distance over all orders, so the result is optimal for any number of spacers.
+    When the board masses are multiples of a common quantum, every spacer distribution lifts the moment by a multiple
+    of quantum * spacer height. The distance of the centering moment to the nearest such multiple is then a lower bound
+    per order: orders whose bound cannot beat the best stack are skipped, and the search of an order stops as soon as it
+    reaches its bound, which with many spacers is almost always reachable.
+
+    Parameters:
+    subsystems: dicts with name, mass and height, including fixed_at_bottom.
+    fixed_at_bottom: Subsystem at the bottom of the stack.
+    total_height: Height of the structure in mm.
+    number_of_spacers: Number of spacers filling the space left.
+
+    Returns:
+    list: Stack as dicts with name, mass, height and CoM_Location, the top one first.
+    """
+    boards = [sub for sub in subsystems if sub is not fixed_at_bottom]
+    space_for_spacers = total_height - sum(sub['height'] for sub in subsystems)
+    spacer_size = space_for_spacers / number_of_spacers if number_of_spacers > 0 else 0  # mm
+    total_mass = sum(sub['mass'] for sub in subsystems)
+    # moment of the spacer lifts that puts the CoM on the geometric center
+    centered_moment = total_mass * total_height / 2
+    # a CoM within a nanometre of the center cannot be improved on
+    tolerance = 1e-9 * total_mass
+    # every spacer lift is a multiple of this moment, 0 if the masses have no common quantum
+    lift_quantum = mass_quantum([sub['mass'] for sub in boards]) * spacer_size if boards else 0.0
+
+    best_error, best_order, best_counts = np.inf, None, None
+    for order in itertools.permutations(boards):
+        moment = fixed_at_bottom['mass'] * fixed_at_bottom['height'] / 2
+        height = fixed_at_bottom['height']
+        for sub in order:
+            moment += sub['mass'] * (height + sub['height'] / 2)
+            height += sub['height']
+        if spacer_size > 0:
+            target = centered_moment - moment
+            bound = abs(target - lift_quantum * round(target / lift_quantum)) if lift_quantum > 0 else 0.0
+            if bound >= best_error:
+                continue
+            suffix_masses = np.cumsum([sub['mass'] for sub in order][::-1])[::-1] * spacer_size
+            error, counts = _best_spacer_distribution(list(suffix_masses), target, number_of_spacers, best_error,
+                                                      max(tolerance, bound + tolerance))
+        else:
+            error, counts = abs(moment - centered_moment), [0] * len(order)
+            error = error if error < best_error else np.inf
+        if error < best_error:
+            best_error, best_order, best_counts = error, order, counts
+        if best_error <= tolerance:
+            break
+
+    stack = [dict(fixed_at_bottom)]
+    spacer_index = 0
+    for sub, count in zip(best_order, best_counts):
+        for _ in range(count):
+            stack.append({'name': f'Spacer_{spacer_index}', 'mass': 0, 'height': spacer_size, 'CoM_Location': None})
+            spacer_index += 1
+        stack.append(dict(sub))
+    while spacer_index < number_of_spacers:
+        stack.append({'name': f'Spacer_{spacer_index}', 'mass': 0, 'height': spacer_size, 'CoM_Location': None})
+        spacer_index += 1
+    return stack_positions(stack)[::-1]
+
+
+def _min_norm_spacer_heights(suffix_masses, target, space):
+    """
+    Spacer heights per gap with sum(h_g * M_g) = target and sum(h_g) = space, h_g >= 0, with the smallest sum(h_g^2),
+    i.e. the space spread as evenly as the balance allows. The last gap is the top of the stack with M = 0.
+    The optimum solves the two equality constraints on its support, so every support is solved with the pseudo-inverse
+    and the feasible solution with the smallest norm is kept.
+    """
+    A = np.vstack([suffix_masses, np.ones(len(suffix_masses))])
+    b = np.array([target, space])
+    best_norm, best_heights = np.inf, None
+    for size in range(1, len(suffix_masses) + 1):
+        for support in itertools.combinations(range(len(suffix_masses)), size):
+            support = list(support)
+            h = np.linalg.pinv(A[:, support]) @ b
+            if np.any(h < -1e-9 * max(space, 1)) or not np.allclose(A[:, support] @ h, b, rtol=1e-9, atol=1e-9 * max(space, 1)):
+                continue
+            norm = float(h @ h)
+            if norm < best_norm:
+                best_norm = norm
+                best_heights = np.zeros(len(suffix_masses))
+                best_heights[support] = np.maximum(h, 0)
+    return best_heights, best_norm
+
+
+def optimal_continuous_stack(subsystems, fixed_at_bottom, total_height):
+    """
+    Stacking order of the subsystems with spacers of free height that brings the CoM closest to the geometric center.
+
+    For a board order the spacers below the boards lift the CoM moment by sum(h_g * M_g), with M_g the mass above gap g,
+    which reaches any value between 0 (all space on top) and the space times the mass above the payload. The best
+    offset of an order therefore follows in closed form by clamping the centering moment to that range, and the spacer
+    heights are the most even ones that give it. Orders are compared on the CoM offset, then on the evenness of the spacers.
+    At least as balanced as any stack of equal spacers.
+
+    Parameters:
+    subsystems: dicts with name, mass and height, including fixed_at_bottom.
+    fixed_at_bottom: Subsystem at the bottom of the stack.
+    total_height: Height of the structure in mm.
+
+    Returns:
+    list: Stack as dicts with name, mass, height and CoM_Location, the top one first, spacers only where the height is not zero.
+    """
+    boards = [sub for sub in subsystems if sub is not fixed_at_bottom]
+    space_for_spacers = max(total_height - sum(sub['height'] for sub in subsystems), 0)
+    total_mass = sum(sub['mass'] for sub in subsystems)
+    centered_moment = total_mass * total_height / 2
+
+    best_key, best_order, best_heights = (np.inf, np.inf), None, None
+    for order in itertools.permutations(boards):
+        moment = fixed_at_bottom['mass'] * fixed_at_bottom['height'] / 2
+        height = fixed_at_bottom['height']
+        for sub in order:
+            moment += sub['mass'] * (height + sub['height'] / 2)
+            height += sub['height']
+        suffix_masses = np.append(np.cumsum([sub['mass'] for sub in order][::-1])[::-1], 0.0)
+        target = centered_moment - moment
+        reachable = min(max(target, 0.0), space_for_spacers * suffix_masses[0])
+        heights, norm = _min_norm_spacer_heights(suffix_masses, reachable, space_for_spacers)
+        # offsets closer than a nanometre count as equal, the evenness of the spacers decides
+        key = (round(abs(target - reachable) / total_mass, 9), norm)
+        if key < best_key:
+            best_key, best_order, best_heights = key, order, heights
+
+    stack = [dict(fixed_at_bottom)]
+    spacer_index = 0
+    for gap, sub in enumerate(list(best_order) + [None]):
+        if best_heights[gap] > 1e-9:
+            stack.append({'name': f'Spacer_{spacer_index}', 'mass': 0, 'height': float(best_heights[gap]), 'CoM_Location': None})
+            spacer_index += 1
+        if sub is not None:
+            stack.append(dict(sub))
+    return stack_positions(stack)[::-1]
@@ -1,34 +1,36 @@
 from parapy.core import *
 from parapy.geom import *
 from parapy.exchange.step import STEPReader
+from parapy.core.widgets import Dropdown
 
 import pandas as pd
 import numpy as np
 import os
-import pykep as pk
 from cubesat_configurator import constants
-import itertools
-import math
+from cubesat_configurator import catalog
+from cubesat_configurator import selection_helpers as sh
+from cubesat_configurator import stacking_helpers as stk
+from cubesat_configurator import layout_helpers as lay
+from cubesat_configurator import mass_properties as mprop
 
 class Structure(GeomBase):
     number_of_spacers = Input(5, doc="Number of spacers to be added to the stack")
+    spacer_mode = Input('equal', doc="'equal': number_of_spacers spacers of equal height, 'continuous': spacers of free height between the subsystems",
+                        widget=Dropdown(['equal', 'continuous']))
 
     @number_of_spacers.validator
     def number_of_spacers(self, value):
         if value < 0:
             msg = ("Number of spacers cannot be negative.")
             return False, msg
-        if value > 6:
-            msg = ("Number of spacers should not exceed 6, to avoid very long simulation times.")
-            return False, msg 
+        if value > constants.StructureConfig.max_spacers:
+            msg = (f"Number of spacers should not exceed {constants.StructureConfig.max_spacers}, to keep the exact stacking search interactive.")
+            return False, msg
         return True
 
     def read_struct_from_csv(self):
-        """Read subsystem data from CSV."""
-        script_dir = os.path.dirname(__file__)
-        relative_path = os.path.join('data', 'Structure.csv')
-        obc_info_path = os.path.join(script_dir, relative_path)
-        return pd.read_csv(obc_info_path)
+        """Read subsystem data from CSV, parsed once per process by the catalog registry."""
+        return catalog.load_catalog('Structure.csv')
 
     @Attribute
     def form_factor(self):
@@ -37,22 +39,28 @@ class Structure(GeomBase):
         adcs_selection_list = self.parent.adcs.adcs_selection
         bat_selection_list = self.parent.power.battery_selection
         comm_selection_list = self.parent.communication.comm_selection
-        total_height = obc_selection_list['Height'] + adcs_selection_list['Height'] + self.parent.payload.height + bat_selection_list['Height'] + comm_selection_list['Height']
-        height_factor = total_height / 100
-        
-        if height_factor < 1:
-            form_factor = 1
-        elif height_factor < 1.5:
-            form_factor = 1.5
-        elif height_factor < 2:
-            form_factor = 2
-        elif height_factor < 3:
-            form_factor = 3
-        else:
-            form_factor = "No available Cubesat sizes found"
-        self.height = form_factor*100
+        heights = [obc_selection_list['Height'], adcs_selection_list['Height'], self.parent.payload.height, bat_selection_list['Height'], comm_selection_list['Height']]
+        form_factor = sh.form_factor(sum(heights))
+        if form_factor is None:
+            # too high for a single stack, pack the boards into the stacks of a 6U or 12U bus
+            form_factor = lay.layout_form_factor(heights)
+        if form_factor is None:
+            return "No available Cubesat sizes found"
+        self.height = self.stack_height_of(form_factor)
         return form_factor
 
+    @staticmethod
+    def stack_height_of(form_factor):
+        "Height of the stack(s) of a form factor in mm"
+        if form_factor in constants.StructureConfig.layouts:
+            return constants.StructureConfig.layout_stack_height
+        return 100*form_factor
+
+    @Attribute
+    def is_layout(self):
+        "True for buses with several stacks side by side"
+        return self.form_factor in constants.StructureConfig.layouts
+
     @Attribute
     def _read_step_file(self):
         "Choose STEP File based on the form factor"
@@ -79,7 +87,11 @@ class Structure(GeomBase):
 
     @Part
     def structure_representation(self):
-        "Display STEP File"
+        "Display STEP File, buses with several stacks are shown as their envelope"
+        if self.is_layout:
+            (length, width, _), _ = lay.bus_envelope(self.form_factor)
+            return Box(length=length, width=width, height=self.height,
+                       position=translate(self.position, 'z', self.height/2), centered=True, transparency=0.7)
         return STEPReader(filename=self._read_step_file)
     
     @Attribute
@@ -169,87 +181,42 @@ class Structure(GeomBase):
         CoM = self.calculate_CoM_of_stack(optimal_stack)
         return CoM
     
+    @Attribute
+    def mass_properties(self):
+        """
+        Mass, CoM vector and inertia tensor about the CoM of the configured CubeSat in SI units, from the boxes of the stack and the structure.
+        """
+        properties = mprop.stack_mass_properties([self.optimal_stacking_order], self.mass, self.form_factor)
+        return {key: value[0] for key, value in properties.items()}
+
     @Attribute
     def distance_CoM_to_geometric_center(self):
         """
         Returns the distance between the center of mass and the geometric center of the satellite stack.
+        Buses with several stacks also count the offset in x and y.
         """
-        total_height = 100*self.form_factor
+        total_height = self.stack_height_of(self.form_factor)
         geometric_center = total_height / 2
+        if self.is_layout:
+            center_xy = np.mean(constants.StructureConfig.layouts[self.form_factor], axis=0)
+            return float(np.linalg.norm(lay.stack_CoM(self.optimal_stacking_order) - [*center_xy, geometric_center]))
         distance = abs(self.CoM_location - geometric_center)
         return distance
 
     
     def _find_optimal_stacking_order(self, subsystems, fixed_at_bottom=None):
-
-        min_distance = float('inf') # Initialize minimum distance to infinity
-        optimal_stack = None
-
-        subsystems_list = subsystems.copy()
-
-        # calculate leftover space for spacers
-        space_for_spacers = 100*self.form_factor - sum(sub['height'] for sub in subsystems_list)
-        # round down to the nearest integer
-        num_spacers = self.number_of_spacers 
-        spacer_size = space_for_spacers / num_spacers if num_spacers > 0 else 0 # mm
-        print(f"Space for spacers: {space_for_spacers} mm")
-
-        # remove the fixed subsystem from the list 
-        subsystems_list.remove(fixed_at_bottom)
-
-        
-        # append spacers to the end of the subsystems list
-        for i in range(num_spacers):
-            subsystems_list.append({'name': f'Spacer_{i}', 'mass': 0, 'height': spacer_size, 'CoM_Location': None})
-
-        print('\nstart permutating...')
-
-        all_permutations = itertools.permutations(subsystems_list)
-        
-        
-        i = 0
-        # Iterate through all permutations
-        for perm in all_permutations:
-            i += 1
-
-            # add fixed_at_bottom to the beginning of the permutation
-            perm = [fixed_at_bottom] + list(perm)
-            
-            current_height = 0
-            # Iterate through all subsystems in the permutation
-            for sub in perm:
-                sub['CoM_Location'] = current_height + sub['height'] / 2
-                current_height += sub['height']
-
-            # sort subsystems by CoM_Location
-            # perm_sorted = sorted(perm, key=lambda x: x['CoM_Location'])
-            perm_sorted = sorted(perm, key=lambda x: x['CoM_Location'], reverse=True)
-
-            total_height = 100*self.form_factor # remove the last distance added
-            # assert total_height == 100*self.form_factor # check if the total height is equal to the form factor
-
-            geometric_center = total_height / 2
-            CoM = self.calculate_CoM_of_stack(perm)
-            distance = abs(CoM - geometric_center)
-            
-            if distance < min_distance:
-                min_distance = distance
-                optimal_stack = perm_sorted
-                self._display_stacking(perm_sorted, total_height)
-        
-            # stop when distance of Center of Mass to Geometric Center is less than 1 mm
-            if abs(min_distance) <= 1:
-                break
-
-        # calculate number of permutations
-        N_perm = math.factorial(len(subsystems_list)) 
-        
-        # print the number of permutations
-        print(f"Number of permutations: {N_perm}\n"
-              f"\nNumber of iterations: {i}")
-        print(f"Number of considered permutations: {len(list(all_permutations))}")
-        # return last item of the list, which is the optimal stacking order
-        return optimal_stack
+        """
+        Optimal stacking order of the subsystems and spacers, the payload stays at the bottom.
+        Identical spacers are placed by branch and bound per board order instead of permutating them, searched outwards from
+        the balanced spacer counts, so even many spacers take milliseconds for catalog masses in whole grams.
+        In continuous mode the spacer heights are free and follow in closed form per board order.
+        Buses with several stacks are laid out over their stacks, with spacers of free height.
+        """
+        if self.is_layout:
+            return lay.optimal_layout(subsystems, fixed_at_bottom, self.form_factor)
+        if self.spacer_mode == 'continuous':
+            return stk.optimal_continuous_stack(subsystems, fixed_at_bottom, self.stack_height_of(self.form_factor))
+        return stk.optimal_stack(subsystems, fixed_at_bottom, self.stack_height_of(self.form_factor), self.number_of_spacers)
 
     def calculate_CoM_of_stack(self, stack):
 
@@ -2,6 +2,8 @@ from parapy.core import *
 from parapy.geom import *
 import os
 import pandas as pd
+from cubesat_configurator import selection_helpers as sh
+from cubesat_configurator import catalog
 
 class Subsystem(GeomBase):
     height = Input(0)
@@ -15,107 +17,37 @@ class Subsystem(GeomBase):
     length = 94
 
     def read_subsystems_from_csv(self, subsystem_file_name):
-        """Read subsystem data from CSV."""
-        script_dir = os.path.dirname(__file__)
-        relative_path = os.path.join('data', subsystem_file_name)
-        obc_info_path = os.path.join(script_dir, relative_path)
-        return pd.read_csv(obc_info_path)
+        """Read subsystem data from CSV, parsed once per process by the catalog registry."""
+        return catalog.load_catalog(subsystem_file_name)
 
     def component_selection(self,component, filter_key, filter_value, comparator='greater',is_comm=False, tgs=None, subsystem_name='subsystem'):
         """
         Filter components and select the best component based on the score.
+        Filters, z-scores and weighted scores are computed as column operations over the whole catalog.
         """
-        filtered_list = []
-
-        # calculate mean and standard deviation of Mass and Cost 
-        mass_mean = component['Mass'].mean()
-        mass_std = component['Mass'].std()
-        cost_mean = component['Cost'].mean()
-        cost_std = component['Cost'].std()
-
-        # For communication subsystem, calculate a combined power value, Power mean and standard deviations are calculated differently 
-        if is_comm and tgs is not None:
-            power_combined = component['Power_DL'] * (tgs / (24*3600)) + component['Power_Nom'] * (1 - (tgs / (24*3600)))
-            power_mean = power_combined.mean()
-            power_std = power_combined.std()
-
-        # For Power subsystem, score is calculated without the power factor 
-        elif subsystem_name == 'eps':
-            power_mean = 0
-            power_std = 0
-        else:
-            power_mean = component['Power'].mean()
-            power_std = component['Power'].std()
-
-        # Returns components from list that satisfy the filter value 
-        for index, row in component.iterrows():
-            if comparator == 'greater':
-                FILTER_CONDITION = row[filter_key] > filter_value
-            else:
-                FILTER_CONDITION = row[filter_key] < filter_value
-
-            if FILTER_CONDITION:
-                norm_mass = ( row['Mass'] - mass_mean ) / mass_std
-                norm_cost = ( row['Cost'] - cost_mean) / cost_std
-
-                # Norm Power calculated differently for Communication subsystem
-                if is_comm and tgs is not None:
-                    norm_power = (row['Power_DL'] * (tgs / (24*3600)) + row['Power_Nom'] * (1 - (tgs / (24*3600))) - power_mean) / power_std
-
-                elif subsystem_name == 'eps':
-                    norm_power = 0
-
-                else:
-                    norm_power = (row['Power'] - power_mean) / power_std
-
-                # Score is calculated using normal distribution 
-
-                if subsystem_name == 'eps':
-                    score = (
-                    norm_mass * self.parent.mass_factor +
-                    norm_cost * self.parent.cost_factor
-                )
-                else:
-                    score = (
-                    norm_mass * self.parent.mass_factor +
-                    norm_cost * self.parent.cost_factor +
-                    norm_power * self.parent.power_factor
-                )
-                
-                filtered_list.append({
-                    'index': index,
-                    'Company': row.get('Company',None),
-                    'Data_Rate': row.get('Data_Rate', None), 
-                    'Pointing_Accuracy': row.get('Pointing_Accuracy', None),
-                    'Storage': row.get('Storage', None),
-                    'Form_factor': row.get('Form_factor', None),
-                    'Type': row.get('Type', None),
-                    'Power': row.get('Power',None),
-                    'Power_DL': row.get('Power_DL', None),
-                    'Power_Nom': row.get('Power_Nom', None),
-                    'Mass': row.get('Mass',None),
-                    'Height': row.get('Height', None),
-                    'Cost': row['Cost'],
-                    'Min_Temp':row.get('Min_Temp', None),
-                    'Max_Temp':row.get('Max_Temp', None),
-                    'Capacity':row.get('Capacity', None),
-                    'Score': score
-                })
-        
-        if len(filtered_list) == 0:
-            raise ValueError("No suitable component found based on the criteria.")
-        
-        selected = min(filtered_list, key=lambda x: x['Score'])
+        selected = sh.select_component(component, filter_key, filter_value, comparator,
+                                       self.parent.mass_factor, self.parent.cost_factor, self.parent.power_factor,
+                                       is_comm=is_comm, tgs=tgs, subsystem_name=subsystem_name)
         self.mass = selected["Mass"]
         self.cost = selected["Cost"]
         self.height = selected["Height"]
         if is_comm and tgs is not None: 
-            self.power = selected['Power_DL'] * (tgs / (24*3600)) + selected['Power_Nom'] * (1 - (tgs / (24*3600)))
+            self.power = sh.combined_comm_power(selected['Power_DL'], selected['Power_Nom'], tgs)
         else:
             self.power = selected["Power"]
             
         return selected
- 
+
+    @Attribute
+    def selection_index(self):
+        """
+        Threshold index of the catalog in selection_criteria for the current weights.
+        Answers the best component for any requirement value in O(log n), e.g. for sweeps over requirements.
+        """
+        criteria = {key: value for key, value in self.selection_criteria.items() if key != 'filter_value'}
+        return sh.build_threshold_index(mass_factor=self.parent.mass_factor, cost_factor=self.parent.cost_factor,
+                                        power_factor=self.parent.power_factor, **criteria)
+
     @Attribute(settable=True)
     def CoM_location(self):
         if not self._has_geometry:
@@ -131,6 +63,18 @@ class Subsystem(GeomBase):
                 CoM_z = subsystem['CoM_Location']
         print(CoM_z)
         return CoM_z
+
+    @Attribute
+    def layout_position(self):
+        """
+        x and y of the stack holding this subsystem, zero for form factors with a single stack.
+        """
+        if not self._has_geometry:
+            return 0, 0
+        for subsystem in self.parent.structure.optimal_stacking_order:
+            if subsystem['name'] == self.__class__.__name__:
+                return subsystem.get('x', 0), subsystem.get('y', 0)
+        return 0, 0
     
     @Part
     def representation(self):
@@ -144,7 +88,9 @@ class Subsystem(GeomBase):
                    width=self.width, 
                    height=self.height,
                    tooltip=self.subsystem_type,
-                   position=translate(self.position, 
+                   position=translate(self.position,
+                                      'x', self.layout_position[0],
+                                      'y', self.layout_position[1],
                                       'z', self.CoM_location),
                    centered=True,
                    suppress=(not self._has_geometry),)
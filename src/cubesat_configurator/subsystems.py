@@ -9,10 +9,13 @@ from cubesat_configurator import subsystem as ac
 import pandas as pd
 import numpy as np
 import os
-import pykep as pk
 from cubesat_configurator import constants
+from cubesat_configurator.lazy import lazy_import
 import itertools
 from cubesat_configurator import thermal_helpers as th
+from cubesat_configurator import catalog
+
+pk = lazy_import('pykep')
 
 
 class Payload(ac.Subsystem):
@@ -99,6 +102,14 @@ class ADCS(ac.Subsystem):
         """
         return self.read_subsystems_from_csv('ADCS.csv')
 
+    @Attribute
+    def selection_criteria(self):
+        """
+        Arguments of component_selection for the ADCS catalog.
+        """
+        return dict(component=self.read_adcs_from_csv, filter_key=self.requirement_key,
+                    filter_value=self.required_pointing_accuracy, comparator='less')
+
     @Attribute
     def adcs_selection(self):
         """
@@ -108,8 +119,7 @@ class ADCS(ac.Subsystem):
             DataFrame: Selected ADCS component details.
         """
         self.subsystem_type = 'ADCS'
-        adcs = self.read_adcs_from_csv
-        selected = self.component_selection(adcs, self.requirement_key, self.required_pointing_accuracy, 'less')
+        selected = self.component_selection(**self.selection_criteria)
         self.height = selected['Height']
         return selected
 
@@ -151,6 +161,15 @@ class COMM(ac.Subsystem):
         """
         return self.read_subsystems_from_csv('Communication_subsystem.csv')
     
+    @Attribute
+    def selection_criteria(self):
+        """
+        Arguments of component_selection for the communication catalog, scored on the combined power for the daily downlink time.
+        """
+        tgs = self.parent.simulate_first_orbit["comm_window_per_day"]
+        return dict(component=self.read_comm_from_csv, filter_key=self.requirement_key,
+                    filter_value=self.required_downlink_data_rate, comparator='greater', is_comm=True, tgs=tgs)
+
     @Attribute
     def comm_selection(self):
         """
@@ -160,9 +179,7 @@ class COMM(ac.Subsystem):
             DataFrame: Selected communication subsystem details.
         """
         self.subsystem_type = 'Communication'
-        comm = self.read_comm_from_csv
-        tgs = self.parent.simulate_first_orbit["comm_window_per_day"]
-        selected = self.component_selection(comm, self.requirement_key, self.required_downlink_data_rate, 'greater', is_comm=True, tgs=tgs)
+        selected = self.component_selection(**self.selection_criteria)
         self.height = selected['Height']
         return selected
 
@@ -186,13 +203,14 @@ class OBC(ac.Subsystem):
         if value < 0:
             return False, "Onboard data storage cannot be negative"
         
-        comms_df = self.read_obc_from_csv()
+        comms_df = self.read_obc_from_csv
         max_storage = comms_df['Storage'].max()
         if value > max_storage:
             return False, f"Required onboard data storage cannot exceed {max_storage} GB."
         
         return True
     
+    @Attribute
     def read_obc_from_csv(self):
         """
         Reads the onboard computer subsystem data from a CSV file.
@@ -202,6 +220,14 @@ class OBC(ac.Subsystem):
         """
         return self.read_subsystems_from_csv('OBC.csv')
 
+    @Attribute
+    def selection_criteria(self):
+        """
+        Arguments of component_selection for the onboard computer catalog.
+        """
+        return dict(component=self.read_obc_from_csv, filter_key=self.requirement_key,
+                    filter_value=self.required_onboard_data_storage, comparator='greater')
+
     @Attribute
     def obc_selection(self):
         """
@@ -211,8 +237,7 @@ class OBC(ac.Subsystem):
             DataFrame: Selected onboard computer subsystem details.
         """
         self.subsystem_type = 'Onboard Computer'
-        obc = self.read_obc_from_csv()
-        obc_selection = self.component_selection(obc, self.requirement_key, self.required_onboard_data_storage, 'greater')
+        obc_selection = self.component_selection(**self.selection_criteria)
         self.height = obc_selection['Height']
         return obc_selection
 
@@ -231,6 +256,7 @@ class EPS(ac.Subsystem):
     "Select type of Solar Panel from dropdown menu"
     Solar_cell_type = Input(default='Triple Junction GaAs rigid', widget=Dropdown(['Si rigid panel', 'HES Flexible array','Triple Junction GaAs rigid', 'Triple Junction GaAs ultraflex']))
  
+    @Attribute
     def read_SolarPanel_from_csv(self):
         """
         Read solar panel data from CSV file based on the selected type.
@@ -239,6 +265,7 @@ class EPS(ac.Subsystem):
         selected_panel = sp[sp['Type'] == self.Solar_cell_type]
         return (selected_panel.iloc[0])
     
+    @Attribute
     def read_bat_from_csv(self):
         """
         Read battery data from CSV file.
@@ -330,20 +357,26 @@ class EPS(ac.Subsystem):
         """
         Required battery capacity based on power requirements.
         """
-        bat = self.read_bat_from_csv()
+        bat = self.read_bat_from_csv
         req_battery_capacity = self.min_state_of_charge * self.eclipse_time * self.eclipse_power/3600
         if req_battery_capacity > bat['Capacity'].max():
             req_battery_capacity = self.min_state_of_charge * self.eclipse_time * self.eclipse_power_without_COM
         return req_battery_capacity
 
 
+    @Attribute
+    def selection_criteria(self):
+        """
+        Arguments of component_selection for the battery catalog, scored without power.
+        """
+        return dict(component=self.read_bat_from_csv, filter_key='Capacity',
+                    filter_value=self.req_battery_capacity, comparator='greater', subsystem_name='eps')
+
     @Attribute
     def battery_selection(self):
         """Select Batteries based on power requirements."""
         self.subsystem_type = 'EPS'
-        requirement_key = 'Capacity'
-        bat = self.read_bat_from_csv()
-        selected = self.component_selection(bat, requirement_key, self.req_battery_capacity, 'greater', subsystem_name='eps')
+        selected = self.component_selection(**self.selection_criteria)
         self.height = selected['Height']
         return selected
     
@@ -355,7 +388,7 @@ class EPS(ac.Subsystem):
     @Attribute
     def _solar_panel_fluxEOL(self):
         """Solar panel flux at End of Life (EOL)."""
-        selected_solar_panel=self.read_SolarPanel_from_csv()
+        selected_solar_panel=self.read_SolarPanel_from_csv
         Flux_solar = selected_solar_panel['Efficiency'] * constants.Thermal.S
         Flux_BOL = Flux_solar * constants.Power.I_d
         L_D = (1-constants.Power.F_d)**(self._mission_lifetime_yrs)
@@ -371,13 +404,13 @@ class EPS(ac.Subsystem):
     @Attribute
     def solar_panel_mass(self):
         """Estimated mass of solar panels."""
-        selected_solar_panel = self.read_SolarPanel_from_csv()
+        selected_solar_panel = self.read_SolarPanel_from_csv
         return (self.req_solar_panel_power/selected_solar_panel['Specific_power'] * 1000)
     
     @Attribute
     def solar_panel_cost(self):
         """Estimated cost of solar panels."""
-        selected_solar_panel = self.read_SolarPanel_from_csv()
+        selected_solar_panel = self.read_SolarPanel_from_csv
         return (selected_solar_panel['Specific_cost']*self.req_solar_panel_power*1000)
         
 
@@ -392,6 +425,7 @@ class Thermal(ac.Subsystem):
     T_min_in_C = Input()  # deg C
     T_margin = Input(5)  # deg C (or K)
     satellite_cp = Input(900)  # J/kgK specific heat capacity of aluminum
+    solar_cell_faces = Input(['+X', '-X', '+Y', '-Y'], doc="Faces covered by body mounted solar cells, coated from the NASA solar cell table")
     
     @Attribute
     def T_max_with_margin_in_K(self):
@@ -432,7 +466,25 @@ class Thermal(ac.Subsystem):
     
     @Attribute
     def coatings_df(self):
-            return pd.read_csv(os.path.join(os.path.dirname(__file__), 'data/thermal_coatings/coatings_SMAD_no_dupl.csv'))
+        """
+        Merged SMAD body coatings and NASA solar cell coatings, with a 'Source' column.
+        """
+        return self.coating_index.coatings_df
+
+    @Attribute
+    def coating_tables(self):
+        """
+        Coating tables by source: SMAD body coatings and NASA solar cell coatings.
+        """
+        return {'SMAD': catalog.load_catalog(constants.Thermal.body_coatings_path),
+                'NASA': catalog.load_catalog(constants.Thermal.sa_coatings_path)}
+
+    @Attribute
+    def coating_index(self):
+        """
+        k-d tree over the (Absorptivity, Emissivity) plane of the merged coating tables.
+        """
+        return th.build_coating_index(self.coating_tables)
         
     @Attribute
     def Q_internal(self):
@@ -446,65 +498,44 @@ class Thermal(ac.Subsystem):
     
     @Attribute
     def selected_coating(self):
-
-        U = np.array([1, 1.5, 2, 3], dtype=float)  # form factors
-
-        # max cross sectional area for all u in U
-        A_C_max = np.sqrt(2) * U * 0.01 # m^2
-
-        # min cross sectional area for all u in U, same for all form factors
-        A_C_min = 0.01 # m^2
-
-        # surface area for all u in U
-        A_S = (2+4*U) * 0.01 # m^2
-
-        local_coatings_df = self.coatings_df.copy()
-
-        ####### loop coatings
-        for i in range(0, len(local_coatings_df)):
-            ####### loop form factors
-            for index, u in enumerate(U):
-                T_hot_eq = th.calculate_equilibrium_hot_temp(0, 
-                                                            self.Q_internal,
-                                                            local_coatings_df.loc[i, 'Absorptivity'], 
-                                                            local_coatings_df.loc[i, 'Emissivity'], 
-                                                            self._periapsis, 
-                                                            self._apoapsis, 
-                                                            A_C_max[index], 
-                                                            A_C_min, 
-                                                            A_S[index])  # K
-                T_cold_eq = th.calculate_equilibrium_cold_temp(0, 
-                                                            self.Q_internal,
-                                                            local_coatings_df.loc[i, 'Absorptivity'], 
-                                                            local_coatings_df.loc[i, 'Emissivity'], 
-                                                            self._periapsis, 
-                                                            self._apoapsis, 
-                                                            A_C_max[index], 
-                                                            A_C_min, 
-                                                            A_S[index])  # K
-
-                # final temperatures for design
-                T_hot = T_hot_eq
-                
-                T_cold = th.exact_transient_solution_cooling(T_cold_eq, 
-                                                             T_hot, 
-                                                             self.satellite_mass, 
-                                                             self.satellite_cp, 
-                                                             local_coatings_df.loc[i, 'Emissivity'], 
-                                                             A_S[index], 
-                                                             self.eclipse_time)  # K
-
-                local_coatings_df.loc[i, f'Hot Case {u}U'] = T_hot  # K
-                local_coatings_df.loc[i, f'Cold Case {u}U'] = T_cold  # K
-                local_coatings_df.loc[i, f'Hot Margin {u}U'] = self.T_max_with_margin_in_K - T_hot  # K
-                local_coatings_df.loc[i, f'Cold Margin {u}U'] = T_cold - self.T_min_with_margin_in_K  # K
-
-        # print coatings_df only the margins
-        print(local_coatings_df[['Coating' , 'Hot Margin 1.0U', 'Cold Margin 1.0U', 'Hot Margin 1.5U', 'Cold Margin 1.5U', 'Hot Margin 2.0U', 'Cold Margin 2.0U', 'Hot Margin 3.0U',  'Cold Margin 3.0U']])
-        print(float(self.form_factor))
-        selected_coating = th.select_coating(float(self.form_factor), local_coatings_df)
+        """
+        Selects the coating for the current form factor and orbit.
+        The allowed temperature band is mapped to a region in (absorptivity, emissivity) space, which is looked up
+        in the coating index, so only coatings close to that region are evaluated.
+        """
+        selected_coating = th.select_coating_indexed(self.coating_index,
+                                                     float(self.form_factor),
+                                                     self.T_min_with_margin_in_K,
+                                                     self.T_max_with_margin_in_K,
+                                                     self.Q_internal,
+                                                     self._periapsis,
+                                                     self._apoapsis,
+                                                     self.satellite_mass,
+                                                     self.satellite_cp,
+                                                     self.eclipse_time)
         return selected_coating
 
+    @Attribute
+    def face_coatings(self):
+        """
+        Per-face coating assignment: solar cell faces from the NASA table, all other faces from the SMAD table,
+        meeting the hot margin with the least heater power for the cold margin.
+
+        Returns:
+            dict: 'Faces' dataframe with the coating per face, hot and cold case temperatures, margins and heater power.
+        """
+        faces = th.cubesat_faces(float(self.form_factor), self.solar_cell_faces)
+        return th.optimize_face_coatings(self.coating_tables,
+                                         faces,
+                                         self.T_min_with_margin_in_K,
+                                         self.T_max_with_margin_in_K,
+                                         self.Q_internal,
+                                         self._periapsis,
+                                         self._apoapsis,
+                                         self.satellite_mass,
+                                         self.satellite_cp,
+                                         self.eclipse_time)
+
     @Attribute
     def T_hot_case(self):
         return self.selected_coating['Hot Case']
@@ -520,12 +551,9 @@ class Thermal(ac.Subsystem):
 
     @Attribute
     def final_heater_values(self):
-        # maximum cross sectional area for given form factor
-        A_C_max = np.sqrt(2) * self.form_factor * 0.01 # m^2
-        # minimum cross sectional area for all form factors
-        A_C_min = 0.01 # m^2
-        # cubesat surface area for given form factor
-        A_S = (2+4*self.form_factor) * 0.01 # m^2
+        # maximum and minimum cross sectional area and surface area of the structure envelope
+        areas = th.cubesat_areas(self.form_factor)
+        A_C_max, A_C_min, A_S = areas['Max Cross Section'], areas['Min Cross Section'], areas['Surface'] # m^2
 
         T = self.selected_coating['Cold Case']
         P = 0
@@ -1,12 +1,14 @@
 import numpy as np
-import scipy as sp
 import pandas as pd
-from scipy.optimize import fsolve
 import math    
 from cubesat_configurator.constants import Thermal as T
+from cubesat_configurator import layout_helpers as lay
+from cubesat_configurator.lazy import lazy_import
 
 pd.options.mode.copy_on_write = True # to avoid SettingWithCopyWarning
 
+optimize = lazy_import('scipy.optimize')
+
 
 boltzmann_constant = T.boltzmann_constant
 earth_avg_temp = T.earth_avg_temp
@@ -39,7 +41,7 @@ def exact_transient_solution_cooling(T_eq:float, T_0:float, m:float, c_p:float,
 
     tau = calc_tau(T_eq, m, c_p, epsilon, boltzmann_constant, A_Surface)  # calculate time constant
     C = calc_C(T_0, T_eq)  # calculate integration constant from initial conditions
-    T = fsolve(f, T_0, args=(T_eq, C, t_eclipse, tau))
+    T = optimize.fsolve(f, T_0, args=(T_eq, C, t_eclipse, tau))
     return T[0]
 
 def first_order_transient_solution(Q_in, T_0, m, c_p, epsilon, A_Surface, t_eclipse, n_steps):
@@ -134,3 +136,582 @@ def select_coating(form_factor:float, coatings_df:pd.DataFrame) -> dict:
     return selected_coating
 
 
+
+
+def hot_case_absorbed_flux(periapsis, max_cross_section):
+    """
+    Absorbed heat per unit absorptivity in the hot case (sun, Earth IR and albedo) in W.
+    Same terms as calculate_equilibrium_hot_temp, so Q_in_hot = absorptivity * hot_case_absorbed_flux + Q_internal.
+    """
+    Q_S = S * max_cross_section
+    Q_IR = e_Earth * boltzmann_constant * earth_avg_temp**4 * ( earth_radius**2 ) / ( periapsis**2 ) * max_cross_section
+    Q_A = earth_albedo * S * ( earth_radius**2 ) / (2 * periapsis**2 ) * max_cross_section
+    return Q_S + Q_IR + Q_A
+
+
+def cold_case_absorbed_flux(apoapsis, min_cross_section):
+    """
+    Absorbed heat per unit absorptivity in the cold case (Earth IR only) in W.
+    """
+    return e_Earth * boltzmann_constant * earth_avg_temp**4 * ( earth_radius**2 ) / ( apoapsis**2 ) * min_cross_section
+
+
+def _cooling_lhs(y):
+    """
+    2 * (arcoth(x) + arctan(x)) written in y = ln(x - 1), which has no singularity at x = 1.
+    """
+    return np.log(2 + np.exp(y)) - y + 2 * np.arctan(1 + np.exp(y))
+
+
+def transient_solution_cooling(T_eq, T_0, m, c_p, epsilon, A_Surface, t_eclipse, tol=1e-12, max_iter=100):
+    """
+    Array version of exact_transient_solution_cooling.
+    The left hand side 2 * (arcoth(x) + arctan(x)) is strictly decreasing for x > 1 and close to linear in
+    y = ln(x - 1), so the root x = T / T_eq is found with Newton steps in y, falling back to bisection
+    whenever a step leaves the bracket.
+    """
+    T_eq = np.asarray(T_eq, dtype=float)
+    x_0 = np.asarray(T_0, dtype=float) / T_eq
+    tau = calc_tau(T_eq, m, c_p, epsilon, boltzmann_constant, A_Surface)
+    y_hi = np.log(x_0 - 1)
+    target = _cooling_lhs(y_hi) + t_eclipse / tau
+
+    y_lo = np.full_like(y_hi, -50.0)  # x - 1 = 2e-22, below double precision of T
+    y = y_hi.copy()
+    for _ in range(max_iter):
+        h = _cooling_lhs(y) - target
+        # h decreases with y: if it is still positive, the root lies right of y
+        right = h > 0
+        y_lo = np.where(right, y, y_lo)
+        y_hi = np.where(right, y_hi, y)
+        x = 1 + np.exp(y)
+        y_new = y + h * (x + 1) * (x**2 + 1) / 4
+        outside = ~((y_new > y_lo) & (y_new < y_hi))
+        y_new = np.where(outside, 0.5 * (y_lo + y_hi), y_new)
+        converged = np.all(np.abs(y_new - y) < tol)
+        y = y_new
+        if converged:
+            break
+    return (1 + np.exp(y)) * T_eq
+
+
+def coating_temperatures(absorptivity, emissivity, Q_internal, periapsis, apoapsis, max_cross_section, min_cross_section, surface_area, m, c_p, t_eclipse, P_heaters=0):
+    """
+    Hot case and cold case (end of eclipse) temperatures for arrays of coatings.
+
+    Returns:
+    (T_hot, T_cold) in K, with the same shape as absorptivity and emissivity.
+    """
+    absorptivity = np.asarray(absorptivity, dtype=float)
+    emissivity = np.asarray(emissivity, dtype=float)
+    T_hot = calculate_equilibrium_hot_temp(0, Q_internal, absorptivity, emissivity, periapsis, apoapsis, max_cross_section, min_cross_section, surface_area)
+    T_cold_eq = calculate_equilibrium_cold_temp(P_heaters, Q_internal, absorptivity, emissivity, periapsis, apoapsis, max_cross_section, min_cross_section, surface_area)
+    T_cold = transient_solution_cooling(T_cold_eq, T_hot, m, c_p, emissivity, surface_area, t_eclipse)
+    return T_hot, T_cold
+
+
+class CoatingIndex:
+    """
+    Static 2D k-d tree over the (Absorptivity, Emissivity) plane of a coating table.
+    Nodes store their bounding box, so rectangle queries skip whole subtrees outside the
+    rectangle and take whole subtrees inside it without looking at the points.
+    """
+    def __init__(self, coatings_df:pd.DataFrame, leaf_size:int=32):
+        self.coatings_df = coatings_df.reset_index(drop=True)
+        self.points = self.coatings_df[['Absorptivity', 'Emissivity']].to_numpy(dtype=float)
+        self.leaf_size = leaf_size
+        # the tree only reorders this permutation, each node owns the slice order[start:end]
+        self.order = np.arange(len(self.points))
+        # node: [start, end, lo (2,), hi (2,), left, right]
+        self.nodes = []
+        if len(self.points) > 0:
+            self._build(0, len(self.points))
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def bounds(self):
+        """Bounding box of all coatings as (lo, hi) arrays in (Absorptivity, Emissivity)."""
+        return self.nodes[0][2], self.nodes[0][3]
+
+    def _build(self, start, end):
+        segment = self.order[start:end]
+        pts = self.points[segment]
+        node = [start, end, pts.min(axis=0), pts.max(axis=0), -1, -1]
+        node_id = len(self.nodes)
+        self.nodes.append(node)
+        if end - start > self.leaf_size:
+            # split along the axis with the largest spread
+            axis = int(np.argmax(node[3] - node[2]))
+            mid = (end - start) // 2
+            self.order[start:end] = segment[np.argpartition(pts[:, axis], mid)]
+            node[4] = self._build(start, start + mid)
+            node[5] = self._build(start + mid, end)
+        return node_id
+
+    def query_rectangle(self, lo, hi) -> np.ndarray:
+        """
+        Row indices of all coatings with lo <= (Absorptivity, Emissivity) <= hi.
+        """
+        lo = np.asarray(lo, dtype=float)
+        hi = np.asarray(hi, dtype=float)
+        if not self.nodes or np.any(lo > hi):
+            return np.empty(0, dtype=int)
+        found = []
+        stack = [0]
+        while stack:
+            start, end, node_lo, node_hi, left, right = self.nodes[stack.pop()]
+            if np.any(node_hi < lo) or np.any(node_lo > hi):
+                continue
+            if np.all(node_lo >= lo) and np.all(node_hi <= hi):
+                found.append(self.order[start:end])
+            elif left < 0:
+                segment = self.order[start:end]
+                pts = self.points[segment]
+                found.append(segment[np.all((pts >= lo) & (pts <= hi), axis=1)])
+            else:
+                stack.extend((left, right))
+        if not found:
+            return np.empty(0, dtype=int)
+        return np.concatenate(found)
+
+
+def build_coating_index(coatings_dfs:dict, leaf_size:int=32) -> CoatingIndex:
+    """
+    Merge coating tables into one frame with a 'Source' column and index it.
+
+    Parameters:
+    coatings_dfs: A dict of source name to coating dataframe (columns Coating, Absorptivity, Emissivity).
+    """
+    frames = [df.assign(Source=source) for source, df in coatings_dfs.items()]
+    return CoatingIndex(pd.concat(frames, ignore_index=True), leaf_size=leaf_size)
+
+
+def cubesat_areas(form_factor:float) -> dict:
+    """
+    Areas of the structure envelope in m^2, for single stacks and for buses with several stacks:
+    - 'Max Cross Section': hot case, the sun, Earth IR and albedo fall on +X and +Y at 45 deg
+    - 'Min Cross Section': cold case, Earth IR falls on the nadir face -Z
+    - 'Surface': all six faces radiate
+    - 'Side Panel', 'End Panel': largest face along the stack and face at its ends
+    """
+    (x, y, z), _ = lay.bus_envelope(form_factor)
+    x, y, z = x / 1000, y / 1000, z / 1000 # m
+    return {'Max Cross Section': (y*z + x*z) / np.sqrt(2),
+            'Min Cross Section': x*y,
+            'Surface': 2 * (x*y + y*z + x*z),
+            'Side Panel': max(x, y) * z,
+            'End Panel': x*y}
+
+
+def select_coating_indexed(index:CoatingIndex, form_factor:float, T_min:float, T_max:float, Q_internal:float, periapsis:float, apoapsis:float, m:float, c_p:float, t_eclipse:float, n_strips:int=64) -> dict:
+    """
+    Select a coating without evaluating every row of the coating table.
+
+    The temperature band [T_min, T_max] is turned into a feasible region in (absorptivity, emissivity) space:
+    - hot case:  T_hot <= T_max  <=>  emissivity >= (absorptivity * q_hot + Q_internal) / (sigma * A_S * T_max^4)
+    - cold case: T_cold >= T_min <=>  emissivity <= eps_cold(absorptivity), T_cold decreases with emissivity
+    Both bounds increase with absorptivity, so the band is covered by n_strips rectangles in absorptivity,
+    which are looked up in the k-d tree. Only the returned candidates are evaluated exactly and handed to
+    select_coating, so the selection rule is unchanged.
+
+    Parameters:
+    index: CoatingIndex over the coating tables.
+    form_factor: The form factor of the satellite.
+    T_min, T_max: Allowed temperature band including margins in K.
+    """
+    areas = cubesat_areas(form_factor)
+    A_C_max, A_C_min, A_S = areas['Max Cross Section'], areas['Min Cross Section'], areas['Surface'] # m^2
+
+    def evaluate(rows):
+        candidates = index.coatings_df.loc[rows].copy()
+        T_hot, T_cold = coating_temperatures(candidates['Absorptivity'], candidates['Emissivity'], Q_internal, periapsis, apoapsis,
+                                             A_C_max, A_C_min, A_S, m, c_p, t_eclipse)
+        candidates[f'Hot Case {form_factor}U'] = T_hot
+        candidates[f'Cold Case {form_factor}U'] = T_cold
+        candidates[f'Hot Margin {form_factor}U'] = T_max - T_hot
+        candidates[f'Cold Margin {form_factor}U'] = T_cold - T_min
+        return candidates
+
+    assert len(index) > 0, "No coatings available."
+    (a_lo, e_lo), (a_hi, e_hi) = index.bounds
+    alpha = np.linspace(a_lo, a_hi, n_strips + 1)
+
+    # hot boundary, closed form
+    eps_hot = (alpha * hot_case_absorbed_flux(periapsis, A_C_max) + Q_internal) / (boltzmann_constant * A_S * T_max**4)
+
+    # cold boundary, bisection on emissivity for every grid point at once
+    lo = np.full_like(alpha, e_lo)
+    hi = np.full_like(alpha, e_hi)
+    _, T_cold_lo = coating_temperatures(alpha, lo, Q_internal, periapsis, apoapsis, A_C_max, A_C_min, A_S, m, c_p, t_eclipse)
+    _, T_cold_hi = coating_temperatures(alpha, hi, Q_internal, periapsis, apoapsis, A_C_max, A_C_min, A_S, m, c_p, t_eclipse)
+    for _ in range(40):
+        mid = 0.5 * (lo + hi)
+        _, T_cold = coating_temperatures(alpha, mid, Q_internal, periapsis, apoapsis, A_C_max, A_C_min, A_S, m, c_p, t_eclipse)
+        warm = T_cold >= T_min
+        lo = np.where(warm, mid, lo)
+        hi = np.where(warm, hi, mid)
+    # hi is always just above the boundary; clip where the whole emissivity range is warm or cold enough
+    eps_cold = np.where(T_cold_hi >= T_min, e_hi, np.where(T_cold_lo < T_min, -np.inf, hi))
+
+    # strip [alpha_i, alpha_i+1] holds the band between eps_hot(alpha_i) and eps_cold(alpha_i+1)
+    rows = [index.query_rectangle((alpha[i], eps_hot[i]), (alpha[i+1], eps_cold[i+1])) for i in range(n_strips)]
+    candidates = evaluate(np.unique(np.concatenate(rows)))
+    feasible = candidates[(candidates[f'Hot Margin {form_factor}U'] >= 0) & (candidates[f'Cold Margin {form_factor}U'] >= 0)]
+
+    if feasible.empty:
+        # no coating meets both margins, select_coating falls back to the hot feasible coating with the highest cold margin
+        rows = [index.query_rectangle((alpha[i], eps_hot[i]), (alpha[i+1], e_hi)) for i in range(n_strips)]
+        candidates = evaluate(np.unique(np.concatenate(rows)))
+
+    return select_coating(form_factor, candidates)
+
+
+def cubesat_faces(form_factor:float, solar_cell_faces) -> list:
+    """
+    Face model of the CubeSat for per-face coatings, consistent with the single coating model:
+    - hot case: the sun, Earth IR and albedo fall on +X and +Y at 45 deg, together A_C_max of cubesat_areas
+    - cold case: Earth IR falls on the nadir face -Z, A_C_min of cubesat_areas
+    - all six faces radiate
+    Face areas follow from the structure envelope, so buses with several stacks have different X and Y faces.
+    Faces in solar_cell_faces take their coating from the NASA solar cell table, all others from the SMAD table.
+    """
+    (x, y, z), _ = lay.bus_envelope(form_factor)
+    face_areas = {'X': y*z / 1e6, 'Y': x*z / 1e6, 'Z': x*y / 1e6} # m^2
+    faces = []
+    for name in ('+X', '-X', '+Y', '-Y', '+Z', '-Z'):
+        area = face_areas[name[1]]
+        faces.append({
+            'Face': name,
+            'Area': area,
+            'Hot Projection': area / np.sqrt(2) if name in ('+X', '+Y') else 0,
+            'Cold Projection': area if name == '-Z' else 0,
+            'Source': 'NASA' if name in solar_cell_faces else 'SMAD'})
+    return faces
+
+
+def _face_cold_temp(H, K, E, Q_internal, P_heaters, m, c_p, t_eclipse):
+    """
+    Cold case temperature from the face sums H (hot absorbed), K (cold absorbed) and E (sum of emissivity * area).
+    If the heaters lift the cold equilibrium above the hot case, the satellite does not cool down during eclipse.
+    """
+    T_hot = ((H + Q_internal) / (boltzmann_constant * E))**(1/4)
+    T_eq = ((K + Q_internal + P_heaters) / (boltzmann_constant * E))**(1/4)
+    T_hot, T_eq, E = np.broadcast_arrays(T_hot, T_eq, E)
+    cooling = T_eq < T_hot
+    T_cold = np.array(T_hot, dtype=float, copy=True)
+    if np.any(cooling):
+        T_cold[cooling] = transient_solution_cooling(T_eq[cooling], T_hot[cooling], m, c_p, E[cooling], 1, t_eclipse)
+    return T_cold
+
+
+def _face_stays_above(T_min, H, K, E, Q_internal, P_heaters, m, c_p, t_eclipse):
+    """
+    True where the cold case stays at or above T_min, without solving for the cold case temperature.
+    With x = T / T_eq, T_end >= T_min  <=>  lhs(T_min / T_eq) >= lhs(T_hot / T_eq) + t_eclipse / tau, as lhs decreases with x.
+    """
+    T_hot = ((H + Q_internal) / (boltzmann_constant * E))**(1/4)
+    T_eq = ((K + Q_internal + P_heaters) / (boltzmann_constant * E))**(1/4)
+    T_min, T_hot, T_eq, E = np.broadcast_arrays(T_min, T_hot, T_eq, E)
+    above = T_eq >= T_min
+    check = (T_eq < T_min) & (T_hot >= T_min)
+    if np.any(check):
+        tau = calc_tau(T_eq[check], m, c_p, E[check], boltzmann_constant, 1)
+        above[check] = _cooling_lhs(np.log(T_min[check] / T_eq[check] - 1)) >= _cooling_lhs(np.log(T_hot[check] / T_eq[check] - 1)) + t_eclipse / tau
+    return above & (T_hot >= T_min)
+
+
+def _face_heater_power(H, K, E, T_min, Q_internal, m, c_p, t_eclipse):
+    """
+    Heater power in W (rounded up to 1 mW) to keep the cold case at T_min, nan where no heater power can.
+    Bisection on the cold equilibrium temperature between the unheated one and T_min, the heater power follows from it.
+    """
+    P = np.zeros_like(H)
+    T_hot = ((H + Q_internal) / (boltzmann_constant * E))**(1/4)
+    heated = ~_face_stays_above(T_min, H, K, E, Q_internal, 0, m, c_p, t_eclipse)
+    P[heated & (T_hot < T_min)] = np.nan
+    heated &= T_hot >= T_min
+    if np.any(heated):
+        E_h = E[heated]
+        lo = ((K[heated] + Q_internal) / (boltzmann_constant * E_h))**(1/4)
+        hi = np.full_like(lo, T_min)
+        for _ in range(60):
+            mid = 0.5 * (lo + hi)
+            warm = _face_stays_above(T_min, H[heated], K[heated], E_h, Q_internal, boltzmann_constant * E_h * mid**4 - K[heated] - Q_internal, m, c_p, t_eclipse)
+            lo = np.where(warm, lo, mid)
+            hi = np.where(warm, mid, hi)
+        P[heated] = np.ceil((boltzmann_constant * E_h * hi**4 - K[heated] - Q_internal) * 1000 - 1e-9) / 1000
+    return P
+
+
+DARK_SUMSET_LIMIT = 1 << 20  # emissive area sums of the dark faces that are precomputed and sorted
+
+
+def _multisets(n, k) -> np.ndarray:
+    """
+    All multisets of k out of n options as rows of non-decreasing indices, in lexicographic order.
+    """
+    rows = np.arange(n)[:, None]
+    for _ in range(k - 1):
+        last = rows[:, -1]
+        counts = n - last
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = np.column_stack((np.repeat(rows, counts, axis=0), np.repeat(last, counts) + offsets))
+    return rows
+
+
+def _first_index(lo, hi, passes):
+    """
+    Smallest index in [lo, hi) where passes holds, element wise, for predicates that hold from some index on; hi where none does.
+    passes(elements, indices) is evaluated for the elements still searching only.
+    """
+    lo, hi = np.array(lo), np.array(hi)
+    active = np.flatnonzero(lo < hi)
+    while len(active):
+        mid = (lo[active] + hi[active]) // 2
+        found = passes(active, mid)
+        hi[active[found]] = mid[found]
+        lo[active[~found]] = mid[~found] + 1
+        active = active[lo[active] < hi[active]]
+    return lo
+
+
+def _face_levels(coatings_dfs, faces, q_hot, q_cold, Q_internal, c_hot, dark_limit=DARK_SUMSET_LIMIT):
+    """
+    Search levels of the per-face optimizer, generated per face instead of per combination.
+
+    Every face that absorbs heat is a level of its own with one option per coating. Interchangeable faces (same exposure,
+    area and coating table) form a class and share their options, the search only takes non-decreasing options along a
+    class, so every multiset of coatings is visited once. Dark faces only add emissive area: their sums are precomputed
+    and sorted as the last level, as long as there are at most dark_limit of them, the other dark classes stay face levels.
+    Coatings that exceed the hot limit H + Q <= c_hot * E on a face even with the coolest choice on all other faces
+    are dropped before anything is combined.
+
+    Returns:
+    tuple: (face levels, dark sum level or None). A face level holds its 'faces', the coating 'rows' per option and face,
+    the contributions h (hot absorbed), k (cold absorbed), e (emissive area) and its 'class'. The dark level holds the
+    sorted sums 'e' with their 'rows'.
+    """
+    classes = {}
+    for face in faces:
+        key = (face['Hot Projection'], face['Cold Projection'], face['Area'], face['Source'])
+        classes.setdefault(key, []).append(face['Face'])
+
+    options, dark = [], []
+    for (hot, cold, area, source), names in classes.items():
+        df = coatings_dfs[source]
+        h = df['Absorptivity'].to_numpy(dtype=float) * q_hot * hot
+        k = df['Absorptivity'].to_numpy(dtype=float) * q_cold * cold
+        e = df['Emissivity'].to_numpy(dtype=float) * area
+        # options with equal contributions are interchangeable, keep the first one
+        _, keep = np.unique(np.round(np.column_stack((h, k, e)), 12), axis=0, return_index=True)
+        keep = np.sort(keep)
+        option = {'names': names, 'source': source, 'rows': keep, 'h': h[keep], 'k': k[keep], 'e': e[keep]}
+        (dark if hot == 0 and cold == 0 else options).append(option)
+
+    # smallest sorted dark sums first, as long as they stay within the limit
+    dark.sort(key=lambda option: math.comb(len(option['e']) + len(option['names']) - 1, len(option['names'])))
+    summed, size = [], 1
+    for option in dark:
+        size *= math.comb(len(option['e']) + len(option['names']) - 1, len(option['names']))
+        if size > dark_limit:
+            break
+        summed.append(option)
+    options += dark[len(summed):]
+
+    # coolest contribution h - c_hot * e of every face, the hot limit has to hold with all other faces at theirs
+    coolest = {id(option): len(option['names']) * np.min(option['h'] - c_hot * option['e']) for option in options}
+    dark_sums = None
+    if summed:
+        e, rows = np.zeros(1), np.zeros((1, 0), dtype=np.int32)
+        for option in summed:
+            multisets = _multisets(len(option['e']), len(option['names']))
+            i, j = [index.ravel() for index in np.meshgrid(np.arange(len(e)), np.arange(len(multisets)), indexing='ij')]
+            e = e[i] + option['e'][multisets].sum(axis=1)[j]
+            rows = np.hstack((rows[i], option['rows'][multisets][j].astype(np.int32)))
+        e, keep = np.unique(np.round(e, 12), return_index=True)
+        dark_sums = {'faces': [(name, option['source']) for option in summed for name in option['names']], 'e': e, 'rows': rows[keep]}
+        coolest['dark'] = -c_hot * e[-1]
+    hot_limit = -Q_internal - sum(coolest.values())
+
+    for option in options:
+        slack = hot_limit + coolest[id(option)] / len(option['names'])
+        keep = option['h'] - c_hot * option['e'] <= slack
+        option.update(rows=option['rows'][keep], h=option['h'][keep], k=option['k'][keep], e=option['e'][keep])
+    if dark_sums is not None:
+        keep = -c_hot * dark_sums['e'] <= hot_limit + coolest['dark']
+        dark_sums.update(e=dark_sums['e'][keep], rows=dark_sums['rows'][keep])
+
+    # faces that absorb the most heat first, the dark face levels last
+    options.sort(key=lambda option: (option['h'].max(initial=0) == 0 and option['k'].max(initial=0) == 0,
+                                     -option['h'].max(initial=0), -option['k'].max(initial=0)))
+    levels = []
+    for number, option in enumerate(options):
+        for name in option['names']:
+            levels.append({'faces': [(name, option['source'])], 'rows': option['rows'][:, None], 'class': number,
+                           'h': option['h'], 'k': option['k'], 'e': option['e']})
+    return levels, dark_sums
+
+
+def optimize_face_coatings(coatings_dfs:dict, faces:list, T_min:float, T_max:float, Q_internal:float, periapsis:float, apoapsis:float, m:float, c_p:float, t_eclipse:float, dark_limit:int=DARK_SUMSET_LIMIT) -> dict:
+    """
+    Assign one coating per face, so that the hot case stays below T_max and the cold case needs the least heater power.
+    Ties in heater power are broken by the largest smallest margin.
+
+    Every coating contributes separately to three face sums: hot absorbed heat H, cold absorbed heat K and emissive area E.
+    These contributions are precomputed per face, and a depth first branch and bound over the faces bounds every open
+    face by its best and worst contribution, since the temperatures are monotonic in the three sums. The hot limit
+    H + Q <= sigma * T^4 * E is linear in the contributions, so it is bounded per face as well.
+    The dark faces only add to E and come last as one sorted array of sums: the heater power does not decrease with E,
+    so every leaf takes the smallest sum that meets the hot limit and finds the best margin by bisection, without
+    looking at the other sums.
+
+    Parameters:
+    coatings_dfs: A dict of table name to coating dataframe, with the names used in the 'Source' of the faces.
+    faces: Face model as returned by cubesat_faces.
+    T_min, T_max: Allowed temperature band including margins in K.
+    dark_limit: Largest number of dark faces whose emissive area sums are precomputed, more stay face levels.
+
+    Returns:
+    A dict with a 'Faces' dataframe (one row per face) and the hot case, cold case and heater values of the assignment.
+    """
+    # hot limit H + Q <= sigma * T_max^4 * E, linear in the contributions
+    c_hot = boltzmann_constant * T_max**4
+    levels, dark = _face_levels(coatings_dfs, faces, hot_case_absorbed_flux(periapsis, 1.0), cold_case_absorbed_flux(apoapsis, 1.0),
+                                Q_internal, c_hot, dark_limit)
+    assert all(len(level['e']) for level in levels) and (dark is None or len(dark['e'])), \
+        "No per-face coating assignment meets the hot case."
+    if not levels:
+        levels = [{'faces': [], 'rows': np.zeros((1, 0), dtype=int), 'class': None, 'h': np.zeros(1), 'k': np.zeros(1), 'e': np.zeros(1)}]
+    n_levels = len(levels)
+
+    # separable bounds of all levels from d onwards, the dark sums included
+    def rest(reduce, values, dark_value=0.0):
+        sums = np.zeros(n_levels + 1)
+        sums[n_levels] = dark_value if dark is not None else 0.0
+        for d in range(n_levels - 1, -1, -1):
+            sums[d] = sums[d+1] + reduce(values(levels[d]))
+        return sums
+    H_max, H_min, K_max = rest(np.max, lambda l: l['h']), rest(np.min, lambda l: l['h']), rest(np.max, lambda l: l['k'])
+    E_max, E_min = rest(np.max, lambda l: l['e'], dark and dark['e'][-1]), rest(np.min, lambda l: l['e'], dark and dark['e'][0])
+    hot_rest = rest(np.min, lambda l: l['h'] - c_hot * l['e'], dark and -c_hot * dark['e'][-1])
+
+    best = {'P': np.inf, 'margin': -np.inf, 'choice': None}
+    nodes = [0]
+
+    def margins(H, K, E, P=None):
+        # hot and cold margin, the hot one only without the heater power
+        hot = T_max - ((H + Q_internal) / (boltzmann_constant * E))**(1/4)
+        if P is None:
+            return hot, None
+        return hot, _face_cold_temp(H, K, E, Q_internal, P, m, c_p, t_eclipse) - T_min
+
+    def leaf(H_c, K_c, E_c):
+        """Index of the best option and its heater power and margin."""
+        P = _face_heater_power(H_c, K_c, E_c, T_min, Q_internal, m, c_p, t_eclipse)
+        hot, cold = margins(H_c, K_c, E_c, np.nan_to_num(P))
+        margin = np.minimum(hot, cold)
+        i = np.lexsort((-margin, np.nan_to_num(P, nan=np.inf)))[0]
+        return i, None, P[i], margin[i]
+
+    def dark_leaf(H_c, K_c, E_c):
+        """
+        Index of the best option and of its dark sum, with the heater power and margin. The heater power is least at the
+        smallest dark sum that meets the hot limit; among the sums that need the same power the hot margin increases and
+        the cold margin decreases with E, so the best margin lies next to their crossing.
+        """
+        D = dark['e']
+        start = _first_index(np.zeros(len(E_c), dtype=int), np.full(len(E_c), len(D)),
+                             lambda a, j: H_c[a] + Q_internal - c_hot * (E_c[a] + D[j]) <= 0)
+        fits = np.flatnonzero(start < len(D))
+        if len(fits) == 0:
+            return 0, None, np.nan, -np.inf
+        P = _face_heater_power(H_c[fits], K_c[fits], E_c[fits] + D[start[fits]], T_min, Q_internal, m, c_p, t_eclipse)
+        if np.all(np.isnan(P)) or np.nanmin(P) > best['P']:
+            return 0, None, np.nan, -np.inf
+        least = np.flatnonzero(P == np.nanmin(P))
+        a, P = fits[least], P[least]
+        H_a, K_a, E_a, start = H_c[a], K_c[a], E_c[a], start[a]
+        end = _first_index(start, np.full(len(a), len(D)),
+                           lambda b, j: ~_face_stays_above(T_min, H_a[b], K_a[b], E_a[b] + D[j], Q_internal, P[b], m, c_p, t_eclipse))
+        # first sum whose cold margin is below its hot margin, without solving for the cold case
+        cross = _first_index(start, end - 1, lambda b, j: ~_face_stays_above(T_min + margins(H_a[b], K_a[b], E_a[b] + D[j])[0], H_a[b], K_a[b],
+                                                                             E_a[b] + D[j], Q_internal, P[b], m, c_p, t_eclipse))
+        below = np.maximum(cross - 1, start)
+        margin_below = np.minimum(*margins(H_a, K_a, E_a + D[below], P))
+        margin_cross = np.minimum(*margins(H_a, K_a, E_a + D[cross], P))
+        j, margin = np.where(margin_below >= margin_cross, below, cross), np.maximum(margin_below, margin_cross)
+        i = int(np.argmax(margin))
+        return a[i], j[i], P[i], margin[i]
+
+    def visit(d, choice, H, K, E):
+        nodes[0] += 1
+        level = levels[d]
+        # options of a class are taken in non-decreasing order, so every multiset of coatings is visited once
+        first = choice[-1] if d > 0 and level['class'] is not None and level['class'] == levels[d-1]['class'] else 0
+        H_d, K_d, E_d = H + level['h'][first:], K + level['k'][first:], E + level['e'][first:]
+        ok = H_d - c_hot * E_d + hot_rest[d+1] + Q_internal <= 0
+
+        H_lo, H_hi, K_hi = H_d + H_min[d+1], H_d + H_max[d+1], K_d + K_max[d+1]
+        E_lo, E_hi = E_d + E_min[d+1], E_d + E_max[d+1]
+        if best['choice'] is not None and np.any(ok):
+            # the cold case is warmest for the least heat loss the hot limit allows
+            E_hot = np.maximum(E_lo, (H_lo + Q_internal) / c_hot)
+            ok &= _face_stays_above(T_min, H_hi, K_hi, E_hot, Q_internal, best['P'], m, c_p, t_eclipse)
+            if best['P'] >= 0.001:
+                tie = ~_face_stays_above(T_min, H_hi, K_hi, E_hot, Q_internal, best['P'] - 0.001, m, c_p, t_eclipse)
+            else:
+                tie = np.ones_like(ok)
+            # completions that need exactly the incumbent heater power have to beat its margin on both sides
+            E_margin = np.maximum(E_lo, (H_lo + Q_internal) / (boltzmann_constant * (T_max - best['margin'])**4))
+            better = (E_margin <= E_hi) & _face_stays_above(T_min + best['margin'], H_hi, K_hi, E_margin, Q_internal, best['P'], m, c_p, t_eclipse)
+            ok &= ~tie | better
+        candidates = np.flatnonzero(ok)
+        if len(candidates) == 0:
+            return
+
+        if d == n_levels - 1:
+            i, j, P, margin = (dark_leaf if dark is not None else leaf)(H_d[candidates], K_d[candidates], E_d[candidates])
+            if not np.isnan(P) and (P, -margin) < (best['P'], -best['margin']):
+                best.update(P=P, margin=margin, choice=choice + [first + candidates[i]] + ([] if j is None else [j]))
+            return
+
+        # warmest children first, to find a good incumbent early
+        warmth = (H_hi[candidates] + K_hi[candidates]) / E_lo[candidates]
+        for i in candidates[np.argsort(-warmth, kind='stable')]:
+            visit(d + 1, choice + [first + i], H_d[i], K_d[i], E_d[i])
+
+    visit(0, [], 0.0, 0.0, 0.0)
+    assert best['choice'] is not None, "No per-face coating assignment meets the hot case."
+
+    rows = {}
+    H = K = E = 0.0
+    for level, i in zip(levels, best['choice']):
+        for (name, source), row in zip(level['faces'], level['rows'][i]):
+            rows[name] = (source, row)
+        H, K, E = H + level['h'][i], K + level['k'][i], E + level['e'][i]
+    if dark is not None:
+        j = best['choice'][-1]
+        for (name, source), row in zip(dark['faces'], dark['rows'][j]):
+            rows[name] = (source, row)
+        E = E + dark['e'][j]
+    for name, (source, row) in rows.items():
+        coating = coatings_dfs[source].iloc[row]
+        rows[name] = {'Face': name, 'Source': source, 'Coating': coating['Coating'],
+                      'Absorptivity': coating['Absorptivity'], 'Emissivity': coating['Emissivity']}
+    H, K, E = np.array([H]), np.array([K]), np.array([E])
+    T_hot = ((H + Q_internal) / (boltzmann_constant * E))**(1/4)
+    T_cold = _face_cold_temp(H, K, E, Q_internal, 0, m, c_p, t_eclipse)
+    T_cold_heater = _face_cold_temp(H, K, E, Q_internal, best['P'], m, c_p, t_eclipse)
+
+    return {
+        'Faces': pd.DataFrame([rows[face['Face']] for face in faces]),
+        'Hot Case': T_hot[0],
+        'Cold Case': T_cold[0],
+        'Hot Margin': T_max - T_hot[0],
+        'Cold Margin': T_cold[0] - T_min,
+        'Heater Power': best['P'],
+        'Cold Case with Heater': T_cold_heater[0],
+        'Cold Margin with Heater': T_cold_heater[0] - T_min,
+        'Nodes': nodes[0]}
@@ -0,0 +1,54 @@
+import functools
+import os
+import time
+
+import pytest
+
+from cubesat_configurator import attribute_profiler as ap
+
+
+class attribute(functools.cached_property):
+    "A descriptor in place of @Attribute, evaluated once per object"
+
+
+class Thermal:
+    def __init__(self, parent):
+        self.parent = parent
+
+    @attribute
+    def selected_coating(self):
+        time.sleep(0.05)
+        return 'white paint'
+
+
+class CubeSat:
+    parent = None
+
+    def __init__(self):
+        self.thermal = Thermal(self)
+
+    @attribute
+    def total_mass(self):
+        time.sleep(0.01)
+        return self.helper() + len(self.thermal.selected_coating)
+
+    def helper(self):
+        # a plain method counts towards the attribute that calls it
+        time.sleep(0.01)
+        return 1
+
+
+def test_inclusive_and_exclusive_times(tmp_path):
+    cubesat = CubeSat()
+    with ap.AttributeProfiler(package_dir=os.path.dirname(__file__)) as profiler:
+        cubesat.total_mass
+        cubesat.total_mass
+    summary = profiler.summary().set_index('Attribute')
+    assert list(summary.index) == ['CubeSat.Thermal.selected_coating', 'CubeSat.total_mass']
+    assert list(summary['Calls']) == [1, 1]
+    outer, inner = summary.loc['CubeSat.total_mass'], summary.loc['CubeSat.Thermal.selected_coating']
+    assert inner['Exclusive_s'] == pytest.approx(inner['Inclusive_s'])
+    assert outer['Inclusive_s'] == pytest.approx(outer['Exclusive_s'] + inner['Inclusive_s'])
+    assert outer['Exclusive_s'] >= 0.02 and inner['Exclusive_s'] >= 0.05
+    lines = open(profiler.write_folded(str(tmp_path / 'attributes.folded'))).read().split()
+    assert lines[0] == 'CubeSat.total_mass' and lines[2] == 'CubeSat.total_mass;CubeSat.Thermal.selected_coating'
@@ -0,0 +1,65 @@
+import pytest
+
+from cubesat_configurator.benchmarks import __main__ as cli
+from cubesat_configurator.benchmarks import suite
+
+
+def result(minimum, median=None, status='ok'):
+    if status != 'ok':
+        return {'status': status, 'reason': 'requires parapy'}
+    return {'status': 'ok', 'min': minimum, 'median': minimum if median is None else median}
+
+
+BASELINE = {'results': {
+    'slower/typical': result(1.0),
+    'faster/typical': result(1.0),
+    'noise/typical': result(1.0, median=1.0),
+    'skipped/typical': result(1.0),
+    'failed/typical': result(None, status='error'),
+    'removed/typical': result(1.0),
+}}
+CURRENT = {'results': {
+    'slower/typical': result(1.25),
+    'faster/typical': result(0.5),
+    'noise/typical': result(1.05, median=1.5),
+    'skipped/typical': result(None, status='skipped'),
+    'failed/typical': result(2.0),
+    'added/typical': result(1.0),
+}}
+
+
+def test_compare_flags_regressions_beyond_the_threshold():
+    rows = {row[0]: row for row in suite.compare(BASELINE, CURRENT, threshold=0.1)}
+    # skipped and failed runs on either side and benchmarks of only one set are left out
+    assert sorted(rows) == ['faster/typical', 'noise/typical', 'slower/typical']
+    assert rows['slower/typical'] == ('slower/typical', 1.0, 1.25, pytest.approx(1.25), 'regression')
+    assert rows['faster/typical'][3:] == (pytest.approx(0.5), 'improvement')
+    assert rows['noise/typical'][3:] == (pytest.approx(1.05), '')
+    assert suite.compare(BASELINE, CURRENT, threshold=0.3)[0][-1] == ''
+
+
+def test_compare_median_statistic():
+    rows = {row[0]: row for row in suite.compare(BASELINE, CURRENT, threshold=0.1, statistic='median')}
+    assert rows['noise/typical'][1:] == (1.0, 1.5, pytest.approx(1.5), 'regression')
+
+
+def test_compare_command_exit_status(tmp_path, capsys):
+    baseline, current = str(tmp_path / 'baseline.json'), str(tmp_path / 'current.json')
+    suite.save_results(dict(BASELINE, meta={'paseos': 'stub'}), baseline)
+    suite.save_results(dict(CURRENT, meta={'paseos': 'stub'}), current)
+    assert cli.main(['compare', baseline, current, '--threshold', '0.1']) == 1
+    assert cli.main(['compare', baseline, current, '--threshold', '0.3']) == 0
+    assert '0 regression(s) beyond 30%' in capsys.readouterr().out
+
+
+def test_list_separates_the_columns(capsys, monkeypatch):
+    benchmarks = {name: suite.Benchmark(name, None, requires, ('typical',), helper_only=helper_only)
+                  for name, requires, helper_only in (('plain', (), False), ('helper', (), True),
+                                                      ('model', ('parapy',), False), ('both', ('parapy', 'pykep'), True))}
+    monkeypatch.setattr(suite, 'BENCHMARKS', benchmarks)
+    assert cli.main(['list']) == 0
+    lines = {line.split()[0]: line for line in capsys.readouterr().out.splitlines()}
+    assert lines['plain'].split() == ['plain', 'typical']
+    assert lines['helper'].endswith('typical                   helper only')
+    assert lines['model'].endswith(' requires parapy')
+    assert lines['both'].endswith(' requires parapy, pykep; helper only')
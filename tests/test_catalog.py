@@ -0,0 +1,58 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from cubesat_configurator import catalog
+from cubesat_configurator import compiled_catalog as cc
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    # a copy of the libraries, so compiling and editing them leaves the package data alone
+    directory = tmp_path / 'data'
+    shutil.copytree(cc.DATA_DIR, directory, ignore=shutil.ignore_patterns('*.bin'))
+    monkeypatch.setattr(cc, '_store', None)
+    return str(directory)
+
+
+def edit_csv(path, frame):
+    # a new size and modification time, as an edit of the library would give
+    stat = os.stat(path)
+    frame.to_csv(path, index=False)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_compiled_tables_match_csv(data_dir):
+    store_path = os.path.join(data_dir, 'catalogs.bin')
+    cc.compile_catalogs(data_dir, store_path)
+    store = cc.CompiledCatalog(store_path)
+    assert sorted(store.tables) == cc.source_files(data_dir)
+    for name in cc.source_files(data_dir):
+        pd.testing.assert_frame_equal(store.table(name), pd.read_csv(os.path.join(data_dir, name)))
+
+
+def test_compiled_catalog_follows_csv_edits(data_dir):
+    store_path = os.path.join(data_dir, 'catalogs.bin')
+    path = os.path.join(data_dir, 'ground_stations.csv')
+    before = cc.load_compiled(path, data_dir, store_path)
+    pd.testing.assert_frame_equal(before, pd.read_csv(path))
+    edit_csv(path, before.iloc[:5])
+    after = cc.load_compiled(path, data_dir, store_path)
+    pd.testing.assert_frame_equal(after, pd.read_csv(path))
+    assert len(after) == 5
+    assert cc.load_compiled(os.path.join(data_dir, 'not_a_catalog.csv'), data_dir, store_path) is None
+
+
+def test_load_catalog_reparses_edited_files(tmp_path):
+    path = str(tmp_path / 'library.csv')
+    pd.DataFrame({'Name': ['a', 'b'], 'Mass': [1.0, 2.0]}).to_csv(path, index=False)
+    catalog.clear_catalogs()
+    first = catalog.load_catalog(path)
+    first.loc[0, 'Mass'] = 10.0
+    # the cache is not changed through the copy handed out
+    pd.testing.assert_frame_equal(catalog.load_catalog(path), pd.read_csv(path))
+    edit_csv(path, pd.DataFrame({'Name': ['c'], 'Mass': [3.0]}))
+    pd.testing.assert_frame_equal(catalog.load_catalog(path), pd.read_csv(path))
+    catalog.clear_catalogs()
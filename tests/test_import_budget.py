@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+import cubesat_configurator
+from cubesat_configurator import import_budget
+
+
+@pytest.fixture(autouse=True)
+def package_path(monkeypatch):
+    # the fresh interpreters import the package from the same place as the tests
+    source = os.path.dirname(os.path.dirname(cubesat_configurator.__file__))
+    monkeypatch.setenv('PYTHONPATH', os.pathsep.join(filter(None, [source, os.environ.get('PYTHONPATH')])))
+
+
+@pytest.mark.parametrize('entry', import_budget.BUDGETS, ids=[entry[0] for entry in import_budget.BUDGETS])
+def test_import_budget(entry):
+    # the same measurement as python -m cubesat_configurator.import_budget
+    (module, elapsed, budget, loaded, passed), = import_budget.check([entry])
+    assert loaded == []
+    assert elapsed <= budget
+    assert passed
+
+
+def test_package_import_defers_heavy_dependencies():
+    loaded = import_budget.measure('cubesat_configurator')['loaded']
+    for name in ('parapy', 'paseos', 'pykep', 'matplotlib', 'docx'):
+        assert name not in loaded
@@ -0,0 +1,74 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from cubesat_configurator import constants
+from cubesat_configurator import layout_helpers as lh
+
+CAPACITY = constants.StructureConfig.layout_stack_height
+
+
+def random_boards(rng, count):
+    return [{'name': f'Board_{i}', 'mass': float(rng.integers(20, 400)), 'height': float(rng.integers(10, 90))}
+            for i in range(count)]
+
+
+def brute_force_offset(payload, boards, form_factor):
+    # every assignment, every order per stack and the full lift range of the free space of every stack
+    centers = np.array(constants.StructureConfig.layouts[form_factor], dtype=float)
+    total_mass = payload['mass'] + sum(sub['mass'] for sub in boards)
+    best = np.inf
+    for assignment in itertools.product(range(len(centers)), repeat=len(boards)):
+        columns = [[sub for sub, column in zip(boards, assignment) if column == c] for c in range(len(centers))]
+        heights = [sum(sub['height'] for sub in column) + (payload['height'] if c == 0 else 0) for c, column in enumerate(columns)]
+        if max(heights) >= CAPACITY:
+            continue
+        masses = [sum(sub['mass'] for sub in column) for column in columns]
+        xy = (np.array([m + (payload['mass'] if c == 0 else 0) for c, m in enumerate(masses)]) @ centers / total_mass
+              - centers.mean(axis=0))
+        lift = sum((CAPACITY - h) * m for h, m in zip(heights, masses))
+        for orders in itertools.product(*[itertools.permutations(column) for column in columns]):
+            moment = 0.0
+            for c, order in enumerate(orders):
+                height = 0.0
+                for sub in ([payload] if c == 0 else []) + list(order):
+                    moment += sub['mass'] * (height + sub['height'] / 2)
+                    height += sub['height']
+            gap = max(moment - total_mass * CAPACITY / 2, total_mass * CAPACITY / 2 - moment - lift, 0)
+            best = min(best, np.linalg.norm([*xy, gap / total_mass]))
+    return best
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_pack_columns_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    heights = list(rng.integers(20, 200, int(rng.integers(2, 8))).astype(float))
+    for columns in (2, 4):
+        packable = any(all(sum(h for h, c in zip(heights, assignment) if c == column) < CAPACITY for column in range(columns))
+                       for assignment in itertools.product(range(columns), repeat=len(heights)))
+        assignment = lh.pack_columns(heights, columns, CAPACITY)
+        assert (assignment is not None) == packable
+        if assignment is not None:
+            for column in range(columns):
+                assert sum(h for h, c in zip(heights, assignment) if c == column) < CAPACITY
+
+
+@pytest.mark.parametrize('form_factor', [6, 12])
+@pytest.mark.parametrize('seed', range(8))
+def test_optimal_layout_matches_brute_force(seed, form_factor):
+    rng = np.random.default_rng(seed)
+    payload, *boards = random_boards(rng, 4 if form_factor == 6 else 3)
+    expected = brute_force_offset(payload, boards, form_factor)
+    if not np.isfinite(expected):
+        with pytest.raises(ValueError):
+            lh.optimal_layout([payload] + boards, payload, form_factor)
+        return
+    stack = lh.optimal_layout([payload] + boards, payload, form_factor)
+    assert sorted(sub['name'] for sub in stack if not sub['name'].startswith('Spacer')) == sorted(sub['name'] for sub in [payload] + boards)
+    # the payload sits at the bottom of a stack and no stack is over height
+    assert next(sub for sub in stack if sub['name'] == payload['name'])['CoM_Location'] == pytest.approx(payload['height'] / 2)
+    for x, y in constants.StructureConfig.layouts[form_factor]:
+        assert sum(sub['height'] for sub in stack if (sub['x'], sub['y']) == (x, y)) <= CAPACITY + 1e-9
+    center = np.append(np.mean(constants.StructureConfig.layouts[form_factor], axis=0), CAPACITY / 2)
+    assert np.linalg.norm(lh.stack_CoM(stack) - center) == pytest.approx(expected, abs=1e-6)
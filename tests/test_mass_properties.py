@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from cubesat_configurator import layout_helpers as lay
+from cubesat_configurator import mass_properties as mp
+
+
+def box_points(mass, center, dimensions, cells=40):
+    # point masses in the cell midpoints of a box, in kg and m
+    axes = [(np.arange(cells) + 0.5) / cells * size - size / 2 + c for c, size in zip(center, dimensions)]
+    points = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+    return np.full(len(points), mass / len(points)), points
+
+
+def panel_points(mass, dimensions, cells=120):
+    # the four side panels as point masses, the mass spread by area
+    a, b, h = dimensions
+    masses, points = [], []
+    # panels at x = +-a/2 run along y, panels at y = +-b/2 along x
+    for offset_axis, along, length, other in ((0, 1, b, a), (1, 0, a, b)):
+        share = mass * length / (2 * (a + b))
+        for sign in (-1, 1):
+            grid = np.stack(np.meshgrid((np.arange(cells) + 0.5) / cells * length - length / 2,
+                                        (np.arange(cells) + 0.5) / cells * h - h / 2, indexing='ij'), axis=-1).reshape(-1, 2)
+            panel = np.zeros((len(grid), 3))
+            panel[:, offset_axis] = sign * other / 2
+            panel[:, along], panel[:, 2] = grid[:, 0], grid[:, 1]
+            masses.append(np.full(len(grid), share / len(grid)))
+            points.append(panel)
+    return np.concatenate(masses), np.concatenate(points)
+
+
+def direct_properties(masses, points):
+    total = masses.sum()
+    CoM = masses @ points / total
+    r = points - CoM
+    inertia = np.einsum('n,n->', masses, (r**2).sum(axis=1)) * np.eye(3) - np.einsum('n,ni,nj->ij', masses, r, r)
+    return total, CoM, inertia
+
+
+@pytest.mark.parametrize('form_factor', [1, 2, 3, 6, 12])
+def test_stack_mass_properties_match_point_masses(form_factor):
+    rng = np.random.default_rng(int(form_factor))
+    envelope, center = lay.bus_envelope(form_factor)
+    stack, height = [], 0.0
+    for i in range(4):
+        board = {'name': f'Board_{i}', 'mass': float(rng.integers(20, 400)), 'height': float(rng.integers(10, 40)),
+                 'x': float(rng.uniform(-20, 20)), 'y': float(rng.uniform(-20, 20))}
+        board['CoM_Location'] = height + board['height'] / 2
+        height += board['height']
+        stack.append(board)
+    structure_mass = 250.0
+    result = mp.stack_mass_properties([stack], structure_mass, form_factor)
+
+    masses, points = panel_points(structure_mass / 1000, np.array(envelope) / 1000)
+    points = points + np.array(center) / 1000
+    for board in stack:
+        board_masses, board_points = box_points(board['mass'] / 1000, np.array([board['x'], board['y'], board['CoM_Location']]) / 1000,
+                                                np.array([mp.BOARD_SIZE, mp.BOARD_SIZE, board['height']]) / 1000)
+        masses, points = np.concatenate([masses, board_masses]), np.concatenate([points, board_points])
+    total, CoM, inertia = direct_properties(masses, points)
+    assert result['Mass'][0] == pytest.approx(total)
+    assert result['CoM'][0] == pytest.approx(CoM, abs=1e-9)
+    # the midpoint sums underestimate the second moments by 1 / cells^2
+    assert result['Inertia'][0] == pytest.approx(inertia, rel=1e-3, abs=1e-9)
@@ -0,0 +1,66 @@
+import os
+import re
+
+import pytest
+
+docx = pytest.importorskip('docx')
+
+from cubesat_configurator import pdf_rendering
+
+
+def sample_document(path, paragraphs=150):
+    document = docx.Document()
+    for i in range(paragraphs):
+        document.add_paragraph(f'Paragraph {i} (with brackets) and a backslash \\ and a degree sign 20 °C')
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text, table.cell(0, 1).text = 'Mass', 'Cost'
+    table.cell(1, 0).text, table.cell(1, 1).text = '1.5 kg', '42000 €'
+    document.save(path)
+
+
+def test_text_renderer_writes_a_consistent_pdf(tmp_path):
+    docx_path, pdf_path = str(tmp_path / 'report.docx'), str(tmp_path / 'report.pdf')
+    sample_document(docx_path)
+    assert pdf_rendering.render_pdf(docx_path, pdf_path, 'text') == pdf_path
+    content = open(pdf_path, 'rb').read()
+    assert content.startswith(b'%PDF-1.4') and content.endswith(b'%%EOF\n')
+    # every xref offset points at its object, and startxref at the table
+    xref = int(re.search(rb'startxref\n(\d+)', content).group(1))
+    assert content[xref:xref + 4] == b'xref'
+    offsets = re.findall(rb'(\d{10}) 00000 n', content)
+    for number, offset in enumerate(offsets, start=1):
+        assert content[int(offset):].startswith(b'%d 0 obj' % number)
+    # 150 paragraphs and the table rows on 64 lines per page
+    assert b'/Count 3' in content
+    assert b'(Paragraph 7 \\(with brackets\\) and a backslash \\\\' in content
+    assert b'(Mass | Cost) Tj' in content and '42000 €'.encode('cp1252') in content
+
+
+def test_background_render_matches_render_in_process(tmp_path):
+    docx_path = str(tmp_path / 'report.docx')
+    sample_document(docx_path, paragraphs=5)
+    job = pdf_rendering.submit_render(docx_path, str(tmp_path / 'background.pdf'), 'text')
+    direct = pdf_rendering.render_pdf(docx_path, str(tmp_path / 'direct.pdf'), 'text')
+    assert open(job.result(timeout=120), 'rb').read() == open(direct, 'rb').read()
+    with pytest.raises(ValueError):
+        pdf_rendering.render_pdf(docx_path, renderer='unknown')
+
+
+def test_libreoffice_profile_is_temporary(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_run(command, **kwargs):
+        # LibreOffice writes the PDF under the name of the .docx into --outdir
+        calls.append(command)
+        profile = command[1].split('=', 1)[1]
+        assert profile.startswith('file://') and os.path.isdir(profile[len('file://'):])
+        open(os.path.join(command[command.index('--outdir') + 1], 'report.pdf'), 'wb').close()
+
+    monkeypatch.setattr(pdf_rendering.shutil, 'which', lambda name: '/usr/bin/soffice')
+    monkeypatch.setattr(pdf_rendering.subprocess, 'run', fake_run)
+    docx_path = str(tmp_path / 'report.docx')
+    sample_document(docx_path, paragraphs=1)
+    pdf_rendering.render_libreoffice(docx_path, str(tmp_path / 'renamed.pdf'))
+    profile = calls[0][1].split('=', 1)[1][len('file://'):]
+    assert not os.path.exists(profile)
+    assert sorted(os.listdir(tmp_path)) == ['renamed.pdf', 'report.docx']
@@ -0,0 +1,109 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from cubesat_configurator import orbit_animation as oa
+from cubesat_configurator import plotting
+
+
+@pytest.mark.parametrize('n, width', [(100, 400), (10000, 400), (86401, 400), (12345, 7)])
+def test_decimate_keeps_the_envelope_of_every_column(n, width):
+    rng = np.random.default_rng(n)
+    x = np.arange(n) * 10.0
+    y = np.cumsum(rng.normal(size=n)) + (rng.random(n) < 0.01) * 50
+    kept_x, kept_y = plotting.decimate(x, y, width)
+    assert np.all(np.diff(kept_x) > 0)
+    assert kept_x[0] == x[0] and kept_x[-1] == x[-1]
+    if n <= 2 * width:
+        assert len(kept_x) == n
+        return
+    # the same minimum and maximum in every pixel column of n // width samples as the full series, the rest is kept
+    bucket = n // width
+    assert len(kept_x) <= 2 * width + n - bucket * width + 2
+    column = np.arange(n) // bucket
+    kept_column = column[np.searchsorted(x, kept_x)]
+    for c in range(width):
+        assert kept_y[kept_column == c].min() == y[column == c].min()
+        assert kept_y[kept_column == c].max() == y[column == c].max()
+    assert set(x[bucket * width:]) <= set(kept_x)
+
+
+def telemetry(steps=300):
+    rng = np.random.default_rng(0)
+    time_h = np.arange(steps) / 60
+    return {'time_h': list(time_h), 'eclipse': list(np.sin(time_h * 4) > 0.3), 'contact': list(rng.random(steps) < 0.1),
+            'power_consumption': list(rng.uniform(2, 6, steps)), 'battery_SoC': list(np.linspace(1, 0.6, steps)),
+            'onboard_data': list(np.cumsum(rng.uniform(0, 10, steps))), 'comm_windows': [300.0, 420.0, 180.0],
+            'temperature': list(20 + np.cos(time_h * 4))}
+
+
+def test_plot_simulation_skips_unchanged_telemetry(tmp_path):
+    output_path = str(tmp_path / 'plots' / 'simulation.png')
+    status, stations = telemetry(), [('Delft', 4.37, 52.0), ('Hawaii', -155.5, 19.8)]
+    assert plotting.plot_simulation(status, stations, output_path, parallel=False)
+    assert os.path.exists(output_path) and os.path.exists(output_path + '.sha256')
+
+    # the panels are tiled on the grid, the cell without a panel stays white
+    sheet = (plotting.mpimg.imread(output_path) * 255).round().astype(np.uint8)
+    width, height = plotting.PANEL_SIZE
+    assert sheet.shape == (plotting.GRID[0] * height, plotting.GRID[1] * width, 4)
+    panel = plotting.render_panel(plotting.PANELS[4], np.asarray(status['onboard_data']), np.asarray(status['time_h']), stations)
+    assert np.array_equal(sheet[height:2 * height, width:2 * width], panel[:height, :width])
+    assert np.all(sheet[2 * height:, 2 * width:] == 255)
+
+    assert not plotting.plot_simulation(status, stations, output_path, parallel=False)
+    changed = dict(status, temperature=status['temperature'][:-1] + [25.0])
+    assert plotting.plot_simulation(changed, stations, output_path, parallel=False)
+    assert not plotting.plot_simulation(changed, stations, output_path, parallel=False)
+    assert plotting.plot_simulation(changed, stations[:1], output_path, parallel=False)
+
+
+@pytest.mark.parametrize('mjd2000, gmst', [
+    (-4649.0, 197.693195),        # 1987 April 10, 0h UT: 13h10m46.3668s, Meeus, Astronomical Algorithms, example 12.a
+    (-4648.19375, 128.737873),    # 1987 April 10, 19h21m UT: 8h34m57.0896s, example 12.b
+    (0.0, 99.967794),             # 2000 January 1, 0h UT: 6h39m52.27s
+])
+def test_ground_track_of_published_sidereal_times(mjd2000, gmst):
+    # a point on the inertial x axis lies below the meridian at minus the sidereal angle, the poles are at +-90 deg
+    positions = [[7e6, 0, 0], [0, 7e6, 0], [0, 0, 7e6], [1e6, 1e6, -np.sqrt(2) * 1e6]]
+    longitude, latitude = oa.ground_track(positions, np.full(4, mjd2000))
+    assert longitude[0] == pytest.approx((-gmst + 180) % 360 - 180, abs=1e-4)
+    assert longitude[1] == pytest.approx((90 - gmst + 180) % 360 - 180, abs=1e-4)
+    assert latitude == pytest.approx([0, 0, 90, -45])
+    assert np.all((longitude >= -180) & (longitude < 180))
+
+
+def recorded_orbit(steps, dt=60.0):
+    # a circular polar orbit of 95 minutes
+    time_s = np.arange(steps) * dt
+    angle = 2 * np.pi * time_s / 5700
+    return np.stack([6.9e6 * np.cos(angle), np.zeros(steps), 6.9e6 * np.sin(angle)], axis=1), time_s
+
+
+@pytest.mark.parametrize('steps, stride, frames', [(50, 10, 6), (50, 7, 8), (5, 10, 2)])
+def test_render_animation_frames(tmp_path, steps, stride, frames):
+    from PIL import Image
+    positions, time_s = recorded_orbit(steps)
+    path = oa.render_animation(positions, time_s, [('Delft', 4.37, 52.0)], str(tmp_path / 'orbit'), start_mjd2000=8978.0,
+                               stride=stride, size=(200, 100))
+    assert path == str(tmp_path / 'orbit.gif')
+    with Image.open(path) as animation:
+        # a frame every stride samples and the last sample
+        assert animation.n_frames == frames
+        assert animation.size == (200, 100)
+
+
+def test_submit_animation_renders_in_the_worker_pool(tmp_path, monkeypatch):
+    from PIL import Image
+    # the start epoch is a pykep epoch built on first access, so the descriptor is swapped without evaluating it
+    monkeypatch.setattr(oa.constants, 'PaseosConfig', type('PaseosConfig', (oa.constants.PaseosConfig,),
+                                                           {'start_epoch': SimpleNamespace(mjd2000=8978.0)}))
+    positions, time_s = recorded_orbit(12)
+    future = oa.submit_animation({'position': list(positions), 'time_s': list(time_s)}, [('Delft', 4.37, 52.0)],
+                                 str(tmp_path / 'orbit.gif'), stride=5)
+    with Image.open(future.result(timeout=300)) as animation:
+        assert animation.n_frames == 4
@@ -0,0 +1,91 @@
+import os
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+docx = pytest.importorskip('docx')
+from docx.shared import Pt
+
+from cubesat_configurator import report_generator as rg
+
+TEMPLATE = os.path.join(os.path.dirname(rg.__file__), 'report', 'Report_Template.docx')
+
+
+def template_data(rng):
+    # every placeholder of the template, alternately a float and a text with characters that need escaping
+    text = '\n'.join(p.text for p in docx.Document(TEMPLATE).paragraphs)
+    text += '\n'.join(cell.text for table in docx.Document(TEMPLATE).tables for row in table.rows for cell in row.cells)
+    keys = sorted(set(re.findall(r'<[A-Za-z0-9_]+>', text)))
+    return {key: float(rng.uniform(0, 1000)) if i % 2 else f'{key[1:-1]} & <{i}>' for i, key in enumerate(keys)}
+
+
+def document_xml(path):
+    with zipfile.ZipFile(path) as archive:
+        return archive.read('word/document.xml')
+
+
+def test_substitute_placeholders_matches_sequential_replace():
+    data = {'<mass>': 1.234, '<mass_total>': 'ten', '<cost>': 'a < b', '<x>': 7}
+    document = docx.Document()
+    paragraph = document.add_paragraph()
+    # placeholders split over runs of different formatting
+    for text, bold in (('Mass <ma', False), ('ss> and <mass_t', True), ('otal>, <co', False), ('st><x><x>', True), (' end ', False)):
+        paragraph.add_run(text).bold = bold
+    document.add_table(rows=1, cols=1).cell(0, 0).text = 'cell <x> <mass>'
+    expected = [''.join(run.text or '' for run in p.iter(docx.oxml.ns.qn('w:t'))) for p in document.element.body.iter(docx.oxml.ns.qn('w:p'))]
+    for key in sorted(data, key=len, reverse=True):
+        expected = [text.replace(key, rg.format_placeholder(data[key])) for text in expected]
+
+    rg.substitute_placeholders(document, data)
+    texts = [''.join(run.text or '' for run in p.iter(docx.oxml.ns.qn('w:t'))) for p in document.element.body.iter(docx.oxml.ns.qn('w:p'))]
+    assert texts == expected
+    assert [run.bold for run in paragraph.runs] == [False, True, False, True, False]
+    assert paragraph.runs[0].text == 'Mass 1.23'
+
+
+def test_table_xml_matches_cell_by_cell_table():
+    frame = pd.DataFrame({'Name': ['a & b', ' padded ', 'two\nlines'], 'Value': [1.5, np.nan, 3], 'Unit': ['<kg>', '-', '']})
+    document = docx.Document()
+    reference = document.add_table(rows=len(frame) + 1, cols=len(frame.columns))
+    for j, column in enumerate(frame.columns):
+        reference.cell(0, j).text = str(column)
+        for i, value in enumerate(frame[column]):
+            reference.cell(i + 1, j).text = str(value)
+
+    table = docx.table.Table(docx.oxml.parse_xml(rg.table_xml(frame, font_size=Pt(9))), document._body)
+    assert [[cell.text for cell in row.cells] for row in table.rows] == [[cell.text for cell in row.cells] for row in reference.rows]
+    assert all(run.bold for cell in table.rows[0].cells for run in cell.paragraphs[0].runs)
+    assert all(run.font.size == Pt(9) for row in table.rows for cell in row.cells for run in cell.paragraphs[0].runs)
+
+
+def test_added_tables_span_the_text_width():
+    document = docx.Document(TEMPLATE)
+    section = document.sections[-1]
+    width = section.page_width - section.left_margin - section.right_margin
+    assert rg.text_width(document) == width
+    table = rg.add_table_from_dataframe(document, 'Structure', pd.DataFrame({'A': [1], 'B': [2], 'C': [3]}))
+    columns = table._tbl.findall(docx.oxml.ns.qn('w:tblGrid') + '/' + docx.oxml.ns.qn('w:gridCol'))
+    # twips per column, rounded down
+    assert [int(column.get(docx.oxml.ns.qn('w:w'))) for column in columns] == [int(width // 3) // 635] * 3
+
+
+def test_batch_reports_match_single_reports(tmp_path):
+    rng = np.random.default_rng(0)
+    designs = []
+    for k in range(3):
+        tables = {'Structure': pd.DataFrame({'Subsystem': [f'Board {i}' for i in range(5)], 'Mass': rng.uniform(10, 500, 5)})}
+        designs.append((f'design_{k}', template_data(rng), tables))
+
+    index = rg.generate_reports(TEMPLATE, str(tmp_path / 'batch'), designs, renderer='none', max_workers=2)
+    assert list(index['Status']) == ['ok'] * len(designs)
+    for (name, data, tables), report in zip(designs, index['Report']):
+        single = str(tmp_path / f'{name}.docx')
+        assert rg.fill_report_template(TEMPLATE, single, data, tables, renderer='none') is None
+        assert document_xml(report) == document_xml(single)
+    # no placeholder is left in the filled reports
+    filled = docx.Document(single)
+    text = ''.join(p.text for p in filled.paragraphs) + ''.join(cell.text for table in filled.tables for row in table.rows for cell in row.cells)
+    assert [key for key in data if key in text] == []
@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+import pytest
+
+from cubesat_configurator.benchmarks import scaling
+
+
+def sleeping_setup(seconds):
+    return lambda: time.sleep(seconds)
+
+
+def failing_setup(size):
+    def fail():
+        raise ValueError('no design')
+    return fail
+
+
+def test_run_with_budget_stops_long_runs():
+    assert scaling.run_with_budget(sleeping_setup, 0.01, time_budget=5) == pytest.approx(0.01, abs=0.05)
+    start = time.perf_counter()
+    assert scaling.run_with_budget(sleeping_setup, 30, time_budget=0.5) is None
+    assert time.perf_counter() - start < 10
+    with pytest.raises(RuntimeError, match='no design'):
+        scaling.run_with_budget(failing_setup, 1)
+
+
+def test_report_states_unfinished_stages():
+    results = {'time_budget': 1.0, 'measurements': [
+        {'Axis': 'coatings', 'Stage': 'slow', 'Size': 10, 'Status': 'finished', 'Time_s': 0.01, 'Peak_MB': 1.0},
+        {'Axis': 'coatings', 'Stage': 'slow', 'Size': 30, 'Status': scaling.DID_NOT_FINISH, 'Time_s': None, 'Peak_MB': None},
+        {'Axis': 'coatings', 'Stage': 'fast', 'Size': 10, 'Status': 'finished', 'Time_s': 0.01, 'Peak_MB': 1.0}]}
+    report = scaling.scaling_report(results).set_index('Stage')
+    assert report.loc['slow', 'Status'] == f'{scaling.DID_NOT_FINISH} at 30'
+    assert report.loc['slow', 'Time_limit_size'] == 30
+    assert np.isnan(report.loc['slow', 'Time_at_target_s'])
+    # a single point is not fitted and not extrapolated to the target
+    assert report.loc['fast', 'Status'] == 'finished'
+    assert report.loc['fast', 'Time_model'] is None
+    assert np.isnan(report.loc['fast', 'Time_at_target_s'])
+
+
+def test_pipeline_stage_runs():
+    pytest.importorskip('docx')
+    setup, _ = scaling.STAGES['coatings']['pipeline']
+    assert setup(10)().endswith('report.docx')
@@ -0,0 +1,162 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cubesat_configurator import constants
+from cubesat_configurator import selection_helpers as sh
+
+STRUCTURE = pd.DataFrame({'Form_Factor': [1, 1.5, 2, 3], 'Mass': [118, 142, 220, 352], 'Cost': [42000, 63000, 84000, 126000]})
+
+
+def random_catalog(rng, rows):
+    return pd.DataFrame({'Mass': rng.integers(10, 200, rows).astype(float),
+                         'Cost': rng.integers(1, 50, rows) * 1000.0,
+                         'Power': rng.integers(1, 20, rows).astype(float),
+                         'Height': rng.integers(5, 60, rows).astype(float),
+                         'Key': rng.uniform(0, 1, rows)})
+
+
+def random_criteria(rng, subsystems=3, rows=6):
+    return {f'sub{k}': dict(component=random_catalog(rng, rows), filter_key='Key', filter_value=0.2, comparator='greater')
+            for k in range(subsystems)}
+
+
+def brute_force_designs(criteria, structure, fixed_height=0):
+    # objectives of every feasible design that fits a form factor
+    feasible = [np.flatnonzero(sh.feasible_mask(c['component'], c['filter_key'], c['filter_value'], c['comparator']))
+                for c in criteria.values()]
+    designs = []
+    for combination in itertools.product(*feasible):
+        rows = [c['component'].iloc[position] for c, position in zip(criteria.values(), combination)]
+        size = sh.form_factor(fixed_height + sum(row['Height'] for row in rows))
+        if size is None:
+            continue
+        frame = structure[structure['Form_Factor'] == size].iloc[0]
+        designs.append((sum(row['Mass'] for row in rows) + frame['Mass'], sum(row['Cost'] for row in rows) + frame['Cost'],
+                        sum(row['Power'] for row in rows), combination))
+    return designs
+
+
+def brute_force_front(designs):
+    objectives = np.array([design[:3] for design in designs])
+    return {tuple(point) for point in objectives[sh.pareto_mask(objectives)]}
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_system_pareto_front_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    criteria = random_criteria(rng)
+    designs = brute_force_designs(criteria, STRUCTURE, fixed_height=20)
+    if not designs:
+        with pytest.raises(ValueError):
+            sh.system_pareto_front(criteria, STRUCTURE, fixed_height=20)
+        return
+    front = sh.system_pareto_front(criteria, STRUCTURE, fixed_height=20)
+    assert set(map(tuple, front[['Mass', 'Cost', 'Power']].to_numpy())) == brute_force_front(designs)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_system_pareto_front_unordered_structure(seed):
+    rng = np.random.default_rng(seed)
+    criteria = random_criteria(rng)
+    # a 1.5U frame heavier than the 2U frame breaks the height order
+    structure = STRUCTURE.assign(Mass=[118, 260, 220, 352])
+    designs = brute_force_designs(criteria, structure, fixed_height=20)
+    if designs:
+        front = sh.system_pareto_front(criteria, structure, fixed_height=20)
+        assert set(map(tuple, front[['Mass', 'Cost', 'Power']].to_numpy())) == brute_force_front(designs)
+
+
+def test_shorter_heavier_component_stays_on_the_front():
+    tall = pd.DataFrame({'Mass': [10.0, 11.0], 'Cost': [1000.0, 1000.0], 'Power': [1.0, 1.0], 'Height': [60.0, 20.0], 'Key': [1.0, 1.0]})
+    criteria = {'sub': dict(component=tall, filter_key='Key', filter_value=0, comparator='greater')}
+    front = sh.system_pareto_front(criteria, STRUCTURE, fixed_height=60)
+    # 120 mm needs a 1.5U frame, 80 mm fits in 1U and saves more than the extra component mass
+    assert list(front['sub']) == [1]
+    assert list(front['Form_Factor']) == [1]
+
+
+def test_constant_and_single_row_columns_score_zero():
+    catalog = pd.DataFrame({'Mass': [50.0, 50.0, 50.0], 'Cost': [1000.0, 2000.0, 3000.0], 'Power': [2.0, 2.0, 2.0],
+                            'Height': [10.0, 10.0, 10.0], 'Key': [1.0, 1.0, 1.0]})
+    features = sh.normalized_features(catalog)
+    assert np.all(features[:, [0, 2]] == 0)
+    selected = sh.select_component(catalog, 'Key', 0, 'greater', 1, 1, 1)
+    assert selected['index'] == 0
+    single = sh.select_component(catalog.iloc[[1]], 'Key', 0, 'greater', 1, 1, 1)
+    assert single['index'] == 1 and single['Score'] == 0
+
+
+def test_joint_selection_ignores_multi_stack_structures():
+    # the 6U and 12U rows of the catalog do not shift the structure z-scores of the single stack form factors
+    rng = np.random.default_rng(0)
+    criteria = random_criteria(rng)
+    with_buses = pd.concat([STRUCTURE, pd.DataFrame({'Form_Factor': [6, 12], 'Mass': [704, 1408], 'Cost': [252000, 504000]})],
+                           ignore_index=True)
+    expected = sh.optimize_joint_selection(criteria, STRUCTURE, 1, 1, 1, fixed_height=20)
+    result = sh.optimize_joint_selection(criteria, with_buses, 1, 1, 1, fixed_height=20)
+    assert result['Score'] == pytest.approx(expected['Score'])
+    assert result['Selection'] == expected['Selection'] and result['Structure'] == expected['Structure']
+
+
+@pytest.mark.parametrize('comparator', ['greater', 'less'])
+def test_batch_select_components_matches_select_component(comparator):
+    rng = np.random.default_rng(1)
+    catalog = random_catalog(rng, 40)
+    weights = np.vstack([rng.dirichlet(np.ones(3), 50), np.eye(3), np.ones((1, 3))])
+    selected = sh.batch_select_components(catalog, 'Key', 0.5, comparator, weights, chunk_size=7)
+    for position, row in zip(selected, weights):
+        assert catalog.index[position] == sh.select_component(catalog, 'Key', 0.5, comparator, *row)['index']
+
+
+@pytest.mark.parametrize('comparator', ['greater', 'less'])
+def test_threshold_index_matches_linear_scan(comparator):
+    rng = np.random.default_rng(2)
+    keys = rng.integers(0, 10, 60).astype(float)
+    keys[[3, 17]] = np.nan
+    scores = rng.integers(0, 5, 60).astype(float)
+    scores[8] = np.nan
+    index = sh.ThresholdIndex(keys, scores, comparator)
+    thresholds = np.arange(-1, 11.5, 0.5)
+    for threshold, position in zip(thresholds, index.best_many(thresholds)):
+        meets = (keys > threshold) if comparator == 'greater' else (keys < threshold)
+        feasible = np.flatnonzero(meets & ~np.isnan(scores))
+        # first lowest score in catalog order, -1 when nothing meets the threshold
+        expected = feasible[np.argmin(scores[feasible])] if len(feasible) else -1
+        assert position == expected
+        assert index.best(threshold) == expected
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_joint_selection_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    criteria = random_criteria(rng, rows=5)
+    weights = rng.dirichlet(np.ones(3))
+    scores = [sh.component_scores(c['component'], *weights) for c in criteria.values()]
+    structure_scores = sh.component_scores(STRUCTURE, *weights, subsystem_name='structure')
+    sizes = [size for size, _ in constants.StructureConfig.form_factors]
+    best = np.inf
+    for *_, combination in brute_force_designs(criteria, STRUCTURE):
+        height = sum(c['component']['Height'].iloc[position] for c, position in zip(criteria.values(), combination))
+        best = min(best, sum(s[position] for s, position in zip(scores, combination))
+                   + structure_scores[sizes.index(sh.form_factor(height))])
+    if not np.isfinite(best):
+        with pytest.raises(ValueError):
+            sh.optimize_joint_selection(criteria, STRUCTURE, *weights)
+        return
+    assert sh.optimize_joint_selection(criteria, STRUCTURE, *weights)['Score'] == pytest.approx(best)
+
+
+def test_pareto_mask_matches_pairwise_dominance():
+    rng = np.random.default_rng(0)
+    for columns in (2, 3, 4):
+        points = rng.integers(0, 6, (40, columns)).astype(float)
+        points[5] = np.nan
+        mask = sh.pareto_mask(points)
+        dominated = [np.isnan(point).any() or any(np.all(other <= point) and np.any(other < point) for other in points)
+                     for point in points]
+        assert set(map(tuple, points[mask])) == set(map(tuple, points[~np.array(dominated)]))
+        # of identical rows only one is kept
+        assert mask.sum() == len(set(map(tuple, points[mask])))
@@ -0,0 +1,28 @@
+import time
+
+import pytest
+
+from cubesat_configurator import simulation_metrics as sm
+
+
+def test_stages_events_and_progress():
+    snapshots = []
+    metrics = sm.SimulationMetrics(10, snapshots.append, progress_interval=4)
+    metrics.start()
+    for step in range(10):
+        time.sleep(0.001)
+        metrics.lap('propagation')
+        if step % 3 == 0:
+            metrics.count('pictures')
+        metrics.lap('bookkeeping')
+        metrics.step()
+    summary = metrics.finish(contacts=2)
+    # progress after 4 and 8 steps and at the end
+    assert [snapshot['steps'] for snapshot in snapshots] == [4, 8, 10]
+    assert [snapshot['finished'] for snapshot in snapshots] == [False, False, True]
+    assert summary['events'] == {'pictures': 4, 'contacts': 2}
+    assert summary['progress'] == 1.0
+    assert summary['stage_time']['propagation'] >= 0.01
+    assert sum(summary['stage_time'].values()) <= summary['wall_time']
+    assert sum(summary['stage_fraction'].values()) == pytest.approx(1.0)
+    assert summary['steps_per_second'] == pytest.approx(10 / summary['wall_time'])
@@ -0,0 +1,74 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from cubesat_configurator import stacking_helpers as stk
+
+
+def random_boards(rng, count, whole_grams):
+    masses = rng.integers(20, 500, count).astype(float) if whole_grams else rng.uniform(20, 500, count)
+    return [{'name': f'Board_{i}', 'mass': float(mass), 'height': float(rng.integers(10, 50)), 'CoM_Location': None}
+            for i, mass in enumerate(masses)]
+
+
+def com_offset(stack, total_height):
+    return abs(sum(sub['mass'] * sub['CoM_Location'] for sub in stack) / sum(sub['mass'] for sub in stack) - total_height / 2)
+
+
+def brute_force_offset(boards, total_height, spacers):
+    # every order of the boards and every distribution of the spacers over the gaps, the rest on top
+    payload, others = boards[0], boards[1:]
+    spacer_size = (total_height - sum(sub['height'] for sub in boards)) / spacers if spacers else 0
+    best = np.inf
+    for order in itertools.permutations(others):
+        for gaps in itertools.product(range(spacers + 1), repeat=len(order)):
+            if sum(gaps) > spacers:
+                continue
+            stack = [dict(payload)]
+            for sub, count in zip(order, gaps):
+                stack += [{'name': 'Spacer', 'mass': 0, 'height': spacer_size}] * count
+                stack.append(dict(sub))
+            best = min(best, com_offset(stk.stack_positions([dict(sub) for sub in stack]), total_height))
+    return best
+
+
+@pytest.mark.parametrize('whole_grams', [True, False])
+@pytest.mark.parametrize('seed', range(15))
+def test_optimal_stack_matches_brute_force(seed, whole_grams):
+    rng = np.random.default_rng(seed)
+    boards = random_boards(rng, 4, whole_grams)
+    spacers = int(rng.integers(0, 7))
+    total_height = sum(sub['height'] for sub in boards) + float(rng.integers(10, 120))
+    stack = stk.optimal_stack(boards, boards[0], total_height, spacers)
+    assert len(stack) == len(boards) + spacers
+    assert stack[-1]['name'] == boards[0]['name']
+    assert com_offset(stack, total_height) == pytest.approx(brute_force_offset(boards, total_height, spacers), abs=1e-9)
+
+
+@pytest.mark.parametrize('whole_grams', [True, False])
+def test_optimal_stack_scales_to_many_spacers(whole_grams):
+    rng = np.random.default_rng(0)
+    boards = random_boards(rng, 5, whole_grams)
+    total_height = sum(sub['height'] for sub in boards) + 100
+    few = com_offset(stk.optimal_stack(boards, boards[0], total_height, 6), total_height)
+    many = stk.optimal_stack(boards, boards[0], total_height, 96)
+    assert len(many) == len(boards) + 96
+    # any distribution of 6 spacers is one of 96 spacers of a sixteenth of the height, so it cannot balance better
+    assert com_offset(many, total_height) <= few + 1e-9
+
+
+def test_mass_quantum():
+    assert stk.mass_quantum([300, 500, 100]) == pytest.approx(100)
+    assert stk.mass_quantum([12.5, 7.5]) == pytest.approx(2.5)
+    assert stk.mass_quantum([np.pi, 1.0]) == 0.0
+
+
+def test_optimal_continuous_stack_beats_equal_spacers():
+    rng = np.random.default_rng(1)
+    for _ in range(10):
+        boards = random_boards(rng, 4, False)
+        total_height = sum(sub['height'] for sub in boards) + 80
+        continuous = stk.optimal_continuous_stack(boards, boards[0], total_height)
+        assert sum(sub['height'] for sub in continuous) == pytest.approx(total_height)
+        assert com_offset(continuous, total_height) <= brute_force_offset(boards, total_height, 4) + 1e-9
@@ -0,0 +1,157 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cubesat_configurator import thermal_helpers as th
+
+CASE = dict(T_min=-10 + 273.15 + 5, T_max=40 + 273.15 - 5, Q_internal=4.0, periapsis=6878e3, apoapsis=6878e3, m=2.5,
+            c_p=900, t_eclipse=2100)
+
+
+def random_tables(rng, rows):
+    return {source: pd.DataFrame({'Coating': [f'{source} {i}' for i in range(rows)],
+                                  'Absorptivity': rng.uniform(0.05, 0.95, rows),
+                                  'Emissivity': rng.uniform(0.05, 0.95, rows)})
+            for source in ('SMAD', 'NASA')}
+
+
+def brute_force_faces(tables, faces, T_min, T_max, Q_internal, periapsis, apoapsis, m, c_p, t_eclipse):
+    # heater power and margin of the best of all assignments, None if none meets the hot case
+    q_hot, q_cold = th.hot_case_absorbed_flux(periapsis, 1.0), th.cold_case_absorbed_flux(apoapsis, 1.0)
+    assignments = np.array(list(itertools.product(*[range(len(tables[face['Source']])) for face in faces])))
+    H, K, E = np.zeros(len(assignments)), np.zeros(len(assignments)), np.zeros(len(assignments))
+    for f, face in enumerate(faces):
+        coating = tables[face['Source']].iloc[assignments[:, f]]
+        H += coating['Absorptivity'].to_numpy() * q_hot * face['Hot Projection']
+        K += coating['Absorptivity'].to_numpy() * q_cold * face['Cold Projection']
+        E += coating['Emissivity'].to_numpy() * face['Area']
+    T_hot = ((H + Q_internal) / (th.boltzmann_constant * E))**(1/4)
+    fits = T_hot <= T_max
+    if not np.any(fits):
+        return None
+    H, K, E, T_hot = H[fits], K[fits], E[fits], T_hot[fits]
+    P = th._face_heater_power(H, K, E, T_min, Q_internal, m, c_p, t_eclipse)
+    T_cold = th._face_cold_temp(H, K, E, Q_internal, np.nan_to_num(P), m, c_p, t_eclipse)
+    margin = np.minimum(T_max - T_hot, T_cold - T_min)
+    heated = ~np.isnan(P)
+    if not np.any(heated):
+        return None
+    best = np.lexsort((-margin[heated], P[heated]))[0]
+    return P[heated][best], margin[heated][best]
+
+
+@pytest.mark.parametrize('solar_cell_faces', [['+X', '-X', '+Y', '-Y'], [], ['+X']])
+@pytest.mark.parametrize('seed', range(10))
+def test_optimize_face_coatings_matches_brute_force(seed, solar_cell_faces):
+    rng = np.random.default_rng(seed)
+    tables = random_tables(rng, 4)
+    form_factor = float(rng.choice([1, 2, 3]))
+    case = dict(CASE, T_min=CASE['T_min'] + float(rng.uniform(0, 45)))
+    faces = th.cubesat_faces(form_factor, solar_cell_faces)
+    expected = brute_force_faces(tables, faces, **case)
+    if expected is None:
+        with pytest.raises(AssertionError):
+            th.optimize_face_coatings(tables, faces, **case)
+        return
+    result = th.optimize_face_coatings(tables, faces, **case)
+    assert result['Heater Power'] == pytest.approx(expected[0], abs=1e-9)
+    assert min(result['Hot Margin'], result['Cold Margin with Heater']) == pytest.approx(expected[1], abs=1e-6)
+    assert list(result['Faces']['Face']) == [face['Face'] for face in faces]
+
+
+@pytest.mark.parametrize('dark_limit', [1, 10, th.DARK_SUMSET_LIMIT])
+def test_optimize_face_coatings_dark_sums(dark_limit):
+    # dark faces give the same result whether they stay face levels or are summed up front
+    rng = np.random.default_rng(7)
+    tables = random_tables(rng, 4)
+    faces = th.cubesat_faces(2.0, ['+X', '-X', '+Y', '-Y'])
+    expected = brute_force_faces(tables, faces, **CASE)
+    result = th.optimize_face_coatings(tables, faces, **CASE, dark_limit=dark_limit)
+    assert result['Heater Power'] == pytest.approx(expected[0], abs=1e-9)
+    assert min(result['Hot Margin'], result['Cold Margin with Heater']) == pytest.approx(expected[1], abs=1e-6)
+
+
+def test_multisets():
+    for n, k in ((1, 1), (4, 1), (4, 2), (5, 3)):
+        expected = list(itertools.combinations_with_replacement(range(n), k))
+        assert [tuple(row) for row in th._multisets(n, k)] == expected
+
+
+def baseline_coatings(coatings, form_factor):
+    # the row by row table Thermal.selected_coating built before the index, with the fsolve cooling solution
+    coatings = coatings.copy()
+    A_C_max, A_C_min, A_S = np.sqrt(2) * form_factor * 0.01, 0.01, (2 + 4 * form_factor) * 0.01
+    for i in range(len(coatings)):
+        alpha, epsilon = coatings.loc[i, 'Absorptivity'], coatings.loc[i, 'Emissivity']
+        T_hot = th.calculate_equilibrium_hot_temp(0, CASE['Q_internal'], alpha, epsilon, CASE['periapsis'], CASE['apoapsis'],
+                                                  A_C_max, A_C_min, A_S)
+        T_cold_eq = th.calculate_equilibrium_cold_temp(0, CASE['Q_internal'], alpha, epsilon, CASE['periapsis'], CASE['apoapsis'],
+                                                       A_C_max, A_C_min, A_S)
+        T_cold = th.exact_transient_solution_cooling(T_cold_eq, T_hot, CASE['m'], CASE['c_p'], epsilon, A_S, CASE['t_eclipse'])
+        coatings.loc[i, f'Hot Case {form_factor}U'] = T_hot
+        coatings.loc[i, f'Cold Case {form_factor}U'] = T_cold
+        coatings.loc[i, f'Hot Margin {form_factor}U'] = CASE['T_max'] - T_hot
+        coatings.loc[i, f'Cold Margin {form_factor}U'] = T_cold - CASE['T_min']
+    return coatings
+
+
+@pytest.mark.parametrize('T_eq', [150.0, 230.0, 290.0])
+@pytest.mark.parametrize('ratio', [1 + 1e-9, 1 + 1e-6, 1 + 1e-3, 1.05, 1.3, 2.0])
+def test_transient_solution_cooling_matches_fsolve(T_eq, ratio):
+    # T / T_eq close to 1 is where the ln(x - 1) substitution matters most
+    for epsilon, t_eclipse in itertools.product([0.05, 0.5, 0.95], [0.0, 60.0, 2100.0, 10000.0]):
+        expected = th.exact_transient_solution_cooling(T_eq, T_eq * ratio, 2.5, 900, epsilon, 0.06, t_eclipse)
+        T = th.transient_solution_cooling(T_eq, T_eq * ratio, 2.5, 900, epsilon, 0.06, t_eclipse)
+        assert float(T) == pytest.approx(expected, rel=1e-9, abs=1e-6)
+    # the array version solves a grid at once with the same result
+    epsilon = np.array([0.05, 0.5, 0.95])
+    T = th.transient_solution_cooling(np.full(3, T_eq), np.full(3, T_eq * ratio), 2.5, 900, epsilon, 0.06, 2100.0)
+    expected = [th.exact_transient_solution_cooling(T_eq, T_eq * ratio, 2.5, 900, e, 0.06, 2100.0) for e in epsilon]
+    assert T == pytest.approx(expected, rel=1e-9, abs=1e-6)
+
+
+def test_select_coating_indexed_matches_baseline_table():
+    rng = np.random.default_rng(3)
+    tables = random_tables(rng, 300)
+    index = th.build_coating_index(tables)
+    for form_factor in (1, 2, 3):
+        expected = th.select_coating(form_factor, baseline_coatings(index.coatings_df, form_factor))
+        result = th.select_coating_indexed(index, form_factor, **CASE)
+        assert result['Coating'] == expected['Coating']
+        for key in ('Hot Case', 'Cold Case', 'Hot Margin', 'Cold Margin'):
+            assert result[key] == pytest.approx(expected[key], abs=1e-6)
+
+
+def test_coating_index_rectangle_query():
+    rng = np.random.default_rng(4)
+    index = th.build_coating_index(random_tables(rng, 500), leaf_size=8)
+    for _ in range(50):
+        lo, hi = np.sort(rng.uniform(0, 1, (2, 2)), axis=0)
+        points = index.points
+        expected = np.flatnonzero(np.all((points >= lo) & (points <= hi), axis=1))
+        assert sorted(index.query_rectangle(lo, hi)) == list(expected)
+
+
+@pytest.mark.parametrize('form_factor', [1, 1.5, 2, 3])
+def test_cubesat_areas_of_single_stacks(form_factor):
+    # the single stack formulas of the thermal model
+    areas = th.cubesat_areas(form_factor)
+    assert areas['Max Cross Section'] == pytest.approx(np.sqrt(2) * form_factor * 0.01)
+    assert areas['Min Cross Section'] == pytest.approx(0.01)
+    assert areas['Surface'] == pytest.approx((2 + 4 * form_factor) * 0.01)
+    assert sum(face['Area'] for face in th.cubesat_faces(form_factor, [])) == pytest.approx(areas['Surface'])
+
+
+def test_cubesat_areas_of_multi_stack_buses():
+    # 6U is 200 x 100 x 300 mm, 12U is 200 x 200 x 300 mm
+    six, twelve = th.cubesat_areas(6), th.cubesat_areas(12)
+    assert six['Surface'] == pytest.approx(2 * (0.02 + 0.03 + 0.06))
+    assert six['Max Cross Section'] == pytest.approx((0.03 + 0.06) / np.sqrt(2))
+    assert six['Min Cross Section'] == pytest.approx(0.02)
+    assert twelve['Surface'] == pytest.approx(2 * (0.04 + 0.06 + 0.06))
+    for form_factor in (6, 12):
+        faces = th.cubesat_faces(form_factor, [])
+        assert sum(face['Area'] for face in faces) == pytest.approx(th.cubesat_areas(form_factor)['Surface'])
+        assert sum(face['Hot Projection'] for face in faces) == pytest.approx(th.cubesat_areas(form_factor)['Max Cross Section'])
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from cubesat_configurator import simulation_loop as sl
+from cubesat_configurator.benchmarks import validation
+
+
+def replay(parameters, eclipse, contact):
+    flags = validation._FlagReplay(parameters, np.asarray(eclipse), np.asarray(contact), validation.paseos_stub.heat_balance)
+    status, eclipse_time = sl.run_mission_loop(flags, flags, [flags.in_contact], flags.epoch, len(eclipse),
+                                               parameters['dt'], parameters['power_comm'], parameters['power_idle'],
+                                               parameters['downlink_data_rate'], sl.DAY2SEC / parameters['images_per_day'],
+                                               parameters['picture_size'], parameters['bus_data_rate'],
+                                               parameters['capacity'], verbose=False)
+    return status, eclipse_time
+
+
+def test_mission_loop_bookkeeping():
+    # 4 pictures a day at 10 s steps: pictures after 3 h, 9 h, 15 h and 21 h
+    parameters = dict(validation.DEFAULTS, dt=10.0, images_per_day=4, picture_size=100.0, bus_data_rate=0.0,
+                      downlink_data_rate=1.0)
+    runs = int(sl.DAY2SEC / 10)
+    eclipse = np.arange(runs) % 10 < 4
+    contact = np.zeros(runs, dtype=bool)
+    contact[-100:] = True
+    status, eclipse_time = replay(parameters, eclipse, contact)
+    assert eclipse_time == pytest.approx(eclipse.sum() * 10)
+    assert len(status['time_s']) == runs and status['time_s'][1] == pytest.approx(10)
+    assert status['onboard_data'][-101] == pytest.approx(400)
+    # 100 steps of downlink at 10 kbits each empty the 400 kbits
+    assert status['onboard_data'][-1] == 0
+    assert status['power_consumption'][-1] == parameters['power_comm']
+    assert status['power_consumption'][0] == parameters['power_idle']
+    assert status['contact'] == list(contact) and status['station_contact'][-1] == [True]
+
+
+def test_mission_loop_drops_power_of_an_empty_battery():
+    parameters = dict(validation.DEFAULTS, dt=10.0, capacity=100.0, charging_rate=0.0, power_idle=2.0)
+    status, _ = replay(parameters, np.ones(20, dtype=bool), np.zeros(20, dtype=bool))
+    # 5 steps of 20 Ws empty the battery, then the load is shed and the charge stays
+    assert status['battery_SoC'][5] == 0
+    assert status['battery_SoC'][-1] == 0
+    assert min(status['battery_SoC']) >= 0
+
+
+def test_bookkeeping_is_the_loop():
+    parameters = validation.scenario('sso_500_delft_hawaii')
+    rng = np.random.default_rng(0)
+    eclipse, contact = rng.random(500) < 0.4, rng.random(500) < 0.1
+    status, _ = replay(parameters, eclipse, contact)
+    trace = validation.bookkeeping(parameters, eclipse, contact)
+    for key in ('battery_SoC', 'onboard_data', 'temperature'):
+        assert np.array_equal(trace[key], np.array(status[key]))
+
+
+def test_analytic_engine_trace():
+    parameters = dict(validation.scenario('sso_500_delft_hawaii'), days=0.25)
+    trace = validation.ENGINES['analytic'][0](parameters)
+    runs = int(0.25 * sl.DAY2SEC / parameters['dt'])
+    assert set(trace) == set(validation.TRACE_KEYS)
+    assert trace['station_contact'].shape == (runs, 2)
+    # a 500 km orbit spends about a third in eclipse
+    assert 0.25 < trace['eclipse'].mean() < 0.45
+    assert np.all((trace['battery_SoC'] >= 0) & (trace['battery_SoC'] <= 1))
+
+
+def test_validation_without_reference_is_skipped(monkeypatch):
+    monkeypatch.setattr(validation, 'available_engines',
+                        lambda names=None: (['analytic'], {'paseos': 'requires pykep, paseos', 'stub': 'requires pykep'}))
+    messages = []
+    results = validation.run_validation(progress=messages.append)
+    assert results['reference'] is None and results['runs'] == [] and results['errors'] == []
+    assert 'stub requires pykep' in results['message']
+    assert messages == [f"validation skipped: {results['message']}"]
+    assert validation.validation_report(results).empty